@@ -1,22 +1,54 @@
+import inspect
+
+from metrics import counter, histogram, timed
+from tracing import traced
+
+from .cache import ReadCacheMixin
+from .changes import ChangesMixin
 from .connection import DatabaseBase
 from .meetings import MeetingsMixin
 from .transcripts import TranscriptsMixin
 from .summaries import SummariesMixin
 from .config import ConfigMixin
+from .live import LiveSummaryMixin
+from .telemetry import TelemetryMixin
+from .versions import SummaryVersionsMixin, VersionConflictError
 from .schema import SchemaValidator
 
 
-class DatabaseManager(MeetingsMixin, TranscriptsMixin, SummariesMixin, ConfigMixin, DatabaseBase):
+QUERY_SECONDS = histogram("maity_db_query_duration_seconds", "Latency of DatabaseManager methods", ("method",))
+QUERY_ERRORS = counter("maity_db_query_errors_total", "DatabaseManager methods that raised", ("method",))
+
+
+def _instrument(cls):
+    """Time every public coroutine method of ``cls`` under its name, as a metric and a trace span"""
+    for name, method in inspect.getmembers(cls, inspect.iscoroutinefunction):
+        if not name.startswith("_"):
+            setattr(cls, name, traced(f"db.{name}")(timed(QUERY_SECONDS, QUERY_ERRORS, method=name)(method)))
+    return cls
+
+
+@_instrument
+class DatabaseManager(ReadCacheMixin, MeetingsMixin, TranscriptsMixin, SummariesMixin, ConfigMixin,
+                      LiveSummaryMixin, SummaryVersionsMixin, TelemetryMixin, ChangesMixin, DatabaseBase):
     """Database manager that composes all database operation mixins.
 
     This class provides backward-compatible access to all database operations
     previously contained in the monolithic db.py file.
 
     Mixins:
+        ReadCacheMixin: Byte-bounded LRU in front of meeting, meeting-list and summary reads
         MeetingsMixin: Meeting CRUD operations (save, get, update, delete)
         TranscriptsMixin: Transcript operations (save, get, search)
         SummariesMixin: Summary process operations (create, update)
         ConfigMixin: Configuration operations (model config, API keys, transcript config)
+        LiveSummaryMixin: Incremental summarization windows (segments after a cursor, window results)
+        SummaryVersionsMixin: Summary history (versions stored as reverse diffs, rollback)
+        TelemetryMixin: Per-call LLM telemetry (record calls, latency/throughput percentiles)
+        ChangesMixin: Trigger-maintained change log (entities changed since a sequence number)
+
+    Every public coroutine method is timed into ``maity_db_query_duration_seconds``
+    and into a ``db.<method>`` span of the current request's trace.
 
     Base:
         DatabaseBase: Database connection management, initialization, and schema setup
@@ -24,4 +56,4 @@ class DatabaseManager(MeetingsMixin, TranscriptsMixin, SummariesMixin, ConfigMix
     pass
 
 
-__all__ = ['DatabaseManager', 'SchemaValidator']
+__all__ = ['DatabaseManager', 'SchemaValidator', 'VersionConflictError']
@@ -0,0 +1,208 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from metrics import counter, gauge
+
+# Total size of the cached reads, estimated from their contents; 0 disables the cache
+READ_CACHE_BYTES = int(os.getenv("MAITY_READ_CACHE_BYTES", str(32 * 1024 * 1024)))
+
+CACHE_REQUESTS = counter("maity_db_cache_requests_total", "Cached DB reads by outcome", ("cache", "result"))
+CACHE_INVALIDATIONS = counter("maity_db_cache_invalidations_total", "Cached DB reads dropped by writes", ("cache",))
+
+_MISSING = object()
+
+
+def _sizeof(value: Any) -> int:
+    """Rough in-memory size of the str/number/list/dict values read from SQLite"""
+    if isinstance(value, str):
+        return 49 + len(value)
+    if isinstance(value, bytes):
+        return 33 + len(value)
+    if isinstance(value, dict):
+        return 64 + sum(_sizeof(key) + _sizeof(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return 56 + 8 * len(value) + sum(_sizeof(item) for item in value)
+    return 24
+
+
+class ReadCache:
+    """LRU of DB reads bounded by their estimated size in bytes.
+
+    Keys are tuples whose first element names the cached read (``meeting``,
+    ``meetings``, ``summary``), which is also the metric label. Writers
+    ``invalidate`` the keys they touch. A load that raced with any
+    invalidation is returned but not stored, so a read that began before a
+    write commits can never be cached after the write's invalidation.
+    """
+
+    def __init__(self, max_bytes: int = READ_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries: "OrderedDict[Tuple, Tuple[Any, int]]" = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: Tuple, value: Any, generation: int):
+        size = _sizeof(value)
+        with self._lock:
+            if generation != self._generation or size > self.max_bytes:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+
+    def invalidate(self, *keys: Tuple):
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                entry = self._entries.pop(key, None)
+                if entry is not None:
+                    self.bytes -= entry[1]
+                    CACHE_INVALIDATIONS.inc(cache=key[0])
+
+    async def get_or_load(self, key: Tuple, load: Callable[[], Awaitable[Any]]) -> Any:
+        """The cached value of ``key``, or ``await load()`` stored unless it is None"""
+        if self.max_bytes <= 0:
+            return await load()
+        value = self.get(key)
+        if value is not _MISSING:
+            CACHE_REQUESTS.inc(cache=key[0], result="hit")
+            return value
+        CACHE_REQUESTS.inc(cache=key[0], result="miss")
+        generation = self._generation
+        value = await load()
+        if value is not None:
+            self.put(key, value, generation)
+        return value
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# One cache per database file, shared by every DatabaseManager on it (main's, the
+# summary processor's, ...), so a write through one invalidates reads through the others
+_caches: Dict[str, ReadCache] = {}
+
+
+def read_cache_for(db_path: str) -> ReadCache:
+    path = os.path.abspath(db_path)
+    cache = _caches.get(path)
+    if cache is None:
+        cache = _caches[path] = ReadCache()
+    return cache
+
+
+def _hit_ratios() -> Dict[Tuple[Hashable, ...], Optional[float]]:
+    ratios = {}
+    for name in ("meeting", "meetings", "summary"):
+        hits = CACHE_REQUESTS.value(cache=name, result="hit")
+        total = hits + CACHE_REQUESTS.value(cache=name, result="miss")
+        ratios[(name,)] = hits / total if total else None
+    return ratios
+
+
+gauge("maity_db_cache_bytes", "Estimated size of the cached DB reads", lambda: sum(c.bytes for c in _caches.values()))
+gauge("maity_db_cache_entries", "Cached DB reads", lambda: sum(len(c) for c in _caches.values()))
+gauge("maity_db_cache_hit_ratio", "Share of cached DB reads served from memory since start", _hit_ratios, ("cache",))
+
+
+class ReadCacheMixin:
+    """Read-through cache in front of get_meeting, get_all_meetings and get_summary_result.
+
+    Listed first among DatabaseManager's mixins, so its methods wrap the
+    ones that query SQLite. Every write method that changes what one of
+    those reads returns invalidates the affected keys once it finishes
+    (also when it fails, since it may have committed part of its work).
+    Cached values are shared: callers get a copy of the top-level dict or
+    list, but nested values (e.g. transcript segments) must not be mutated.
+    """
+
+    @property
+    def read_cache(self) -> ReadCache:
+        return read_cache_for(self.db_path)
+
+    async def _invalidating(self, write: Awaitable, *keys: Tuple):
+        try:
+            return await write
+        finally:
+            self.read_cache.invalidate(*keys)
+
+    # Reads
+
+    async def get_meeting(self, meeting_id: str):
+        meeting = await self.read_cache.get_or_load(
+            ("meeting", meeting_id), lambda: super(ReadCacheMixin, self).get_meeting(meeting_id))
+        return dict(meeting) if meeting is not None else None
+
+    async def get_all_meetings(self):
+        meetings = await self.read_cache.get_or_load(
+            ("meetings",), lambda: super(ReadCacheMixin, self).get_all_meetings())
+        return [dict(meeting) for meeting in meetings]
+
+    async def get_summary_result(self, meeting_id: str):
+        result = await self.read_cache.get_or_load(
+            ("summary", meeting_id), lambda: super(ReadCacheMixin, self).get_summary_result(meeting_id))
+        return dict(result) if result is not None else None
+
+    # Writes
+
+    async def save_meeting(self, meeting_id: str, *args, **kwargs):
+        return await self._invalidating(super().save_meeting(meeting_id, *args, **kwargs),
+                                        ("meetings",), ("meeting", meeting_id))
+
+    async def update_meeting_title(self, meeting_id: str, *args, **kwargs):
+        return await self._invalidating(super().update_meeting_title(meeting_id, *args, **kwargs),
+                                        ("meetings",), ("meeting", meeting_id))
+
+    async def update_meeting_name(self, meeting_id: str, *args, **kwargs):
+        return await self._invalidating(super().update_meeting_name(meeting_id, *args, **kwargs),
+                                        ("meetings",), ("meeting", meeting_id))
+
+    async def delete_meeting(self, meeting_id: str, *args, **kwargs):
+        return await self._invalidating(super().delete_meeting(meeting_id, *args, **kwargs),
+                                        ("meetings",), ("meeting", meeting_id), ("summary", meeting_id))
+
+    async def save_meeting_transcript(self, meeting_id: str, *args, **kwargs):
+        return await self._invalidating(super().save_meeting_transcript(meeting_id, *args, **kwargs),
+                                        ("meeting", meeting_id))
+
+    async def append_meeting_segments(self, segments, *args, **kwargs):
+        meeting_ids = {segment.meeting_id for segment in segments}
+        return await self._invalidating(super().append_meeting_segments(segments, *args, **kwargs),
+                                        *[("meeting", meeting_id) for meeting_id in meeting_ids])
+
+    async def create_process(self, meeting_id: str, *args, **kwargs):
+        return await self._invalidating(super().create_process(meeting_id, *args, **kwargs),
+                                        ("summary", meeting_id))
+
+    async def update_process(self, meeting_id: str, *args, **kwargs):
+        return await self._invalidating(super().update_process(meeting_id, *args, **kwargs),
+                                        ("summary", meeting_id))
+
+    async def add_summary_version(self, meeting_id: str, *args, **kwargs):
+        return await self._invalidating(super().add_summary_version(meeting_id, *args, **kwargs),
+                                        ("summary", meeting_id))
+
+    async def restore_latest_summary_version(self, meeting_id: str, *args, **kwargs):
+        return await self._invalidating(super().restore_latest_summary_version(meeting_id, *args, **kwargs),
+                                        ("summary", meeting_id))
+
+    async def update_meeting_summary(self, meeting_id: str, *args, **kwargs):
+        # Also bumps meetings.updated_at
+        return await self._invalidating(super().update_meeting_summary(meeting_id, *args, **kwargs),
+                                        ("meeting", meeting_id), ("summary", meeting_id))
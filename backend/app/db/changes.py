@@ -0,0 +1,97 @@
+import logging
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Rows looked up per IN (...) query, under SQLite's bound-parameter limit
+_LOOKUP_BATCH = 500
+
+
+class ChangesMixin:
+    async def get_changes(self, since: int = 0, limit: int = 1000) -> Dict:
+        """Entities created, updated or deleted after change-log sequence number ``since``.
+
+        Reads at most ``limit`` log rows and folds them to one change per
+        entity: the latest operation wins, except that an entity created and
+        then updated within the page is reported as created. Changes that
+        are not deletions carry the entity's current ``data`` (a meeting as in
+        /get-meetings plus timestamps, a segment as in /get-meeting, a
+        summary's status), so applying a page needs no further requests.
+
+        ``next`` is the sequence number to pass as ``since`` for the next
+        page. ``reset`` means the log cannot tell what changed since
+        ``since`` (it was pruned past it, or the database predates it): the
+        client must reload everything and continue from ``next``.
+        """
+        async with self._get_connection() as conn:
+            cursor = await conn.execute("SELECT MIN(seq), MAX(seq) FROM change_log")
+            oldest, latest = await cursor.fetchone()
+            latest = latest or 0
+            cursor = await conn.execute(
+                "SELECT MAX(seq) FROM change_log WHERE entity = 'log' AND op = 'reset' AND seq > ?", (since,))
+            reset_seq = (await cursor.fetchone())[0]
+            if reset_seq is not None or (oldest is not None and since < oldest - 1) or since > latest:
+                return {"since": since, "next": latest, "reset": True, "has_more": False, "changes": []}
+
+            cursor = await conn.execute("""
+                SELECT seq, entity, entity_id, meeting_id, op, changed_at
+                FROM change_log
+                WHERE seq > ?
+                ORDER BY seq
+                LIMIT ?
+            """, (since, limit))
+            rows = await cursor.fetchall()
+
+            folded: Dict[Tuple[str, str], Dict] = {}
+            for seq, entity, entity_id, meeting_id, op, changed_at in rows:
+                previous = folded.pop((entity, entity_id), None)
+                if previous is not None and previous["op"] == "created" and op == "updated":
+                    op = "created"
+                # Re-inserted so the dict stays in order of each entity's latest change
+                folded[(entity, entity_id)] = {"seq": seq, "entity": entity, "id": entity_id,
+                                               "meeting_id": meeting_id, "op": op, "changed_at": changed_at}
+
+            data = await self._change_data(conn, [change for change in folded.values() if change["op"] != "deleted"])
+            changes = []
+            for change in folded.values():
+                if change["op"] != "deleted":
+                    change["data"] = data.get((change["entity"], change["id"]))
+                    if change["data"] is None:
+                        # Deleted after this page's last entry; the deletion comes in a later page
+                        continue
+                changes.append(change)
+
+            return {
+                "since": since,
+                "next": rows[-1][0] if rows else max(since, latest),
+                "reset": False,
+                "has_more": len(rows) == limit,
+                "changes": changes,
+            }
+
+    async def _change_data(self, conn, changes: List[Dict]) -> Dict[Tuple[str, str], Dict]:
+        """Current state of the changed entities, keyed by (entity, id)"""
+        ids: Dict[str, List[str]] = {"meeting": [], "summary": [], "transcript": []}
+        for change in changes:
+            ids.setdefault(change["entity"], []).append(change["id"])
+
+        queries = {
+            "meeting": ("SELECT id, id, title, created_at, updated_at FROM meetings WHERE id IN ({})",
+                        lambda row: {"id": row[1], "title": row[2], "created_at": row[3], "updated_at": row[4]}),
+            "summary": ("SELECT meeting_id, meeting_id, status, updated_at FROM summary_processes "
+                        "WHERE meeting_id IN ({})",
+                        lambda row: {"meeting_id": row[1], "status": row[2], "updated_at": row[3]}),
+            "transcript": ("SELECT rowid, meeting_id, transcript, timestamp, audio_start_time, audio_end_time, duration "
+                           "FROM transcripts WHERE rowid IN ({})",
+                           lambda row: {"id": row[1], "text": row[2], "timestamp": row[3], "audio_start_time": row[4],
+                                        "audio_end_time": row[5], "duration": row[6]}),
+        }
+        data = {}
+        for entity, (query, shape) in queries.items():
+            entity_ids = ids[entity]
+            for start in range(0, len(entity_ids), _LOOKUP_BATCH):
+                batch = entity_ids[start:start + _LOOKUP_BATCH]
+                cursor = await conn.execute(query.format(",".join("?" * len(batch))), batch)
+                for row in await cursor.fetchall():
+                    data[(entity, str(row[0]))] = shape(row)
+        return data
@@ -0,0 +1,165 @@
+"""
+Optional compression of large TEXT columns.
+
+Off by default: the desktop app opens the same SQLite file and reads
+``transcript_chunks`` and ``summary_processes`` as TEXT, so only set
+``MAITY_DB_COMPRESSION`` where the backend has the database to itself. New
+values of ``COMPRESSED_COLUMNS`` are then written compressed; existing rows
+are only rewritten by running this module (from backend/app):
+
+    python db/compression.py meeting_minutes.db --codec zlib   # compress
+    python db/compression.py meeting_minutes.db --codec none   # roll back to TEXT
+
+Either run also turns compressed ``summary_processes.result`` values left by
+earlier versions back into TEXT.
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import zlib
+from typing import Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+# Compressed values are stored as BLOBs starting with this header followed by a
+# one-byte codec id. A leading NUL can never start a legacy TEXT value, so old
+# uncompressed rows keep working without a flag column.
+MAGIC = b"\x00MZ"
+CODEC_ZLIB = b"z"
+CODEC_ZSTD = b"s"
+
+# (table, column) pairs stored through DatabaseBase.codec
+COMPRESSED_COLUMNS = [
+    ("transcript_chunks", "transcript_text"),
+    ("chunk_summaries", "result"),
+    ("summary_versions", "payload"),
+]
+# Columns other readers consume, always kept as plain TEXT
+PLAIN_COLUMNS = [
+    ("summary_processes", "result"),
+]
+
+
+class TextCodec:
+    """Transparent compression of large TEXT columns.
+
+    Configured from the environment:
+        MAITY_DB_COMPRESSION:           "none" (default), "zlib" or "zstd"
+        MAITY_DB_COMPRESSION_MIN_BYTES: values shorter than this stay plain TEXT (default 1024)
+
+    ``decode`` accepts both compressed BLOBs and plain TEXT, so switching the
+    setting never makes existing rows unreadable.
+    """
+
+    def __init__(self, codec: Optional[str] = None, min_bytes: Optional[int] = None, level: int = 6):
+        codec = (codec or os.getenv("MAITY_DB_COMPRESSION", "none")).lower()
+        if codec == "zstd" and zstandard is None:
+            logger.warning("MAITY_DB_COMPRESSION=zstd but the zstandard package is not installed; using zlib")
+            codec = "zlib"
+        if codec not in ("zlib", "zstd", "none"):
+            raise ValueError(f"Unsupported MAITY_DB_COMPRESSION codec: {codec}")
+
+        self.codec = codec
+        self.min_bytes = min_bytes if min_bytes is not None else int(os.getenv("MAITY_DB_COMPRESSION_MIN_BYTES", "1024"))
+        self.level = level
+        self._zstd_compressor = zstandard.ZstdCompressor(level=3) if codec == "zstd" else None
+
+    @property
+    def enabled(self) -> bool:
+        return self.codec != "none"
+
+    def encode(self, text: Optional[str]) -> Optional[Union[str, bytes]]:
+        """Compress ``text`` for storage when compression is enabled and worthwhile"""
+        if text is None or not self.enabled:
+            return text
+        raw = text.encode("utf-8")
+        if len(raw) < self.min_bytes:
+            return text
+        if self.codec == "zstd":
+            return MAGIC + CODEC_ZSTD + self._zstd_compressor.compress(raw)
+        return MAGIC + CODEC_ZLIB + zlib.compress(raw, self.level)
+
+    @staticmethod
+    def decode(value: Optional[Union[str, bytes]]) -> Optional[str]:
+        """Return the stored value as text, decompressing it if needed"""
+        if value is None or isinstance(value, str):
+            return value
+        value = bytes(value)
+        if value[:len(MAGIC)] != MAGIC:
+            return value.decode("utf-8")
+        codec, payload = value[len(MAGIC):len(MAGIC) + 1], value[len(MAGIC) + 1:]
+        if codec == CODEC_ZLIB:
+            return zlib.decompress(payload).decode("utf-8")
+        if codec == CODEC_ZSTD:
+            if zstandard is None:
+                raise RuntimeError("Value was compressed with zstd but the zstandard package is not installed")
+            return zstandard.ZstdDecompressor().decompress(payload).decode("utf-8")
+        raise ValueError(f"Unknown compression codec id: {codec!r}")
+
+
+def recode_columns(db_path: str, codec: TextCodec, batch_size: int = 100) -> Dict[str, int]:
+    """Rewrite stored values so they match ``codec``; returns rows changed per ``table.column``.
+
+    Compresses plain values of ``COMPRESSED_COLUMNS`` above the codec's
+    threshold, or decompresses them all when the codec is ``none``.
+    ``PLAIN_COLUMNS`` are always decompressed. Idempotent, one batch per
+    transaction, so it can be interrupted and run again.
+    """
+    plain = TextCodec("none")
+    targets = [(table, column, codec) for table, column in COMPRESSED_COLUMNS]
+    targets += [(table, column, plain) for table, column in PLAIN_COLUMNS]
+    changed = {}
+    with sqlite3.connect(db_path) as conn:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for table, column, target in targets:
+            if table not in tables:
+                continue  # created by a newer backend than the one that last opened this file
+            if target.enabled:
+                condition = f"typeof({column}) = 'text' AND length(CAST({column} AS BLOB)) >= {int(target.min_bytes)}"
+            else:
+                condition = f"typeof({column}) = 'blob'"
+            count = 0
+            last_rowid = 0
+            while True:
+                rows = conn.execute(f"""
+                    SELECT rowid, {column} FROM {table}
+                    WHERE {condition} AND rowid > ?
+                    ORDER BY rowid
+                    LIMIT ?
+                """, (last_rowid, batch_size)).fetchall()
+                if not rows:
+                    break
+                conn.executemany(f"UPDATE {table} SET {column} = ? WHERE rowid = ?",
+                                 [(target.encode(TextCodec.decode(value)), rowid) for rowid, value in rows])
+                conn.commit()
+                count += len(rows)
+                last_rowid = rows[-1][0]
+            changed[f"{table}.{column}"] = count
+            if count:
+                logger.info(f"Recoded {count} {table}.{column} values ({target.codec})")
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("database", nargs="?", default=os.getenv("DATABASE_PATH", "meeting_minutes.db"))
+    parser.add_argument("--codec", choices=("zlib", "zstd", "none"), required=True)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+    if not os.path.exists(args.database):
+        parser.error(f"No database at {args.database}")
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    for column, count in recode_columns(args.database, TextCodec(args.codec), args.batch_size).items():
+        print(f"{column}: {count} rows rewritten")
+    print("Run VACUUM to reclaim the freed space")
+
+
+if __name__ == "__main__":
+    main()
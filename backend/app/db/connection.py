@@ -12,14 +12,34 @@ except ImportError:
     sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
     from schema_validator import SchemaValidator
 
+from metrics import histogram
+
+from .compression import TextCodec
+
 logger = logging.getLogger(__name__)
 
+CONNECT_SECONDS = histogram("maity_db_connect_duration_seconds", "Time to open a SQLite connection")
+
+# Tables whose changes go to change_log: (table, entity, id column, meeting id column, events).
+# Transcript segments are only deleted along with their meeting, whose deletion implies theirs.
+CHANGE_LOG_TRIGGERS = [
+    ("meetings", "meeting", "id", "id", ("INSERT", "UPDATE", "DELETE")),
+    ("summary_processes", "summary", "meeting_id", "meeting_id", ("INSERT", "UPDATE", "DELETE")),
+    ("transcripts", "transcript", "rowid", "meeting_id", ("INSERT", "UPDATE")),
+]
+CHANGE_OPS = {"INSERT": "created", "UPDATE": "updated", "DELETE": "deleted"}
+CHANGE_LOG_MAX_ROWS = int(os.getenv("MAITY_CHANGE_LOG_MAX_ROWS", "200000"))
+
 
 class DatabaseBase:
     def __init__(self, db_path: str = None):
         if db_path is None:
             db_path = os.getenv('DATABASE_PATH', 'meeting_minutes.db')
         self.db_path = db_path
+        self.codec = TextCodec()
+        # Compressed storage keeps large transcripts cheap, so the cap can be higher
+        default_max_chars = 50_000_000 if self.codec.enabled else 10_000_000
+        self.max_transcript_chars = int(os.getenv("MAITY_MAX_TRANSCRIPT_CHARS", str(default_max_chars)))
         self.schema_validator = SchemaValidator(self.db_path)
         self._init_db()
 
@@ -93,6 +113,11 @@ class DatabaseBase:
                 cursor.execute("ALTER TABLE transcripts ADD COLUMN duration REAL")
             except sqlite3.OperationalError:
                 pass  # Column already exists
+            # Segments of a meeting in audio order, and audio-time windows of them
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_transcripts_meeting_audio
+                ON transcripts(meeting_id, audio_start_time)
+            """)
 
             # Create summary_processes table (keeping existing functionality)
             cursor.execute("""
@@ -112,6 +137,21 @@ class DatabaseBase:
                 )
             """)
 
+            # Migration: summary results stored pre-transformed (see summary.payload)
+            for column in ("result_format", "meeting_name"):
+                try:
+                    cursor.execute(f"ALTER TABLE summary_processes ADD COLUMN {column} TEXT")
+                    logger.info(f"Added {column} column to summary_processes table")
+                except sqlite3.OperationalError:
+                    pass  # Column already exists
+
+            # Migration: results cut short by a deadline are flagged partial
+            try:
+                cursor.execute("ALTER TABLE summary_processes ADD COLUMN partial INTEGER DEFAULT 0")
+                logger.info("Added partial column to summary_processes table")
+            except sqlite3.OperationalError:
+                pass  # Column already exists
+
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS transcript_chunks (
                     meeting_id TEXT PRIMARY KEY,
@@ -126,6 +166,92 @@ class DatabaseBase:
                 )
             """)
 
+            # Per-window results of incremental (live) summarization
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS summary_windows (
+                    meeting_id TEXT NOT NULL,
+                    window_index INTEGER NOT NULL,
+                    start_rowid INTEGER NOT NULL,
+                    end_rowid INTEGER NOT NULL,
+                    char_count INTEGER DEFAULT 0,
+                    result TEXT,
+                    model TEXT,
+                    model_name TEXT,
+                    created_at TEXT NOT NULL,
+                    PRIMARY KEY (meeting_id, window_index),
+                    FOREIGN KEY (meeting_id) REFERENCES meetings(id)
+                )
+            """)
+
+            # Per-chunk LLM results of the last summary run, reused by section regeneration
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS chunk_summaries (
+                    meeting_id TEXT NOT NULL,
+                    chunk_index INTEGER NOT NULL,
+                    result TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    PRIMARY KEY (meeting_id, chunk_index),
+                    FOREIGN KEY (meeting_id) REFERENCES meetings(id)
+                )
+            """)
+
+            # Summary history: the latest version holds the full payload, older
+            # versions hold the reverse diff against the version after them
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS summary_versions (
+                    meeting_id TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    model TEXT,
+                    prompt_hash TEXT,
+                    created_at TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    is_diff INTEGER NOT NULL DEFAULT 0,
+                    is_latest INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (meeting_id, version),
+                    FOREIGN KEY (meeting_id) REFERENCES meetings(id)
+                )
+            """)
+            cursor.execute("""
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_summary_versions_latest
+                ON summary_versions(meeting_id) WHERE is_latest = 1
+            """)
+
+            # Last committed sequence number of live-ingested segments per meeting
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS ingest_cursors (
+                    meeting_id TEXT PRIMARY KEY,
+                    last_seq INTEGER NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    FOREIGN KEY (meeting_id) REFERENCES meetings(id)
+                )
+            """)
+
+            # One row per LLM call, for latency/throughput stats per model. Rows
+            # outlive their meeting on purpose, so there is no foreign key.
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS llm_calls (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    meeting_id TEXT,
+                    provider TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    tier TEXT NOT NULL,
+                    chunk_index INTEGER,
+                    prompt_tokens INTEGER DEFAULT 0,
+                    completion_tokens INTEGER DEFAULT 0,
+                    ttft_ms REAL,
+                    latency_ms REAL NOT NULL,
+                    retries INTEGER DEFAULT 0,
+                    cached_tokens INTEGER DEFAULT 0,
+                    ok INTEGER NOT NULL DEFAULT 1,
+                    error TEXT,
+                    created_at TEXT NOT NULL
+                )
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_llm_calls_created
+                ON llm_calls(created_at)
+            """)
+
             # Create settings table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS settings (
@@ -154,12 +280,53 @@ class DatabaseBase:
                 )
             """)
 
+            # Change log read by /changes: one row per created/updated/deleted meeting,
+            # summary process and transcript segment, written by the triggers below
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='change_log'")
+            new_change_log = cursor.fetchone() is None
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS change_log (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    entity TEXT NOT NULL,
+                    entity_id TEXT NOT NULL,
+                    meeting_id TEXT,
+                    op TEXT NOT NULL,
+                    changed_at TEXT NOT NULL
+                )
+            """)
+            if new_change_log:
+                cursor.execute("SELECT EXISTS (SELECT 1 FROM meetings)")
+                if cursor.fetchone()[0]:
+                    # Meetings stored before the log existed were never logged: clients must resync once
+                    cursor.execute("""
+                        INSERT INTO change_log (entity, entity_id, op, changed_at)
+                        VALUES ('log', '', 'reset', strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+                    """)
+            for table, entity, key, meeting_key, events in CHANGE_LOG_TRIGGERS:
+                for event in events:
+                    row = "OLD" if event == "DELETE" else "NEW"
+                    cursor.execute(f"""
+                        CREATE TRIGGER IF NOT EXISTS change_log_{table}_{event.lower()}
+                        AFTER {event} ON {table}
+                        BEGIN
+                            INSERT INTO change_log (entity, entity_id, meeting_id, op, changed_at)
+                            VALUES ('{entity}', {row}.{key}, {row}.{meeting_key}, '{CHANGE_OPS[event]}',
+                                    strftime('%Y-%m-%dT%H:%M:%f', 'now'));
+                        END
+                    """)
+            # Bounded history; clients further behind than what is kept are told to resync
+            cursor.execute("DELETE FROM change_log WHERE seq <= (SELECT MAX(seq) FROM change_log) - ?",
+                           (CHANGE_LOG_MAX_ROWS,))
+
             conn.commit()
 
     @asynccontextmanager
     async def _get_connection(self):
         """Get a new database connection"""
-        conn = await aiosqlite.connect(self.db_path)
+        with CONNECT_SECONDS.time():
+            conn = await aiosqlite.connect(self.db_path)
+            # Lets SQL read compressed columns, e.g. LOWER(maity_text(transcript_text)) LIKE ?
+            await conn.create_function("maity_text", 1, TextCodec.decode, deterministic=True)
         try:
             yield conn
         finally:
@@ -0,0 +1,78 @@
+"""Compact structural diffs between JSON documents.
+
+Used by summary versioning: only the latest version of a summary is stored
+in full, older versions are stored as the patch that turns the next version
+back into them.
+
+Patch format (``None`` means "unchanged"):
+    {"~": "v", "v": value}                            replace the whole value
+    {"~": "d", "s": {k: v}, "d": [k], "p": {k: patch}} dict: set, delete, patch keys
+    {"~": "l", "h": n, "t": m, "m": [items]}          list: keep n head and m tail items,
+                                                       replace the middle with items
+"""
+from typing import Any, Optional
+
+
+def diff(source: Any, target: Any) -> Optional[dict]:
+    """Return the patch that turns ``source`` into ``target``"""
+    if source == target:
+        return None
+
+    if isinstance(source, dict) and isinstance(target, dict):
+        patch = {"~": "d"}
+        set_keys = {}
+        sub_patches = {}
+        for key, value in target.items():
+            if key not in source:
+                set_keys[key] = value
+            elif source[key] != value:
+                sub = diff(source[key], value)
+                if sub.get("~") == "v":
+                    set_keys[key] = value
+                else:
+                    sub_patches[key] = sub
+        deleted = [key for key in source if key not in target]
+        if set_keys:
+            patch["s"] = set_keys
+        if deleted:
+            patch["d"] = deleted
+        if sub_patches:
+            patch["p"] = sub_patches
+        return patch
+
+    if isinstance(source, list) and isinstance(target, list):
+        head = 0
+        limit = min(len(source), len(target))
+        while head < limit and source[head] == target[head]:
+            head += 1
+        tail = 0
+        while tail < limit - head and source[-1 - tail] == target[-1 - tail]:
+            tail += 1
+        return {"~": "l", "h": head, "t": tail, "m": target[head:len(target) - tail]}
+
+    return {"~": "v", "v": target}
+
+
+def patch(source: Any, delta: Optional[dict]) -> Any:
+    """Apply a patch produced by ``diff`` and return the new value"""
+    if delta is None:
+        return source
+
+    kind = delta["~"]
+    if kind == "v":
+        return delta["v"]
+
+    if kind == "d":
+        result = dict(source)
+        for key in delta.get("d", []):
+            result.pop(key, None)
+        for key, sub in delta.get("p", {}).items():
+            result[key] = patch(result[key], sub)
+        result.update(delta.get("s", {}))
+        return result
+
+    if kind == "l":
+        head, tail = delta["h"], delta["t"]
+        return source[:head] + delta["m"] + (source[len(source) - tail:] if tail else [])
+
+    raise ValueError(f"Unknown patch kind: {kind!r}")
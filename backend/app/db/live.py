@@ -0,0 +1,60 @@
+import json
+import logging
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class LiveSummaryMixin:
+    async def get_segments_after(self, meeting_id: str, after_rowid: int = 0, limit: int = 500) -> List[Tuple[int, str]]:
+        """Get transcript segments of a meeting appended after ``after_rowid``, in insertion order"""
+        async with self._get_connection() as conn:
+            cursor = await conn.execute("""
+                SELECT rowid, transcript
+                FROM transcripts
+                WHERE meeting_id = ? AND rowid > ?
+                ORDER BY rowid
+                LIMIT ?
+            """, (meeting_id, after_rowid, limit))
+            rows = await cursor.fetchall()
+            return [(row[0], row[1]) for row in rows]
+
+    async def save_summary_window(self, meeting_id: str, window_index: int, start_rowid: int, end_rowid: int,
+                                  char_count: int, result: List[Dict], model: str, model_name: str):
+        """Persist the per-chunk summaries of one completed live window"""
+        now = datetime.utcnow().isoformat()
+        try:
+            async with self._get_connection() as conn:
+                await conn.execute("""
+                    INSERT OR REPLACE INTO summary_windows (
+                        meeting_id, window_index, start_rowid, end_rowid, char_count,
+                        result, model, model_name, created_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (meeting_id, window_index, start_rowid, end_rowid, char_count,
+                      json.dumps(result), model, model_name, now))
+                await conn.commit()
+        except Exception as e:
+            logger.error(f"Error saving summary window {window_index} for meeting_id {meeting_id}: {str(e)}", exc_info=True)
+            raise
+
+    async def get_summary_windows(self, meeting_id: str) -> List[Dict]:
+        """Get all live summary windows of a meeting ordered by window index"""
+        async with self._get_connection() as conn:
+            cursor = await conn.execute("""
+                SELECT window_index, start_rowid, end_rowid, char_count, result, model, model_name, created_at
+                FROM summary_windows
+                WHERE meeting_id = ?
+                ORDER BY window_index
+            """, (meeting_id,))
+            rows = await cursor.fetchall()
+            return [{
+                'window_index': row[0],
+                'start_rowid': row[1],
+                'end_rowid': row[2],
+                'char_count': row[3],
+                'result': json.loads(row[4]) if row[4] else None,
+                'model': row[5],
+                'model_name': row[6],
+                'created_at': row[7]
+            } for row in rows]
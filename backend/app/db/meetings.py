@@ -32,6 +32,12 @@ class MeetingsMixin:
             logger.error(f"Error saving meeting: {str(e)}")
             raise
 
+    async def meeting_exists(self, meeting_id: str) -> bool:
+        """Check whether a meeting exists without loading its transcripts"""
+        async with self._get_connection() as conn:
+            cursor = await conn.execute("SELECT 1 FROM meetings WHERE id = ?", (meeting_id,))
+            return await cursor.fetchone() is not None
+
     async def get_meeting(self, meeting_id: str):
         """Get a meeting by ID with all its transcripts"""
         try:
@@ -74,6 +80,19 @@ class MeetingsMixin:
             logger.error(f"Error getting meeting: {str(e)}")
             raise
 
+    async def get_meeting_info(self, meeting_id: str):
+        """Get a meeting's details without its transcripts"""
+        async with self._get_connection() as conn:
+            cursor = await conn.execute("""
+                SELECT id, title, created_at, updated_at
+                FROM meetings
+                WHERE id = ?
+            """, (meeting_id,))
+            row = await cursor.fetchone()
+            if not row:
+                return None
+            return {'id': row[0], 'title': row[1], 'created_at': row[2], 'updated_at': row[3]}
+
     async def get_all_meetings(self):
         """Get all meetings with basic information"""
         async with self._get_connection() as conn:
@@ -143,6 +162,12 @@ class MeetingsMixin:
                     # Delete from transcript_chunks
                     await conn.execute("DELETE FROM transcript_chunks WHERE meeting_id = ?", (meeting_id,))
 
+                    # Delete from summary_windows, chunk_summaries, summary_versions and ingest_cursors
+                    await conn.execute("DELETE FROM chunk_summaries WHERE meeting_id = ?", (meeting_id,))
+                    await conn.execute("DELETE FROM summary_versions WHERE meeting_id = ?", (meeting_id,))
+                    await conn.execute("DELETE FROM ingest_cursors WHERE meeting_id = ?", (meeting_id,))
+                    await conn.execute("DELETE FROM summary_windows WHERE meeting_id = ?", (meeting_id,))
+
                     # Delete from summary_processes
                     await conn.execute("DELETE FROM summary_processes WHERE meeting_id = ?", (meeting_id,))
 
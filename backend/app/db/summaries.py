@@ -1,7 +1,7 @@
 import json
 import logging
 from datetime import datetime
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Union
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +21,8 @@ class SummariesMixin:
                     await conn.execute(
                         """
                         UPDATE summary_processes
-                        SET status = ?, updated_at = ?, start_time = ?, error = NULL, result = NULL
+                        SET status = ?, updated_at = ?, start_time = ?, error = NULL, result = NULL,
+                            result_format = NULL, meeting_name = NULL, partial = 0
                         WHERE meeting_id = ?
                         """,
                         ("PENDING", now, now, meeting_id)
@@ -48,10 +49,16 @@ class SummariesMixin:
 
         return meeting_id
 
-    async def update_process(self, meeting_id: str, status: str, result: Optional[Dict] = None, error: Optional[str] = None,
+    async def update_process(self, meeting_id: str, status: str, result: Optional[Union[Dict, str]] = None, error: Optional[str] = None,
                            chunk_count: Optional[int] = None, processing_time: Optional[float] = None,
-                           metadata: Optional[Dict] = None):
-        """Update a process status and result"""
+                           metadata: Optional[Dict] = None, result_format: Optional[str] = None,
+                           meeting_name: Optional[str] = None, partial: Optional[bool] = None):
+        """Update a process status and result.
+
+        ``result`` may be a dict (serialized here) or an already serialized
+        JSON string, which is stored as-is instead of being encoded twice.
+        ``partial`` marks a result cut short by the job's deadline.
+        """
         now = datetime.utcnow().isoformat()
 
         try:
@@ -66,9 +73,13 @@ class SummariesMixin:
                     if result:
                         # Validate result can be JSON serialized
                         try:
-                            result_json = json.dumps(result)
+                            result_json = result if isinstance(result, str) else json.dumps(result)
                             update_fields.append("result = ?")
                             params.append(result_json)
+                            update_fields.append("result_format = ?")
+                            params.append(result_format)
+                            update_fields.append("meeting_name = ?")
+                            params.append(meeting_name)
                         except (TypeError, ValueError) as e:
                             logger.error(f"Failed to serialize result for meeting_id {meeting_id}: {str(e)}")
                             raise ValueError("Result data cannot be JSON serialized")
@@ -87,6 +98,10 @@ class SummariesMixin:
                         update_fields.append("processing_time = ?")
                         params.append(processing_time)
 
+                    if partial is not None:
+                        update_fields.append("partial = ?")
+                        params.append(int(partial))
+
                     if metadata:
                         # Validate metadata can be JSON serialized
                         try:
@@ -120,8 +135,95 @@ class SummariesMixin:
             logger.error(f"Database connection error in update_process: {str(e)}", exc_info=True)
             raise
 
-    async def update_meeting_summary(self, meeting_id: str, summary: dict):
-        """Update a meeting's summary"""
+    async def save_chunk_summaries(self, meeting_id: str, chunk_results: List[str]):
+        """Replace the cached per-chunk summary JSON of a meeting"""
+        now = datetime.utcnow().isoformat()
+        try:
+            async with self._get_connection() as conn:
+                await conn.execute("BEGIN TRANSACTION")
+
+                try:
+                    await conn.execute("DELETE FROM chunk_summaries WHERE meeting_id = ?", (meeting_id,))
+                    await conn.executemany("""
+                        INSERT INTO chunk_summaries (meeting_id, chunk_index, result, created_at)
+                        VALUES (?, ?, ?, ?)
+                    """, [(meeting_id, index, self.codec.encode(result), now) for index, result in enumerate(chunk_results)])
+                    await conn.commit()
+
+                except Exception as e:
+                    await conn.rollback()
+                    logger.error(f"Failed to save chunk summaries for meeting_id {meeting_id}: {str(e)}", exc_info=True)
+                    raise
+
+        except Exception as e:
+            logger.error(f"Database connection error in save_chunk_summaries: {str(e)}", exc_info=True)
+            raise
+
+    async def get_chunk_summaries(self, meeting_id: str) -> List[str]:
+        """Get the cached per-chunk summary JSON of a meeting in chunk order"""
+        async with self._get_connection() as conn:
+            cursor = await conn.execute("""
+                SELECT result FROM chunk_summaries
+                WHERE meeting_id = ?
+                ORDER BY chunk_index
+            """, (meeting_id,))
+            rows = await cursor.fetchall()
+            return [self.codec.decode(row[0]) for row in rows]
+
+    async def get_summary_result(self, meeting_id: str) -> Optional[Dict]:
+        """Get the summary process row of a meeting with its stored result as text"""
+        async with self._get_connection() as conn:
+            cursor = await conn.execute("""
+                SELECT status, result, error, start_time, end_time, result_format, meeting_name, partial
+                FROM summary_processes
+                WHERE meeting_id = ?
+            """, (meeting_id,))
+            row = await cursor.fetchone()
+            if not row:
+                return None
+            data = dict(zip([col[0] for col in cursor.description], row))
+            data["result"] = self.codec.decode(data["result"])
+            data["partial"] = bool(data["partial"])
+            return data
+
+    async def get_tier_latency(self, model: str, tier: str = "extract", limit: int = 20) -> Dict:
+        """Sum the per-tier LLM stats of the last ``limit`` completed jobs that ran ``model``.
+
+        ``model`` is a "provider/model_name" label and ``tier`` is "extract" or
+        "reduce", as stored in ``metadata["tiers"]`` by the summary pipeline.
+        """
+        if tier not in ("extract", "reduce"):
+            raise ValueError(f"Unknown tier: {tier}")
+        path = f"$.tiers.{tier}"
+        async with self._get_connection() as conn:
+            cursor = await conn.execute(f"""
+                SELECT COUNT(*),
+                       COALESCE(SUM(calls), 0), COALESCE(SUM(latency_ms), 0), COALESCE(SUM(input_tokens), 0),
+                       COALESCE(SUM(output_tokens), 0)
+                FROM (
+                    SELECT json_extract(metadata, '{path}.calls') AS calls,
+                           json_extract(metadata, '{path}.latency_ms') AS latency_ms,
+                           json_extract(metadata, '{path}.input_tokens') AS input_tokens,
+                           json_extract(metadata, '{path}.output_tokens') AS output_tokens
+                    FROM summary_processes
+                    WHERE status = 'completed' AND json_valid(metadata)
+                      AND json_extract(metadata, '{path}.model') = ?
+                    ORDER BY updated_at DESC
+                    LIMIT ?
+                )
+            """, (model, limit))
+            jobs, calls, latency_ms, input_tokens, output_tokens = await cursor.fetchone()
+            return {"jobs": jobs, "calls": calls, "latency_ms": latency_ms,
+                    "input_tokens": input_tokens, "output_tokens": output_tokens}
+
+    async def update_meeting_summary(self, meeting_id: str, summary: Union[dict, str],
+                                     result_format: Optional[str] = None, meeting_name: Optional[str] = None,
+                                     expected_version: Optional[int] = None) -> int:
+        """Save an edited summary as a new version (a dict, or JSON already serialized in ``result_format``).
+
+        Returns the new version number; raises VersionConflictError when
+        ``expected_version`` is no longer the latest version.
+        """
         now = datetime.utcnow().isoformat()
         try:
             async with self._get_connection() as conn:
@@ -132,13 +234,13 @@ class SummariesMixin:
                 if not meeting:
                     raise ValueError(f"Meeting with ID {meeting_id} not found")
 
-                # Update the summary in the summary_processes table
-                await conn.execute("""
-                    UPDATE summary_processes
-                    SET result = ?, updated_at = ?
-                    WHERE meeting_id = ?
-                """, (json.dumps(summary), now, meeting_id))
+            summary_json = summary if isinstance(summary, str) else json.dumps(summary)
+            version = await self.add_summary_version(
+                meeting_id, summary_json, model="user-edit", result_format=result_format,
+                meeting_name=meeting_name, expected_version=expected_version
+            )
 
+            async with self._get_connection() as conn:
                 # Update the meeting's updated_at timestamp
                 await conn.execute("""
                     UPDATE meetings
@@ -147,7 +249,7 @@ class SummariesMixin:
                 """, (now, meeting_id))
 
                 await conn.commit()
-                return True
+                return version
         except Exception as e:
             logger.error(f"Error updating meeting summary: {str(e)}")
             raise
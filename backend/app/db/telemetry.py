@@ -0,0 +1,143 @@
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_CALL_COLUMNS = ("provider", "model", "tier", "chunk_index", "prompt_tokens", "completion_tokens",
+                 "ttft_ms", "latency_ms", "retries", "cached_tokens", "ok", "error", "created_at")
+
+
+def _percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class TelemetryMixin:
+    async def record_llm_calls(self, meeting_id: Optional[str], calls: List[Dict]):
+        """Store one ``llm_calls`` row per LLM call record (see ``summary.TierStats.records``)"""
+        if not calls:
+            return
+        try:
+            async with self._get_connection() as conn:
+                await conn.executemany(f"""
+                    INSERT INTO llm_calls (meeting_id, {', '.join(_CALL_COLUMNS)})
+                    VALUES (?, {', '.join('?' for _ in _CALL_COLUMNS)})
+                """, [(meeting_id, *(call.get(column) for column in _CALL_COLUMNS)) for call in calls])
+                await conn.commit()
+        except Exception as e:
+            logger.error(f"Error recording {len(calls)} LLM calls for meeting_id {meeting_id}: {str(e)}", exc_info=True)
+            raise
+
+    async def get_llm_calls(self, meeting_id: str) -> List[Dict]:
+        """Get the recorded LLM calls of a meeting, oldest first"""
+        async with self._get_connection() as conn:
+            cursor = await conn.execute(f"""
+                SELECT {', '.join(_CALL_COLUMNS)}
+                FROM llm_calls
+                WHERE meeting_id = ?
+                ORDER BY id
+            """, (meeting_id,))
+            rows = await cursor.fetchall()
+            return [dict(zip(_CALL_COLUMNS, row)) for row in rows]
+
+    async def get_llm_call_latency(self, provider: str, model: str, tier: str = "extract", limit: int = 200) -> Dict:
+        """Sum the latency and token counts of the last ``limit`` successful calls of a model and tier.
+
+        Besides the totals (the shape of ``get_tier_latency``) it returns the
+        sums a least-squares fit of latency against prompt tokens needs, and
+        the same totals over the calls that recorded a time to first token.
+        """
+        async with self._get_connection() as conn:
+            cursor = await conn.execute("""
+                SELECT COUNT(*),
+                       COALESCE(SUM(latency_ms), 0), COALESCE(SUM(prompt_tokens), 0),
+                       COALESCE(SUM(completion_tokens), 0),
+                       COALESCE(SUM(prompt_tokens * prompt_tokens), 0), COALESCE(SUM(prompt_tokens * latency_ms), 0),
+                       COUNT(ttft_ms), COALESCE(SUM(ttft_ms), 0),
+                       COALESCE(SUM(CASE WHEN ttft_ms IS NOT NULL THEN latency_ms END), 0),
+                       COALESCE(SUM(CASE WHEN ttft_ms IS NOT NULL THEN prompt_tokens END), 0)
+                FROM (
+                    SELECT latency_ms, COALESCE(prompt_tokens, 0) AS prompt_tokens,
+                           COALESCE(completion_tokens, 0) AS completion_tokens, ttft_ms
+                    FROM llm_calls
+                    WHERE provider = ? AND model = ? AND tier = ? AND ok = 1
+                    ORDER BY id DESC
+                    LIMIT ?
+                )
+            """, (provider, model, tier, limit))
+            row = await cursor.fetchone()
+        keys = ("calls", "latency_ms", "input_tokens", "output_tokens", "input_tokens_sq", "input_tokens_latency",
+                "ttft_calls", "ttft_ms", "ttft_latency_ms", "ttft_input_tokens")
+        return dict(zip(keys, row))
+
+    async def get_llm_call_stats(self, since: str, until: Optional[str] = None, provider: Optional[str] = None,
+                                 model: Optional[str] = None, tier: Optional[str] = None) -> List[Dict]:
+        """Latency and throughput of the LLM calls made between ``since`` and ``until`` (ISO timestamps).
+
+        Returns one entry per provider/model/tier with call and failure
+        counts, p50/p95 latency and time-to-first-token, and tokens/sec (the
+        median per call, plus completion tokens over total latency).
+        Percentiles only cover successful calls.
+        """
+        filters, params = ["created_at >= ?"], [since]
+        for column, value in (("created_at <", until), ("provider =", provider), ("model =", model), ("tier =", tier)):
+            if value is not None:
+                filters.append(f"{column} ?")
+                params.append(value)
+
+        async with self._get_connection() as conn:
+            cursor = await conn.execute(f"""
+                SELECT provider, model, tier, ok, latency_ms, ttft_ms, prompt_tokens, completion_tokens,
+                       retries, cached_tokens
+                FROM llm_calls
+                WHERE {' AND '.join(filters)}
+                ORDER BY provider, model, tier
+            """, params)
+            rows = await cursor.fetchall()
+
+        groups: Dict[tuple, Dict] = {}
+        for provider_, model_, tier_, ok, latency_ms, ttft_ms, prompt_tokens, completion_tokens, retries, cached in rows:
+            group = groups.setdefault((provider_, model_, tier_), {
+                "calls": 0, "failures": 0, "retries": 0, "cache_hits": 0,
+                "latency": [], "ttft": [], "tps": [], "prompt_tokens": 0, "completion_tokens": 0, "latency_total": 0.0,
+            })
+            group["calls"] += 1
+            group["retries"] += retries or 0
+            group["cache_hits"] += 1 if cached else 0
+            if not ok:
+                group["failures"] += 1
+                continue
+            group["latency"].append(latency_ms)
+            group["latency_total"] += latency_ms
+            group["prompt_tokens"] += prompt_tokens or 0
+            group["completion_tokens"] += completion_tokens or 0
+            if ttft_ms is not None:
+                group["ttft"].append(ttft_ms)
+            if latency_ms:
+                group["tps"].append((completion_tokens or 0) / (latency_ms / 1000))
+
+        stats = []
+        for (provider_, model_, tier_), group in groups.items():
+            latency, ttft, tps = sorted(group["latency"]), sorted(group["ttft"]), sorted(group["tps"])
+            stats.append({
+                "provider": provider_,
+                "model": model_,
+                "tier": tier_,
+                "calls": group["calls"],
+                "failures": group["failures"],
+                "retries": group["retries"],
+                "cache_hits": group["cache_hits"],
+                "latency_ms": {"p50": _percentile(latency, 50), "p95": _percentile(latency, 95)},
+                "ttft_ms": {"p50": _percentile(ttft, 50), "p95": _percentile(ttft, 95)},
+                "tokens_per_sec": {
+                    "p50": round(_percentile(tps, 50), 2) if tps else None,
+                    "overall": round(group["completion_tokens"] / (group["latency_total"] / 1000), 2)
+                    if group["latency_total"] else None,
+                },
+                "prompt_tokens": group["prompt_tokens"],
+                "completion_tokens": group["completion_tokens"],
+            })
+        return stats
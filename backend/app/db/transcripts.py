@@ -1,6 +1,7 @@
 import logging
 import sqlite3
 from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +30,76 @@ class TranscriptsMixin:
             logger.error(f"Error saving transcript: {str(e)}")
             raise
 
+    async def append_meeting_segments(self, segments: List) -> List[bool]:
+        """Insert a batch of live segments (possibly for several meetings) in one transaction.
+
+        Segments whose ``seq`` is not greater than the meeting's last committed
+        sequence number are retries and are skipped, as are segments of
+        meetings deleted while they were queued or journaled. Returns, for
+        each input segment, whether it was inserted.
+        """
+        if not segments:
+            return []
+
+        now = datetime.utcnow().isoformat()
+        try:
+            async with self._get_connection() as conn:
+                await conn.execute("BEGIN TRANSACTION")
+
+                try:
+                    meeting_ids = list({segment.meeting_id for segment in segments})
+                    placeholders = ",".join("?" * len(meeting_ids))
+                    cursor = await conn.execute(
+                        f"SELECT meeting_id, last_seq FROM ingest_cursors WHERE meeting_id IN ({placeholders})",
+                        meeting_ids
+                    )
+                    last_seq = {row[0]: row[1] for row in await cursor.fetchall()}
+                    cursor = await conn.execute(f"SELECT id FROM meetings WHERE id IN ({placeholders})", meeting_ids)
+                    existing = {row[0] for row in await cursor.fetchall()}
+
+                    accepted = []
+                    rows = []
+                    for segment in segments:
+                        if segment.meeting_id not in existing or segment.seq <= last_seq.get(segment.meeting_id, -1):
+                            accepted.append(False)
+                            continue
+                        last_seq[segment.meeting_id] = segment.seq
+                        accepted.append(True)
+                        rows.append((segment.meeting_id, segment.text, segment.timestamp, "", "", "",
+                                     segment.audio_start_time, segment.audio_end_time, segment.duration))
+
+                    if rows:
+                        await conn.executemany("""
+                            INSERT INTO transcripts (
+                                meeting_id, transcript, timestamp, summary, action_items, key_points,
+                                audio_start_time, audio_end_time, duration
+                            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        """, rows)
+                        await conn.executemany("""
+                            INSERT INTO ingest_cursors (meeting_id, last_seq, updated_at)
+                            VALUES (?, ?, ?)
+                            ON CONFLICT(meeting_id) DO UPDATE SET last_seq = excluded.last_seq, updated_at = excluded.updated_at
+                        """, [(meeting_id, seq, now) for meeting_id, seq in last_seq.items()])
+
+                    await conn.commit()
+                    return accepted
+
+                except Exception as e:
+                    await conn.rollback()
+                    logger.error(f"Failed to append {len(segments)} segments: {str(e)}", exc_info=True)
+                    raise
+
+        except Exception as e:
+            logger.error(f"Database connection error in append_meeting_segments: {str(e)}", exc_info=True)
+            raise
+
+    async def get_last_ingested_seq(self, meeting_id: str) -> int:
+        """Get the last committed live-ingest sequence number of a meeting (-1 if none)"""
+        async with self._get_connection() as conn:
+            cursor = await conn.execute("SELECT last_seq FROM ingest_cursors WHERE meeting_id = ?", (meeting_id,))
+            row = await cursor.fetchone()
+            return row[0] if row else -1
+
     async def save_transcript(self, meeting_id: str, transcript_text: str, model: str, model_name: str,
                             chunk_size: int, overlap: int):
         """Save transcript data"""
@@ -39,10 +110,11 @@ class TranscriptsMixin:
             raise ValueError("transcript_text cannot be empty")
         if chunk_size <= 0 or overlap < 0:
             raise ValueError("Invalid chunk_size or overlap values")
-        if len(transcript_text) > 10_000_000:  # 10MB limit
-            raise ValueError("Transcript text too large (>10MB)")
+        if len(transcript_text) > self.max_transcript_chars:
+            raise ValueError(f"Transcript text too large (>{self.max_transcript_chars} chars)")
 
         now = datetime.utcnow().isoformat()
+        stored_text = self.codec.encode(transcript_text)
 
         try:
             async with self._get_connection() as conn:
@@ -54,14 +126,14 @@ class TranscriptsMixin:
                         UPDATE transcript_chunks
                         SET transcript_text = ?, model = ?, model_name = ?, chunk_size = ?, overlap = ?, created_at = ?
                         WHERE meeting_id = ?
-                    """, (transcript_text, model, model_name, chunk_size, overlap, now, meeting_id))
+                    """, (stored_text, model, model_name, chunk_size, overlap, now, meeting_id))
 
                     # If no rows were updated, insert a new one
                     if conn.total_changes == 0:
                         await conn.execute("""
                             INSERT INTO transcript_chunks (meeting_id, transcript_text, model, model_name, chunk_size, overlap, created_at)
                             VALUES (?, ?, ?, ?, ?, ?, ?)
-                        """, (meeting_id, transcript_text, model, model_name, chunk_size, overlap, now))
+                        """, (meeting_id, stored_text, model, model_name, chunk_size, overlap, now))
 
                     await conn.commit()
                     logger.info(f"Successfully saved transcript for meeting_id: {meeting_id} (size: {len(transcript_text)} chars)")
@@ -86,9 +158,64 @@ class TranscriptsMixin:
             """, (meeting_id,)) as cursor:
                 row = await cursor.fetchone()
                 if row:
-                    return dict(zip([col[0] for col in cursor.description], row))
+                    data = dict(zip([col[0] for col in cursor.description], row))
+                    data["transcript_text"] = self.codec.decode(data.get("transcript_text"))
+                    data["result"] = self.codec.decode(data.get("result"))
+                    return data
                 return None
 
+    async def iter_meeting_segments(self, meeting_id: str, start: Optional[float] = None,
+                                    end: Optional[float] = None, batch_size: int = 500) -> AsyncIterator[List[Dict]]:
+        """Yield a meeting's transcript segments in audio order, ``batch_size`` at a time.
+
+        With ``start``/``end`` (seconds of recording time) only segments
+        overlapping ``[start, end)`` are read, through the
+        ``(meeting_id, audio_start_time)`` index; segments without audio times
+        then never match. The index range reaches back by the meeting's longest
+        segment, so one already playing at ``start`` is included however long
+        it is. Rows are pulled with ``fetchmany``, so memory stays bounded by
+        one batch however long the meeting is.
+
+        An async generator, so it is not timed by ``DatabaseManager``'s
+        per-method instrumentation.
+        """
+        conditions = ["meeting_id = ?"]
+        params: List = [meeting_id]
+        if end is not None:
+            conditions.append("audio_start_time < ?")
+            params.append(end)
+
+        async with self._get_connection() as conn:
+            if start is not None:
+                cursor = await conn.execute("""
+                    SELECT COALESCE(MAX(audio_end_time - audio_start_time), 0)
+                    FROM transcripts
+                    WHERE meeting_id = ?
+                """, (meeting_id,))
+                lookback = (await cursor.fetchone())[0]
+                conditions.append("audio_start_time >= ? AND audio_end_time > ?")
+                params += [start - lookback, start]
+
+            async with conn.execute(f"""
+                SELECT transcript, timestamp, audio_start_time, audio_end_time, duration
+                FROM transcripts
+                WHERE {" AND ".join(conditions)}
+                ORDER BY audio_start_time, rowid
+            """, params) as cursor:
+                while True:
+                    rows = await cursor.fetchmany(batch_size)
+                    if not rows:
+                        return
+                    # Same segment shape as get_meeting
+                    yield [{
+                        'id': meeting_id,
+                        'text': row[0],
+                        'timestamp': row[1],
+                        'audio_start_time': row[2],
+                        'audio_end_time': row[3],
+                        'duration': row[4]
+                    } for row in rows]
+
     async def search_transcripts(self, query: str):
         """Search through meeting transcripts for the given query"""
         if not query or query.strip() == "":
@@ -112,10 +239,10 @@ class TranscriptsMixin:
 
                 # Also search in transcript_chunks for full transcripts
                 cursor2 = await conn.execute("""
-                    SELECT m.id, m.title, tc.transcript_text
+                    SELECT m.id, m.title, maity_text(tc.transcript_text)
                     FROM meetings m
                     JOIN transcript_chunks tc ON m.id = tc.meeting_id
-                    WHERE LOWER(tc.transcript_text) LIKE ?
+                    WHERE LOWER(maity_text(tc.transcript_text)) LIKE ?
                     AND m.id NOT IN (SELECT DISTINCT meeting_id FROM transcripts WHERE LOWER(transcript) LIKE ?)
                     ORDER BY m.created_at DESC
                 """, (search_query, search_query))
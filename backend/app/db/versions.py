@@ -0,0 +1,180 @@
+import json
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .jsondiff import diff, patch
+
+logger = logging.getLogger(__name__)
+
+
+class VersionConflictError(Exception):
+    """Raised when a summary is saved against a version that is no longer the latest"""
+    def __init__(self, meeting_id: str, expected: int, latest: int):
+        self.meeting_id = meeting_id
+        self.expected = expected
+        self.latest = latest
+        super().__init__(f"Summary of meeting {meeting_id} is at version {latest}, not {expected}")
+
+
+class SummaryVersionsMixin:
+    async def add_summary_version(self, meeting_id: str, payload_json: str, model: str = "",
+                                  prompt_hash: str = "", result_format: Optional[str] = None,
+                                  meeting_name: Optional[str] = None,
+                                  expected_version: Optional[int] = None) -> int:
+        """Store a new summary version and make it the current summary.
+
+        The previous latest version is rewritten as a reverse diff against the
+        new one, so history costs roughly the size of the changes. When
+        ``expected_version`` is given and is not the latest version,
+        ``VersionConflictError`` is raised and nothing is written.
+
+        Returns the new version number.
+        """
+        now = datetime.utcnow().isoformat()
+        try:
+            async with self._get_connection() as conn:
+                await conn.execute("BEGIN IMMEDIATE")
+
+                try:
+                    cursor = await conn.execute("""
+                        SELECT version, payload FROM summary_versions
+                        WHERE meeting_id = ? AND is_latest = 1
+                    """, (meeting_id,))
+                    latest = await cursor.fetchone()
+                    latest_version = latest[0] if latest else 0
+
+                    if expected_version is not None and expected_version != latest_version:
+                        raise VersionConflictError(meeting_id, expected_version, latest_version)
+
+                    if latest:
+                        previous = json.loads(self.codec.decode(latest[1]))
+                        reverse_delta = diff(json.loads(payload_json), previous)
+                        await conn.execute("""
+                            UPDATE summary_versions
+                            SET payload = ?, is_diff = 1, is_latest = 0
+                            WHERE meeting_id = ? AND version = ?
+                        """, (self.codec.encode(json.dumps(reverse_delta)), meeting_id, latest_version))
+
+                    version = latest_version + 1
+                    await conn.execute("""
+                        INSERT INTO summary_versions (
+                            meeting_id, version, model, prompt_hash, created_at, payload, is_diff, is_latest
+                        ) VALUES (?, ?, ?, ?, ?, ?, 0, 1)
+                    """, (meeting_id, version, model, prompt_hash, now, self.codec.encode(payload_json)))
+
+                    # Keep the current summary where /get-summary reads it
+                    await conn.execute("""
+                        UPDATE summary_processes
+                        SET result = ?, result_format = ?, meeting_name = ?, updated_at = ?
+                        WHERE meeting_id = ?
+                    """, (payload_json, result_format, meeting_name, now, meeting_id))
+
+                    await conn.commit()
+                    logger.info(f"Stored summary version {version} for meeting_id: {meeting_id}")
+                    return version
+
+                except Exception:
+                    await conn.rollback()
+                    raise
+
+        except VersionConflictError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to add summary version for meeting_id {meeting_id}: {str(e)}", exc_info=True)
+            raise
+
+    async def restore_latest_summary_version(self, meeting_id: str,
+                                             result_format: Optional[str] = None) -> Optional[int]:
+        """Make the latest stored version the current summary again.
+
+        A re-run replaces the current summary with its preview, so when the
+        run fails or is cancelled the previous summary is put back and the
+        process marked completed; its error is kept on the row. Returns the
+        restored version, or None (row untouched) when there is no version.
+        """
+        now = datetime.utcnow().isoformat()
+        async with self._get_connection() as conn:
+            cursor = await conn.execute("""
+                SELECT version, payload FROM summary_versions
+                WHERE meeting_id = ? AND is_latest = 1
+            """, (meeting_id,))
+            latest = await cursor.fetchone()
+            if not latest:
+                return None
+
+            payload_json = self.codec.decode(latest[1])
+            meeting_name = json.loads(payload_json).get("MeetingName") or ""
+            await conn.execute("""
+                UPDATE summary_processes
+                SET status = 'completed', result = ?, result_format = ?, meeting_name = ?,
+                    partial = 0, updated_at = ?
+                WHERE meeting_id = ?
+            """, (payload_json, result_format, meeting_name, now, meeting_id))
+            await conn.commit()
+            logger.info(f"Restored summary version {latest[0]} for meeting_id: {meeting_id}")
+            return latest[0]
+
+    async def get_latest_summary_version(self, meeting_id: str) -> Optional[Dict]:
+        """Get the current summary version of a meeting (single indexed lookup)"""
+        async with self._get_connection() as conn:
+            cursor = await conn.execute("""
+                SELECT version, model, prompt_hash, created_at, payload
+                FROM summary_versions
+                WHERE meeting_id = ? AND is_latest = 1
+            """, (meeting_id,))
+            row = await cursor.fetchone()
+            if not row:
+                return None
+            return {
+                'version': row[0],
+                'model': row[1],
+                'prompt_hash': row[2],
+                'created_at': row[3],
+                'payload': self.codec.decode(row[4])
+            }
+
+    async def list_summary_versions(self, meeting_id: str) -> List[Dict]:
+        """List the summary history of a meeting, newest first, without payloads"""
+        async with self._get_connection() as conn:
+            cursor = await conn.execute("""
+                SELECT version, model, prompt_hash, created_at, is_latest
+                FROM summary_versions
+                WHERE meeting_id = ?
+                ORDER BY version DESC
+            """, (meeting_id,))
+            rows = await cursor.fetchall()
+            return [{
+                'version': row[0],
+                'model': row[1],
+                'prompt_hash': row[2],
+                'created_at': row[3],
+                'is_latest': bool(row[4])
+            } for row in rows]
+
+    async def get_summary_version(self, meeting_id: str, version: int) -> Optional[Dict]:
+        """Reconstruct a given version by applying reverse diffs down from the latest"""
+        async with self._get_connection() as conn:
+            cursor = await conn.execute("""
+                SELECT version, model, prompt_hash, created_at, payload, is_diff
+                FROM summary_versions
+                WHERE meeting_id = ? AND version >= ?
+                ORDER BY version DESC
+            """, (meeting_id, version))
+            rows = await cursor.fetchall()
+
+        if not rows or rows[-1][0] != version or rows[0][5]:
+            return None
+
+        document = json.loads(self.codec.decode(rows[0][4]))
+        for row in rows[1:]:
+            document = patch(document, json.loads(self.codec.decode(row[4])))
+
+        target = rows[-1]
+        return {
+            'version': target[0],
+            'model': target[1],
+            'prompt_hash': target[2],
+            'created_at': target[3],
+            'payload': document
+        }
@@ -0,0 +1,9 @@
+"""
+Live ingest of transcript segments into existing meetings.
+
+    from ingest import IngestBatcher, Segment, SegmentJournal
+"""
+from .batcher import IngestBatcher, IngestGapError, Segment
+from .journal import SegmentJournal
+
+__all__ = ["IngestBatcher", "IngestGapError", "Segment", "SegmentJournal"]
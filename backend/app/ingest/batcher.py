@@ -0,0 +1,307 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Segment:
+    """One transcript segment appended to a live meeting.
+
+    ``seq`` is assigned by the recorder and increases per meeting; the server
+    uses it to drop segments it has already committed when a client retries.
+    """
+    meeting_id: str
+    seq: int
+    text: str
+    timestamp: str
+    audio_start_time: Optional[float] = None
+    audio_end_time: Optional[float] = None
+    duration: Optional[float] = None
+
+
+class IngestGapError(Exception):
+    """A segment was refused because an earlier segment of its meeting failed to commit"""
+
+
+class IngestBatcher:
+    """Group-commits appended segments.
+
+    Segments from every live meeting share one bounded queue. A single writer
+    task drains it every ``flush_interval_ms`` (or as soon as ``max_batch``
+    segments are waiting). ``submit`` blocks while the queue is full, so memory
+    stays bounded no matter how long a meeting runs or how fast clients push.
+
+    Without a journal each drained batch is committed to SQLite in one
+    transaction before it is acknowledged. With a ``SegmentJournal`` the batch
+    is acknowledged as soon as it is fsynced to the journal, and a separate
+    compactor task moves journaled segments into the ``transcripts`` table in
+    large transactions (up to ``compact_batch`` segments every
+    ``compact_interval_ms``). ``recover`` replays anything a crash left in the
+    journal.
+
+    When a batch fails, later segments of the same meeting are refused with
+    ``IngestGapError`` until the client resends from the first failed
+    ``seq``: committing them would move the meeting's last ``seq`` past the
+    failed segments, and the resent ones would then be dropped as duplicates.
+    """
+
+    def __init__(self, db, journal=None, flush_interval_ms: int = 50, max_batch: int = 500, max_queued: int = 5000,
+                 compact_interval_ms: int = 1000, compact_batch: int = 5000,
+                 on_commit: Optional[Callable[[str], None]] = None):
+        self.db = db
+        self.journal = journal
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.max_batch = max_batch
+        self.max_queued = max_queued
+        self.compact_interval = compact_interval_ms / 1000.0
+        self.compact_batch = compact_batch
+        self.on_commit = on_commit
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._compactor: Optional[asyncio.Task] = None
+        self._last_seq: Dict[str, int] = {}
+        self._failed_seq: Dict[str, int] = {}  # lowest seq of a failed batch, per meeting
+        self._backlog: List[Segment] = []  # journaled, not yet in SQLite
+        self._backlog_ready: Optional[asyncio.Event] = None
+        self._backlog_drained: Optional[asyncio.Event] = None
+        self._stopping = False
+
+    async def submit(self, segment: Segment) -> asyncio.Future:
+        """Queue a segment; the returned future resolves once the segment is durable (False for duplicates)"""
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((segment, future))
+        return future
+
+    def queue_depth(self) -> int:
+        """Segments submitted but not yet picked up by the writer"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def discard(self, meeting_id: str):
+        """Forget a deleted meeting: drop its journaled backlog so the compactor never inserts it"""
+        self._backlog = [segment for segment in self._backlog if segment.meeting_id != meeting_id]
+        self._last_seq.pop(meeting_id, None)
+        self._failed_seq.pop(meeting_id, None)
+        if self.journal is not None:
+            await asyncio.to_thread(self.journal.discard, meeting_id)
+
+    async def last_acked_seq(self, meeting_id: str) -> int:
+        """Last sequence number acknowledged for a meeting (-1 if none)"""
+        if meeting_id not in self._last_seq:
+            self._last_seq[meeting_id] = await self.db.get_last_ingested_seq(meeting_id)
+        return self._last_seq[meeting_id]
+
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._queue = asyncio.Queue(maxsize=self.max_queued)
+            self._task = asyncio.create_task(self._run())
+            if self.journal is not None:
+                self._backlog_ready = asyncio.Event()
+                self._backlog_drained = asyncio.Event()
+                self._compactor = asyncio.create_task(self._compact_loop())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            if self.journal is not None:
+                await self._journal(batch)
+            else:
+                await self._commit(batch)
+
+    def _refuse_after_failures(self, batch: List[Tuple[Segment, asyncio.Future]]) -> List[Tuple[Segment, asyncio.Future]]:
+        """Fail the segments that follow a failed one of their meeting; returns the rest"""
+        kept = []
+        for segment, future in batch:
+            failed_seq = self._failed_seq.get(segment.meeting_id)
+            if failed_seq is not None and segment.seq > failed_seq:
+                if not future.done():
+                    future.set_exception(IngestGapError(
+                        f"Segment {segment.seq} follows uncommitted segment {failed_seq}; resend from {failed_seq}"))
+                continue
+            if failed_seq is not None:
+                # The client is resending from the failed segment on
+                del self._failed_seq[segment.meeting_id]
+            kept.append((segment, future))
+        return kept
+
+    def _record_failure(self, segments: List[Segment]):
+        for segment in segments:
+            self._failed_seq[segment.meeting_id] = min(self._failed_seq.get(segment.meeting_id, segment.seq), segment.seq)
+
+    async def _commit(self, batch: List[Tuple[Segment, asyncio.Future]]):
+        batch = self._refuse_after_failures(batch)
+        if not batch:
+            return
+        segments = [segment for segment, _ in batch]
+        try:
+            accepted = await self.db.append_meeting_segments(segments)
+        except Exception as e:
+            logger.error(f"Failed to commit ingest batch of {len(batch)} segments: {str(e)}", exc_info=True)
+            self._record_failure(segments)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (segment, future), ok in zip(batch, accepted):
+            if ok:
+                self._last_seq[segment.meeting_id] = max(self._last_seq.get(segment.meeting_id, -1), segment.seq)
+            if not future.done():
+                future.set_result(ok)
+
+        logger.debug(f"Committed ingest batch of {len(batch)} segments ({sum(accepted)} new)")
+        self._notify(segments)
+
+    async def _journal(self, batch: List[Tuple[Segment, asyncio.Future]]):
+        batch = self._refuse_after_failures(batch)
+        previous = {}
+        accepted = []
+        segments = []
+        for segment, _ in batch:
+            last_seq = await self.last_acked_seq(segment.meeting_id)
+            if segment.seq <= last_seq:
+                accepted.append(False)
+                continue
+            previous.setdefault(segment.meeting_id, last_seq)
+            self._last_seq[segment.meeting_id] = segment.seq
+            accepted.append(True)
+            segments.append(segment)
+
+        try:
+            if segments:
+                await asyncio.to_thread(self.journal.append, segments)
+        except Exception as e:
+            logger.error(f"Failed to journal ingest batch of {len(batch)} segments: {str(e)}", exc_info=True)
+            self._last_seq.update(previous)
+            self._record_failure(segments)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), ok in zip(batch, accepted):
+            if not future.done():
+                future.set_result(ok)
+
+        if segments:
+            self._backlog.extend(segments)
+            self._backlog_ready.set()
+        # Backpressure: stop draining the queue while the compactor is behind
+        while len(self._backlog) >= self.max_queued and not self._compactor.done():
+            self._backlog_drained.clear()
+            await self._backlog_drained.wait()
+
+    async def _compact_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._backlog_ready.wait(), timeout=self.compact_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._backlog_ready.clear()
+
+            if self._backlog:
+                compacted = await self._compact_once()
+                if not compacted and self._stopping:
+                    # Leave the rest in the journal; recover() replays it on next start
+                    return
+            if self._stopping and not self._backlog:
+                return
+
+    async def _compact_once(self) -> bool:
+        segments = self._backlog[:self.compact_batch]
+        try:
+            await self.db.append_meeting_segments(segments)
+        except Exception as e:
+            # Segments stay in the journal and the backlog; retried on the next tick
+            logger.error(f"Failed to compact {len(segments)} journaled segments: {str(e)}", exc_info=True)
+            await asyncio.sleep(self.compact_interval)
+            return False
+
+        del self._backlog[:len(segments)]
+        self._backlog_drained.set()
+
+        committed = {}
+        for segment in segments:
+            committed[segment.meeting_id] = max(committed.get(segment.meeting_id, -1), segment.seq)
+        pending = {segment.meeting_id for segment in self._backlog}
+        await asyncio.to_thread(
+            self.journal.checkpoint,
+            {meeting_id: seq for meeting_id, seq in committed.items() if meeting_id not in pending}
+        )
+
+        logger.debug(f"Compacted {len(segments)} journaled segments into transcripts")
+        self._notify(segments)
+        return True
+
+    def _notify(self, segments: List[Segment]):
+        if self.on_commit:
+            for meeting_id in {segment.meeting_id for segment in segments}:
+                try:
+                    self.on_commit(meeting_id)
+                except Exception as e:
+                    logger.error(f"Ingest on_commit hook failed for {meeting_id}: {str(e)}", exc_info=True)
+
+    async def recover(self, batch_size: int = 5000) -> int:
+        """Move segments left in the journal by a previous run into SQLite; returns how many were replayed"""
+        if self.journal is None:
+            return 0
+
+        segments = await asyncio.to_thread(self.journal.replay)
+        if not segments:
+            return 0
+
+        existing = {}
+        for meeting_id in {segment.meeting_id for segment in segments}:
+            existing[meeting_id] = await self.db.meeting_exists(meeting_id)
+        orphaned = [meeting_id for meeting_id, exists in existing.items() if not exists]
+        if orphaned:
+            logger.warning(f"Discarding journaled segments of deleted meetings: {orphaned}")
+        segments = [segment for segment in segments if existing[segment.meeting_id]]
+
+        replayed = 0
+        for start in range(0, len(segments), batch_size):
+            replayed += sum(await self.db.append_meeting_segments(segments[start:start + batch_size]))
+
+        committed = {meeting_id: float("inf") for meeting_id in existing}
+        await asyncio.to_thread(self.journal.checkpoint, committed)
+        logger.info(f"Recovered {replayed} journaled segments ({len(segments)} records) from {len(existing)} meetings")
+        self._notify(segments)
+        return replayed
+
+    async def close(self):
+        """Commit whatever is still queued and stop the writer (and compactor) tasks"""
+        if self._task is None or self._task.done():
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+        if self._compactor is not None:
+            self._stopping = True
+            self._backlog_ready.set()
+            await self._compactor
+            self._compactor = None
+        if self.journal is not None:
+            await asyncio.to_thread(self.journal.close)
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict
+from typing import Dict, IO, Iterable, List, Set
+
+from metrics import LOCK_WAIT_SECONDS
+
+from .batcher import Segment
+
+logger = logging.getLogger(__name__)
+
+
+class SegmentJournal:
+    """Append-only, per-meeting write-ahead journal of live segments.
+
+    Every active meeting gets one ``<sha256 of meeting_id>.jsonl`` file
+    holding one JSON record per segment (hashed, so two ids never share a
+    file, not even on a case-insensitive filesystem). ``append`` writes a
+    whole batch and fsyncs each touched file once, so the cost of fsync is
+    shared by every segment in the batch.
+    Once the compactor has moved a meeting's segments into SQLite,
+    ``checkpoint`` removes its file; ``discard`` removes it uncompacted when
+    the meeting is deleted. On startup ``replay`` returns whatever was
+    journaled but never compacted; a torn last line from a crash is ignored.
+
+    All methods are blocking and are meant to be called through
+    ``asyncio.to_thread``.
+    """
+
+    SUFFIX = ".jsonl"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._files: Dict[str, IO] = {}
+        self._written_seq: Dict[str, int] = {}
+        # Files replay() read each meeting from, which may be named by an older scheme
+        self._replayed: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, meeting_id: str) -> str:
+        name = hashlib.sha256(meeting_id.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, name + self.SUFFIX)
+
+    def _remove(self, meeting_id: str):
+        handle = self._files.pop(meeting_id, None)
+        if handle is not None:
+            handle.close()
+        self._written_seq.pop(meeting_id, None)
+        for path in {self._path(meeting_id), *self._replayed.pop(meeting_id, ())}:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def append(self, segments: Iterable[Segment]):
+        """Write segments and fsync every file they touched"""
+        waited = time.perf_counter()
+        with self._lock:
+            LOCK_WAIT_SECONDS.observe(time.perf_counter() - waited, lock="ingest_journal")
+            touched = {}
+            for segment in segments:
+                handle = self._files.get(segment.meeting_id)
+                if handle is None:
+                    handle = open(self._path(segment.meeting_id), "a", encoding="utf-8")
+                    self._files[segment.meeting_id] = handle
+                handle.write(json.dumps(asdict(segment), ensure_ascii=False) + "\n")
+                self._written_seq[segment.meeting_id] = segment.seq
+                touched[segment.meeting_id] = handle
+
+            for handle in touched.values():
+                handle.flush()
+                os.fsync(handle.fileno())
+
+    def checkpoint(self, committed_seq: Dict[str, int]):
+        """Drop the journal of every meeting whose journaled segments are all committed"""
+        with self._lock:
+            for meeting_id, seq in committed_seq.items():
+                if self._written_seq.get(meeting_id, -1) > seq:
+                    continue  # more segments were journaled while compacting
+                self._remove(meeting_id)
+
+    def discard(self, meeting_id: str):
+        """Drop a meeting's journal without compacting it (the meeting was deleted)"""
+        with self._lock:
+            self._remove(meeting_id)
+
+    def replay(self) -> List[Segment]:
+        """Read every segment left in the journal directory"""
+        segments = []
+        with self._lock:
+            for name in sorted(os.listdir(self.directory)):
+                if not name.endswith(self.SUFFIX):
+                    continue
+                path = os.path.join(self.directory, name)
+                with open(path, "r", encoding="utf-8") as handle:
+                    for line_number, line in enumerate(handle, start=1):
+                        try:
+                            segment = Segment(**json.loads(line))
+                            segments.append(segment)
+                            self._replayed.setdefault(segment.meeting_id, set()).add(path)
+                        except (ValueError, TypeError) as e:
+                            logger.warning(f"Skipping unreadable journal record {name}:{line_number}: {str(e)}")
+        return segments
+
+    def close(self):
+        with self._lock:
+            for handle in self._files.values():
+                handle.close()
+            self._files.clear()
@@ -0,0 +1,122 @@
+"""
+Logging off the request path: records go through a ``QueueHandler`` to a
+``QueueListener`` thread that formats and writes them, so a request never
+blocks on stderr or a log file.
+
+    MAITY_LOG_LEVEL=INFO                                  # root level
+    MAITY_LOG_LEVELS=transcript_processor=DEBUG,db=WARNING  # per-module levels
+    MAITY_LOG_FORMAT=json                                 # or "text"
+
+Loggers are named after their module (``logging.getLogger(__name__)``), so
+``routes`` covers every router and ``summary.ratelimit`` only the limiter.
+Hot paths should log with lazy ``%s`` arguments: a record below the level
+is then dropped by one ``isEnabledFor`` check, without formatting anything.
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from typing import Dict, Optional
+
+DEFAULT_LEVEL = "INFO"
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - [%(filename)s:%(lineno)d - %(funcName)s()] - %(message)s'
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.Handler] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, source location and exception"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "src": f"{record.filename}:{record.lineno}",
+            "func": record.funcName,
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves the formatting of the final line to the listener.
+
+    The stock ``prepare`` runs the whole formatter in the calling thread; here
+    only what cannot cross threads is resolved: the message arguments (which
+    may be mutable objects) and the traceback.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)  # other handlers of the root logger see the original
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def parse_levels(spec: str) -> Dict[str, int]:
+    """``"db=WARNING,transcript_processor=debug"`` -> ``{"db": 30, "transcript_processor": 10}``"""
+    levels = {}
+    for item in spec.split(","):
+        name, sep, level = item.partition("=")
+        if not sep or not name.strip():
+            continue
+        value = logging.getLevelName(level.strip().upper())
+        if isinstance(value, int):
+            levels[name.strip()] = value
+    return levels
+
+
+def configure_logging(stream=None) -> logging.handlers.QueueListener:
+    """Route the root logger through a queue to a background writer thread.
+
+    Safe to call again (e.g. when ``main`` is reloaded): the previous
+    listener is flushed and replaced instead of stacking handlers.
+    """
+    global _listener, _queue_handler
+    root = logging.getLogger()
+    if _listener is not None:
+        _listener.stop()
+        root.removeHandler(_queue_handler)
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    if os.getenv("MAITY_LOG_FORMAT", "json").lower() == "text":
+        output.setFormatter(logging.Formatter(TEXT_FORMAT, datefmt='%Y-%m-%d %H:%M:%S'))
+    else:
+        output.setFormatter(JsonFormatter())
+
+    records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    _queue_handler = _QueueHandler(records)
+    _listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+
+    root.addHandler(_queue_handler)
+    level = logging.getLevelName(os.getenv("MAITY_LOG_LEVEL", DEFAULT_LEVEL).upper())
+    root.setLevel(level if isinstance(level, int) else DEFAULT_LEVEL)
+    for name, level in parse_levels(os.getenv("MAITY_LOG_LEVELS", "")).items():
+        logging.getLogger(name).setLevel(level)
+    return _listener
+
+
+def shutdown_logging():
+    """Write out the records still queued and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -3,38 +3,31 @@ from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 import os
 import logging
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
 from db import DatabaseManager
+from log_config import configure_logging
+from metrics import MetricsMiddleware, gauge
+from responses import CompressionMiddleware, FastJSONResponse
+from tracing import TracingMiddleware
 from transcript_processor import TranscriptProcessor
+from summary import AdmissionController, CancellationToken, DeadlinePlan, JobCancelled, JobRegistry, LiveSummarizer, TierStats
+from ingest import IngestBatcher, SegmentJournal
 
-from routes import meetings_router, transcripts_router, summaries_router, config_router
+from routes import meetings_router, transcripts_router, summaries_router, config_router, telemetry_router
 
 # Load environment variables
 load_dotenv()
 
-# Configure logger with line numbers and function names
+# JSON logs written by a background thread; levels from MAITY_LOG_LEVEL / MAITY_LOG_LEVELS
+configure_logging()
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-
-# Create console handler with formatting
-console_handler = logging.StreamHandler()
-console_handler.setLevel(logging.DEBUG)
-
-# Create formatter with line numbers and function names
-formatter = logging.Formatter(
-    '%(asctime)s - %(levelname)s - [%(filename)s:%(lineno)d - %(funcName)s()] - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
-console_handler.setFormatter(formatter)
-
-# Add handler to logger if not already added
-if not logger.handlers:
-    logger.addHandler(console_handler)
 
 app = FastAPI(
     title="Meeting Summarizer API",
     description="API for processing and summarizing meeting transcripts",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # Register custom error handler
@@ -56,10 +49,18 @@ app.add_middleware(
     allow_origins=allowed_origins,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["Content-Type", "Authorization", "X-Requested-With"],
+    allow_headers=["Content-Type", "Authorization", "X-Requested-With", "X-Maity-Profile"],
+    expose_headers=["Server-Timing", "X-Maity-Profile-Id"],
     max_age=3600,
 )
 
+# brotli/gzip for complete responses of MAITY_COMPRESS_MIN_BYTES and up (e.g. long meetings)
+app.add_middleware(CompressionMiddleware)
+# Request latency per route template, served with the other metrics at /metrics
+app.add_middleware(MetricsMiddleware)
+# Per-request spans in a Server-Timing header; X-Maity-Profile: 1 attaches a sampling profile
+app.add_middleware(TracingMiddleware)
+
 # Global database manager instance for meeting management endpoints
 db = DatabaseManager()
 
@@ -77,7 +78,10 @@ class SummaryProcessor:
             logger.error(f"Failed to initialize SummaryProcessor: {str(e)}", exc_info=True)
             raise
 
-    async def process_transcript(self, text: str, model: str, model_name: str, chunk_size: int = 5000, overlap: int = 1000, custom_prompt: str = "Generate a summary of the meeting transcript.") -> tuple:
+    async def process_transcript(self, text: str, model: str, model_name: str, chunk_size: int = 5000, overlap: int = 1000, custom_prompt: str = "Generate a summary of the meeting transcript.",
+                                 meeting_id: Optional[str] = None, metadata: Optional[Dict] = None, chunking: Optional[str] = None,
+                                 plan: Optional[DeadlinePlan] = None, unfinished: Optional[List[str]] = None,
+                                 telemetry: Optional[List[Dict]] = None, cancel: Optional[CancellationToken] = None) -> tuple:
         """Process a transcript text"""
         try:
             if not text:
@@ -101,15 +105,47 @@ class SummaryProcessor:
                 model_name=model_name,
                 chunk_size=chunk_size,
                 overlap=overlap,
-                custom_prompt=custom_prompt
+                custom_prompt=custom_prompt,
+                meeting_id=meeting_id,
+                metadata=metadata,
+                chunking=chunking,
+                plan=plan,
+                unfinished=unfinished,
+                telemetry=telemetry,
+                cancel=cancel
             )
             logger.info(f"Successfully processed transcript into {num_chunks} chunks")
 
             return num_chunks, all_json_data
+        except JobCancelled:
+            raise
         except Exception as e:
             logger.error(f"Error processing transcript: {str(e)}", exc_info=True)
             raise
 
+    async def generate_structured(self, model: str, model_name: str, prompt: str, result_type,
+                                  stats: Optional[TierStats] = None, cancel: Optional[CancellationToken] = None):
+        """Run a single structured prompt (e.g. regenerating one summary section)"""
+        return await self.transcript_processor.generate_structured(model, model_name, prompt, result_type,
+                                                                   stats=stats, cancel=cancel)
+
+    async def reduce_summary(self, model: str, model_name: str, summary: Dict, custom_prompt: str = "",
+                             lang: str = "es", metadata: Optional[Dict] = None,
+                             telemetry: Optional[List[Dict]] = None, cancel: Optional[CancellationToken] = None) -> Dict:
+        """Consolidate merged chunk summaries with the strong model of a two-tier routing"""
+        return await self.transcript_processor.reduce_summary(model, model_name, summary, custom_prompt,
+                                                              lang=lang, metadata=metadata, telemetry=telemetry,
+                                                              cancel=cancel)
+
+    @property
+    def clean_transcripts(self) -> bool:
+        """Whether transcripts are cleaned of fillers and ASR artifacts before chunking"""
+        return self.transcript_processor.clean_transcripts
+
+    def chunk_window(self, model: str, model_name: str, chunk_size: int, overlap: int):
+        """Chunk size and overlap the transcript processor uses for a model"""
+        return self.transcript_processor.chunk_window(model, model_name, chunk_size, overlap)
+
     def cleanup(self):
         """Cleanup resources"""
         try:
@@ -124,11 +160,61 @@ class SummaryProcessor:
 # Initialize processor
 processor = SummaryProcessor()
 
+# Bounds concurrent /process-transcript jobs (MAITY_MAX_ACTIVE_JOBS, MAITY_MAX_QUEUED_BYTES);
+# over the limits new jobs get 429 with a Retry-After
+admission = AdmissionController()
+
+# The summary job in flight per meeting; /cancel-summary, /delete-meeting and resubmission cancel it
+summary_jobs = JobRegistry()
+
+# Section regenerations in flight per meeting, tracked apart so they never supersede a full job
+section_jobs = JobRegistry()
+
+# Incremental summarization of meetings that are still recording
+live_summarizer = LiveSummarizer(db, processor, admission=admission)
+
+# Crash-safe journal for live ingest (MAITY_INGEST_JOURNAL=0 commits straight to SQLite instead)
+ingest_journal = None
+if os.getenv("MAITY_INGEST_JOURNAL", "1") == "1":
+    ingest_journal = SegmentJournal(os.getenv(
+        "MAITY_JOURNAL_DIR",
+        os.path.join(os.path.dirname(os.path.abspath(db.db_path)), "ingest_journal")
+    ))
+
+# Group-committed live ingest for /append-transcript; wakes the live summarizer after each commit
+ingest_batcher = IngestBatcher(
+    db,
+    journal=ingest_journal,
+    flush_interval_ms=int(os.getenv("MAITY_INGEST_FLUSH_MS", "50")),
+    max_batch=int(os.getenv("MAITY_INGEST_MAX_BATCH", "500")),
+    max_queued=int(os.getenv("MAITY_INGEST_MAX_QUEUED", "5000")),
+    compact_interval_ms=int(os.getenv("MAITY_INGEST_COMPACT_MS", "1000")),
+    on_commit=live_summarizer.notify,
+)
+
+# Queue depth of the summary and ingest pipelines, read at scrape time
+gauge("maity_summary_jobs_active", "Summary jobs running", lambda: admission.active_jobs)
+gauge("maity_summary_queued_bytes", "Transcript bytes held by running summary jobs", lambda: admission.queued_bytes)
+gauge("maity_summary_jobs_admitted_total", "Summary jobs admitted", lambda: admission.admitted, kind="counter")
+gauge("maity_summary_jobs_rejected_total", "Summary jobs rejected with 429",
+      lambda: {(reason,): count for reason, count in admission.rejected.items()}, ("reason",), kind="counter")
+gauge("maity_ingest_queued_segments", "Appended segments waiting for the ingest writer", ingest_batcher.queue_depth)
+
 # Register routers
 app.include_router(meetings_router)
 app.include_router(transcripts_router)
 app.include_router(summaries_router)
 app.include_router(config_router)
+app.include_router(telemetry_router)
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Replay segments a previous run journaled but never compacted"""
+    try:
+        await ingest_batcher.recover()
+    except Exception as e:
+        logger.error(f"Failed to recover ingest journal: {str(e)}", exc_info=True)
 
 
 @app.on_event("shutdown")
@@ -136,6 +222,8 @@ async def shutdown_event():
     """Cleanup on API shutdown"""
     logger.info("API shutting down, cleaning up resources")
     try:
+        await ingest_batcher.close()
+        await live_summarizer.shutdown()
         processor.cleanup()
         logger.info("Successfully cleaned up resources")
     except Exception as e:
@@ -155,4 +243,5 @@ if __name__ == "__main__":
             "Asegurate de tener un firewall o bind a 127.0.0.1."
         )
 
-    uvicorn.run("main:app", host=host, port=port, reload=reload_enabled)
+    # log_config=None: uvicorn's own loggers propagate to the queued root handler
+    uvicorn.run("main:app", host=host, port=port, reload=reload_enabled, log_config=None)
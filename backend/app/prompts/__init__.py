@@ -6,11 +6,24 @@ sean en español, lo que degradaba la extracción de Action Items y nombres
 propios en español.
 
 Uso:
-    from prompts import build_prompt, detect_lang
+    from prompts import build_prompt, detect_lang, language_detector
 
-    lang = detect_lang(transcript_chunk)          # "es" | "en"
+    lang = detect_lang(transcript_chunk)          # "es" | "en" | "pt" | "fr" | "de"
     prompt = build_prompt(lang, chunk, custom)
+
+    # Por chunk, con caché del idioma de la reunión:
+    langs = language_detector.detect_chunks(chunks, meeting_id=meeting_id)
 """
-from .templates import build_prompt, detect_lang
+from .language import FUNCTION_WORDS, LANGUAGES, LanguageDetector, language_detector
+from .templates import build_prompt, build_reduce_prompt, build_section_prompt, detect_lang
 
-__all__ = ["build_prompt", "detect_lang"]
+__all__ = [
+    "FUNCTION_WORDS",
+    "LANGUAGES",
+    "LanguageDetector",
+    "language_detector",
+    "build_prompt",
+    "build_reduce_prompt",
+    "build_section_prompt",
+    "detect_lang",
+]
@@ -0,0 +1,284 @@
+"""
+language.py — Detector de idioma por n-gramas de caracteres y palabras función.
+
+Reemplaza la heurística es/en de ``detect_lang``:
+
+- Idiomas: "es", "en", "pt", "fr", "de".
+- Solo analiza un prefijo acotado del texto (``sample_chars``), así que el
+  costo es constante sin importar el largo de la transcripción.
+- Cachea el idioma por reunión (``detect_for``), para no re-detectar en cada
+  ventana del resumen en vivo ni en cada chunk.
+- ``detect_chunks`` detecta cambios de idioma por chunk en reuniones
+  bilingües; un chunk solo cambia de idioma si la señal es clara, si no hereda
+  el idioma de la reunión.
+
+Uso:
+    from prompts import language_detector
+
+    lang = language_detector.detect(text)                      # "es" | "en" | "pt" | "fr" | "de"
+    langs = language_detector.detect_chunks(chunks, meeting_id="m-1")
+"""
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Perfiles por idioma
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Palabras función de alta frecuencia de cada idioma.
+_FUNCTION_WORDS: dict[str, frozenset[str]] = {
+    "es": frozenset([
+        "de", "la", "el", "en", "que", "y", "los", "se", "del", "las",
+        "un", "una", "por", "con", "no", "su", "para", "es", "al",
+        "lo", "como", "más", "pero", "sus", "le", "ya", "o", "fue", "si",
+        "sobre", "este", "entre", "cuando", "muy", "sin", "también",
+        "me", "hasta", "hay", "donde", "quien", "desde", "todo", "nos",
+        "durante", "estados", "todos", "uno", "les", "ni", "contra",
+        "ese", "eso", "ante", "ellos", "e", "esto", "mí", "antes",
+        "algunos", "qué", "unos", "yo", "otro", "otras", "otra", "él",
+        "tanto", "esa", "estos", "mucho", "quienes", "nada", "muchos",
+        "cual", "poco", "ella", "estar", "estas", "algún", "algo",
+        "entonces", "bueno", "pues", "usted", "ustedes", "gracias", "hola",
+        "necesito", "quiero", "vale", "ahorita", "oye", "tenemos", "hacer",
+    ]),
+    "en": frozenset([
+        "the", "be", "to", "of", "and", "a", "in", "that", "have", "it",
+        "for", "not", "on", "with", "he", "as", "you", "do", "at", "this",
+        "but", "his", "by", "from", "they", "we", "say", "her", "she", "or",
+        "an", "will", "my", "one", "all", "would", "there", "their", "what",
+        "so", "up", "out", "if", "about", "who", "get", "which", "go", "me",
+        "when", "make", "can", "like", "time", "no", "just", "him", "know",
+        "take", "people", "into", "year", "your", "good", "some", "could",
+        "them", "see", "other", "than", "then", "now", "look", "only", "come",
+        "its", "over", "think", "also", "back", "after", "use", "two", "how",
+        "our", "work", "first", "well", "way", "even", "new", "want", "because",
+        "any", "these", "give", "day", "most", "us",
+    ]),
+    "pt": frozenset([
+        "de", "a", "o", "que", "e", "do", "da", "em", "um", "para", "é",
+        "com", "não", "uma", "os", "no", "se", "na", "por", "mais", "as",
+        "dos", "como", "mas", "foi", "ao", "ele", "das", "tem", "à", "seu",
+        "sua", "ou", "ser", "quando", "muito", "há", "nos", "já", "está",
+        "eu", "também", "só", "pelo", "pela", "até", "isso", "ela", "entre",
+        "era", "depois", "sem", "mesmo", "aos", "ter", "seus", "quem", "nas",
+        "me", "esse", "eles", "estão", "você", "tinha", "foram", "essa",
+        "num", "nem", "suas", "meu", "às", "minha", "têm", "numa", "pelos",
+        "vamos", "então", "gente", "né", "aqui", "agora", "fazer",
+        "vocês", "oi", "obrigado", "obrigada", "tá", "pra", "pro", "quer", "preciso",
+    ]),
+    "fr": frozenset([
+        "de", "la", "le", "et", "les", "des", "en", "un", "du", "une",
+        "que", "est", "pour", "qui", "dans", "a", "par", "plus", "pas",
+        "au", "sur", "ne", "se", "ce", "il", "sont", "avec", "ou", "son",
+        "aux", "mais", "nous", "vous", "je", "on", "elle", "ont", "été",
+        "cette", "leur", "sa", "ses", "fait", "était", "comme", "tout",
+        "bien", "aussi", "donc", "alors", "très", "faut", "c'est", "j'ai",
+        "on", "peut", "faire", "avons", "avez", "suis", "ça", "oui", "non",
+        "quand", "même", "notre", "votre", "encore", "après", "avant",
+    ]),
+    "de": frozenset([
+        "der", "die", "und", "in", "den", "von", "zu", "das", "mit", "sich",
+        "des", "auf", "für", "ist", "im", "dem", "nicht", "ein", "eine",
+        "als", "auch", "es", "an", "werden", "aus", "er", "hat", "dass",
+        "sie", "nach", "wird", "bei", "einer", "um", "am", "sind", "noch",
+        "wie", "einem", "über", "einen", "so", "zum", "war", "haben", "nur",
+        "oder", "aber", "vor", "zur", "bis", "mehr", "durch", "man", "wir",
+        "ich", "ja", "nein", "dann", "also", "schon", "jetzt", "wenn", "kann",
+        "müssen", "sollten", "bitte", "danke", "gut", "hier", "heute", "morgen",
+    ]),
+}
+
+# Texto de referencia (lenguaje de reuniones de negocio) del que se obtienen
+# los perfiles de trigramas de caracteres.
+_SEED_TEXT: dict[str, str] = {
+    "es": (
+        "bueno entonces la reunión de hoy es para revisar el avance del proyecto y los "
+        "pendientes con el cliente. necesitamos el reporte para el viernes y hay que "
+        "confirmar el presupuesto con finanzas. yo me encargo de enviar la propuesta "
+        "mañana y tú revisas los números de la semana pasada. también tenemos que "
+        "hablar con el equipo de ventas sobre la estrategia del próximo trimestre. "
+        "¿alguien tiene alguna pregunta? perfecto, entonces quedamos así y nos vemos "
+        "la próxima semana. gracias a todos por su tiempo, fue una muy buena sesión."
+    ),
+    "en": (
+        "okay so the meeting today is to review the progress of the project and the "
+        "open items with the client. we need the report by friday and we have to "
+        "confirm the budget with finance. i will send the proposal tomorrow and you "
+        "check the numbers from last week. we also need to talk with the sales team "
+        "about the strategy for the next quarter. does anyone have any questions? "
+        "great, so that's the plan and we'll see each other next week. thanks "
+        "everyone for your time, it was a really good session."
+    ),
+    "pt": (
+        "bom então a reunião de hoje é para revisar o andamento do projeto e as "
+        "pendências com o cliente. precisamos do relatório até sexta-feira e temos "
+        "que confirmar o orçamento com o financeiro. eu fico responsável por enviar a "
+        "proposta amanhã e você revisa os números da semana passada. também temos que "
+        "conversar com a equipe de vendas sobre a estratégia do próximo trimestre. "
+        "alguém tem alguma pergunta? perfeito, então fica assim e a gente se vê na "
+        "próxima semana. obrigado a todos pelo tempo, foi uma sessão muito boa."
+    ),
+    "fr": (
+        "bon alors la réunion d'aujourd'hui sert à faire le point sur l'avancement du "
+        "projet et les sujets en attente avec le client. nous avons besoin du rapport "
+        "pour vendredi et il faut confirmer le budget avec la finance. je m'occupe "
+        "d'envoyer la proposition demain et tu vérifies les chiffres de la semaine "
+        "dernière. nous devons aussi parler avec l'équipe commerciale de la stratégie "
+        "du prochain trimestre. est-ce que quelqu'un a une question? parfait, alors "
+        "on fait comme ça et on se voit la semaine prochaine. merci à tous."
+    ),
+    "de": (
+        "also das meeting heute ist dazu da, den fortschritt des projekts und die "
+        "offenen punkte mit dem kunden zu besprechen. wir brauchen den bericht bis "
+        "freitag und müssen das budget mit der finanzabteilung bestätigen. ich kümmere "
+        "mich darum, das angebot morgen zu schicken, und du prüfst die zahlen der "
+        "letzten woche. wir müssen auch mit dem vertriebsteam über die strategie für "
+        "das nächste quartal sprechen. hat jemand noch fragen? super, dann machen wir "
+        "das so und sehen uns nächste woche. danke euch allen für eure zeit."
+    ),
+}
+
+LANGUAGES = tuple(_SEED_TEXT)
+
+# Una palabra función compartida por varios idiomas ("de", "que", "a") aporta
+# menos evidencia: su peso se reparte entre los idiomas que la usan.
+_WORD_WEIGHTS: dict[str, dict[str, float]] = {}
+for _lang, _words_of_lang in _FUNCTION_WORDS.items():
+    for _word in _words_of_lang:
+        _sharing = sum(1 for other in _FUNCTION_WORDS.values() if _word in other)
+        _WORD_WEIGHTS.setdefault(_word, {})[_lang] = 1.0 / _sharing
+
+_WORD_RE = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?", re.UNICODE)
+
+# Peso de las palabras función frente a los trigramas en la puntuación final.
+_FUNCTION_WORD_WEIGHT = 4.0
+
+
+def _words(text: str) -> List[str]:
+    return _WORD_RE.findall(text.lower())
+
+
+def _trigrams(words: Iterable[str]) -> Counter:
+    counts: Counter = Counter()
+    for word in words:
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            counts[padded[i:i + 3]] += 1
+    return counts
+
+
+class _Profile:
+    """Modelo de trigramas (log-probabilidades con suavizado de Laplace)."""
+
+    def __init__(self, seed: str):
+        counts = _trigrams(_words(seed))
+        total = sum(counts.values())
+        vocabulary = len(counts) + 1
+        self.log_probs = {gram: math.log((count + 1) / (total + vocabulary)) for gram, count in counts.items()}
+        self.log_unknown = math.log(1 / (total + vocabulary))
+
+    def score(self, trigrams: Counter) -> float:
+        total = sum(trigrams.values())
+        if not total:
+            return self.log_unknown
+        log_probs, unknown = self.log_probs, self.log_unknown
+        return sum(log_probs.get(gram, unknown) * count for gram, count in trigrams.items()) / total
+
+
+_PROFILES: dict[str, _Profile] = {lang: _Profile(seed) for lang, seed in _SEED_TEXT.items()}
+
+
+class LanguageDetector:
+    """Detector de idioma de costo constante con caché por reunión.
+
+    Args:
+        sample_chars: Caracteres del inicio del texto que se analizan.
+        min_margin:   Ventaja mínima (en puntuación) del mejor idioma sobre el
+                      segundo para considerar la detección confiable.
+        min_words:    Con menos palabras que esto no se intenta detectar.
+        cache_size:   Reuniones que se recuerdan (LRU).
+    """
+
+    def __init__(self, sample_chars: int = 2000, min_margin: float = 0.15, min_words: int = 3,
+                 cache_size: int = 1024):
+        self.sample_chars = sample_chars
+        self.min_margin = min_margin
+        self.min_words = min_words
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """Puntuación por idioma del prefijo de ``text`` (más alta = más probable).
+
+        Devuelve un dict vacío si el prefijo tiene menos de ``min_words`` palabras.
+        """
+        words = _words(text[:self.sample_chars])
+        if len(words) < self.min_words:
+            return {}
+        trigrams = _trigrams(words)
+        hits = dict.fromkeys(_PROFILES, 0.0)
+        for word in words:
+            for lang, weight in _WORD_WEIGHTS.get(word, {}).items():
+                hits[lang] += weight
+        return {
+            lang: profile.score(trigrams) + _FUNCTION_WORD_WEIGHT * hits[lang] / len(words)
+            for lang, profile in _PROFILES.items()
+        }
+
+    def _best(self, text: str) -> Optional[tuple]:
+        scores = self.scores(text)
+        if not scores:
+            return None
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        margin = ranked[0][1] - ranked[1][1]
+        return ranked[0][0], margin
+
+    def detect(self, text: str, default: str = "es") -> str:
+        """Idioma del texto, o ``default`` si no hay señal clara."""
+        best = self._best(text)
+        if best is None or best[1] < self.min_margin:
+            return default
+        return best[0]
+
+    def detect_for(self, meeting_id: Optional[str], text: str, default: str = "es") -> str:
+        """Como ``detect`` pero cacheado por reunión."""
+        if meeting_id is None:
+            return self.detect(text, default)
+        lang = self._cache.get(meeting_id)
+        if lang is not None:
+            self._cache.move_to_end(meeting_id)
+            return lang
+        lang = self.detect(text, default)
+        self._cache[meeting_id] = lang
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return lang
+
+    def detect_chunks(self, chunks: List[str], meeting_id: Optional[str] = None, default: str = "es") -> List[str]:
+        """Idioma de cada chunk.
+
+        El idioma de la reunión (cacheado) se usa como base; un chunk solo se
+        marca con otro idioma cuando la señal es clara, así una frase suelta
+        en inglés no cambia el prompt de un chunk en español.
+        """
+        if not chunks:
+            return []
+        meeting_lang = self.detect_for(meeting_id, chunks[0], default)
+        langs = []
+        for chunk in chunks:
+            best = self._best(chunk)
+            langs.append(best[0] if best is not None and best[1] >= self.min_margin else meeting_lang)
+        return langs
+
+    def forget(self, meeting_id: str):
+        """Descarta el idioma cacheado de una reunión."""
+        self._cache.pop(meeting_id, None)
+
+
+language_detector = LanguageDetector()
+
+FUNCTION_WORDS = _FUNCTION_WORDS
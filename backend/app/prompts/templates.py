@@ -4,77 +4,34 @@ templates.py — Plantillas de prompt por idioma para el summarizer de Maity.
 LLM-004: el prompt anterior era 100% inglés para reuniones en español.
 Ahora se detecta el idioma del chunk y se elige la plantilla correcta.
 
-Idiomas soportados: "es" (español, predeterminado), "en" (inglés).
-Añadir otros idiomas: agregar entrada en _PROMPTS y palabras en _ES_WORDS/_EN_WORDS.
+Plantillas: "es" (español, predeterminado), "en" (inglés). La detección
+(language.py) reconoce además "pt", "fr" y "de"; esos idiomas usan la
+plantilla en español hasta que tengan la suya en _PROMPTS.
 """
 from __future__ import annotations
 
+from .language import language_detector
+
 # ─────────────────────────────────────────────────────────────────────────────
-# Detección de idioma (heurística de palabras función)
+# Detección de idioma
 # ─────────────────────────────────────────────────────────────────────────────
 
-# Palabras función de alta frecuencia únicas de cada idioma.
-# Suficientes para diferenciar español de inglés en conversaciones de negocio.
-_ES_WORDS = frozenset([
-    "de", "la", "el", "en", "que", "y", "los", "se", "del", "las",
-    "un", "una", "por", "con", "no", "una", "su", "para", "es", "al",
-    "lo", "como", "más", "pero", "sus", "le", "ya", "o", "fue", "si",
-    "sobre", "este", "entre", "cuando", "muy", "sin", "sobre", "también",
-    "me", "hasta", "hay", "donde", "quien", "desde", "todo", "nos",
-    "durante", "estados", "todos", "uno", "les", "ni", "contra",
-    "ese", "eso", "ante", "ellos", "e", "esto", "mí", "antes",
-    "algunos", "qué", "unos", "yo", "otro", "otras", "otra", "él",
-    "tanto", "esa", "estos", "mucho", "quienes", "nada", "muchos",
-    "cual", "poco", "ella", "estar", "estas", "algún", "algo",
-])
-
-_EN_WORDS = frozenset([
-    "the", "be", "to", "of", "and", "a", "in", "that", "have", "it",
-    "for", "not", "on", "with", "he", "as", "you", "do", "at", "this",
-    "but", "his", "by", "from", "they", "we", "say", "her", "she", "or",
-    "an", "will", "my", "one", "all", "would", "there", "their", "what",
-    "so", "up", "out", "if", "about", "who", "get", "which", "go", "me",
-    "when", "make", "can", "like", "time", "no", "just", "him", "know",
-    "take", "people", "into", "year", "your", "good", "some", "could",
-    "them", "see", "other", "than", "then", "now", "look", "only", "come",
-    "its", "over", "think", "also", "back", "after", "use", "two", "how",
-    "our", "work", "first", "well", "way", "even", "new", "want", "because",
-    "any", "these", "give", "day", "most", "us",
-])
-
 
 def detect_lang(text: str, default: str = "es") -> str:
-    """Detecta si el texto es mayoritariamente español ("es") o inglés ("en").
+    """Detecta el idioma del texto ("es", "en", "pt", "fr" o "de").
 
-    Usa conteo de palabras función de alta frecuencia. Rápido y sin deps.
-    Si el resultado es ambiguo, devuelve `default` (predeterminado: "es",
-    porque Maity está orientado al mercado LATAM).
+    Delegado en ``language_detector`` (n-gramas + palabras función sobre un
+    prefijo acotado). Si el resultado es ambiguo, devuelve `default`
+    (predeterminado: "es", porque Maity está orientado al mercado LATAM).
 
     Args:
         text:    Fragmento de transcripción a analizar.
         default: Idioma a devolver si no hay señal clara.
 
     Returns:
-        "es" o "en".
+        Código de idioma.
     """
-    words = text.lower().split()
-    if not words:
-        return default
-
-    es_score = sum(1 for w in words if w.rstrip(".,;:!?") in _ES_WORDS)
-    en_score = sum(1 for w in words if w.rstrip(".,;:!?") in _EN_WORDS)
-
-    total = es_score + en_score
-    if total == 0:
-        return default
-
-    # Requiere ventaja del 20% para cambiar del default
-    ratio = es_score / total
-    if ratio >= 0.4:
-        return "es"
-    elif ratio <= 0.25:
-        return "en"
-    return default
+    return language_detector.detect(text, default)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -165,7 +122,8 @@ def build_prompt(lang: str, chunk: str, custom_prompt: str = "") -> str:
     Returns:
         String listo para pasar al agente LLM.
     """
-    template = _PROMPTS.get(lang, _PROMPTS["es"])
+    lang = lang if lang in _PROMPTS else "es"
+    template = _PROMPTS[lang]
     custom_tpl = _CUSTOM_ES if lang == "es" else _CUSTOM_EN
 
     custom_section = (
@@ -175,3 +133,154 @@ def build_prompt(lang: str, chunk: str, custom_prompt: str = "") -> str:
     )
 
     return template.format(chunk=chunk, custom_section=custom_section)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Regeneración de una sola sección
+# ─────────────────────────────────────────────────────────────────────────────
+
+_SECTION_PROMPTS: dict[str, str] = {
+    "es": """\
+A continuación tienes los resúmenes parciales (en JSON) de cada fragmento de una
+reunión de negocios. Reescribe ÚNICAMENTE la sección "{section_title}" del resumen
+final, consolidando la información de todos los fragmentos.
+
+REGLAS:
+- Elimina duplicados y combina elementos que describan lo mismo.
+- No inventes información que no aparezca en los resúmenes parciales.
+- Tipos de bloque permitidos: 'text', 'bullet', 'heading1', 'heading2'.
+- Para el campo 'color': usa 'gray' para contenido de menor importancia o ''.
+- El campo 'title' debe ser "{section_title}".
+
+Resúmenes parciales:
+---
+{context}
+---
+
+{custom_section}
+Asegúrate de que la salida sea únicamente el JSON de la sección.\
+""",
+
+    "en": """\
+Below are the partial summaries (as JSON) of every chunk of a meeting transcript.
+Rewrite ONLY the "{section_title}" section of the final summary, consolidating the
+information from all chunks.
+
+RULES:
+- Remove duplicates and merge items that describe the same thing.
+- Do not invent information that is not in the partial summaries.
+- Block types must be one of: 'text', 'bullet', 'heading1', 'heading2'.
+- For the 'color' field: use 'gray' for less important content or ''.
+- The 'title' field must be "{section_title}".
+
+Partial summaries:
+---
+{context}
+---
+
+{custom_section}
+Make sure the output is only the JSON of the section.\
+""",
+}
+
+
+def build_section_prompt(lang: str, section_title: str, context: str, custom_prompt: str = "") -> str:
+    """Construye el prompt para regenerar una sola sección del resumen.
+
+    Args:
+        lang:          Código de idioma ("es" | "en"). Fallback a "es".
+        section_title: Título de la sección a regenerar.
+        context:       Resúmenes parciales por chunk ya filtrados a esa sección.
+        custom_prompt: Contexto extra del usuario (puede estar vacío).
+
+    Returns:
+        String listo para pasar al agente LLM.
+    """
+    lang = lang if lang in _SECTION_PROMPTS else "es"
+    template = _SECTION_PROMPTS[lang]
+    custom_tpl = _CUSTOM_ES if lang == "es" else _CUSTOM_EN
+
+    custom_section = (
+        custom_tpl.format(custom_prompt=custom_prompt.strip())
+        if custom_prompt and custom_prompt.strip()
+        else ""
+    )
+
+    return template.format(section_title=section_title, context=context, custom_section=custom_section)
+
+
+# Reduce en dos niveles: el modelo fuerte consolida lo que el modelo barato
+# extrajo de cada chunk.
+_REDUCE_PROMPTS: dict[str, str] = {
+    "es": """\
+A continuación tienes el resumen (en JSON) de una reunión de negocios, obtenido
+uniendo los resúmenes parciales de cada fragmento de la transcripción. Las
+secciones pueden contener elementos repetidos o redactados de formas distintas.
+
+Genera el resumen final consolidado.
+
+REGLAS:
+- Elimina duplicados y combina elementos que describan lo mismo.
+- No inventes información que no aparezca en el resumen de entrada.
+- Conserva nombres propios, fechas y responsables tal como aparecen.
+- Tipos de bloque permitidos: 'text', 'bullet', 'heading1', 'heading2'.
+- Para el campo 'color': usa 'gray' para contenido de menor importancia o ''.
+- En MeetingNotes.sections incluye las notas de la reunión organizadas por tema.
+
+Resumen de entrada:
+---
+{summary}
+---
+
+{custom_section}
+Asegúrate de que la salida sea únicamente el JSON.\
+""",
+
+    "en": """\
+Below is the summary (as JSON) of a business meeting, obtained by joining the
+partial summaries of every chunk of the transcript. Its sections may contain
+repeated items or the same item worded differently.
+
+Produce the final consolidated summary.
+
+RULES:
+- Remove duplicates and merge items that describe the same thing.
+- Do not invent information that is not in the input summary.
+- Keep names, dates and owners exactly as they appear.
+- Block types must be one of: 'text', 'bullet', 'heading1', 'heading2'.
+- For the 'color' field: use 'gray' for less important content or ''.
+- In MeetingNotes.sections include the meeting notes organized by topic.
+
+Input summary:
+---
+{summary}
+---
+
+{custom_section}
+Make sure the output is only the JSON.\
+""",
+}
+
+
+def build_reduce_prompt(lang: str, summary: str, custom_prompt: str = "") -> str:
+    """Construye el prompt del reduce final sobre el resumen ya unido.
+
+    Args:
+        lang:          Código de idioma ("es" | "en"). Fallback a "es".
+        summary:       JSON compacto del merge determinista de los chunks.
+        custom_prompt: Contexto extra del usuario (puede estar vacío).
+
+    Returns:
+        String listo para pasar al agente LLM.
+    """
+    lang = lang if lang in _REDUCE_PROMPTS else "es"
+    template = _REDUCE_PROMPTS[lang]
+    custom_tpl = _CUSTOM_ES if lang == "es" else _CUSTOM_EN
+
+    custom_section = (
+        custom_tpl.format(custom_prompt=custom_prompt.strip())
+        if custom_prompt and custom_prompt.strip()
+        else ""
+    )
+
+    return template.format(summary=summary, custom_section=custom_section)
@@ -3,9 +3,11 @@ from pydantic import BaseModel
 from typing import Optional
 import logging
 
+from tracing import TracedRoute
+
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
 class SaveModelConfigRequest(BaseModel):
     provider: str
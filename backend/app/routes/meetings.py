@@ -1,11 +1,16 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List
+from typing import AsyncIterator, List, Literal, Optional
 import logging
 
+from responses import FastJSONResponse
+from summary.payload import dumps
+from tracing import TracedRoute
+
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
 class MeetingResponse(BaseModel):
     id: str
@@ -32,7 +37,7 @@ async def get_meetings():
     from main import db
     try:
         meetings = await db.get_all_meetings()
-        return [{"id": meeting["id"], "title": meeting["title"]} for meeting in meetings]
+        return FastJSONResponse([{"id": meeting["id"], "title": meeting["title"]} for meeting in meetings])
     except Exception as e:
         logger.error(f"Error getting meetings: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -45,13 +50,62 @@ async def get_meeting(meeting_id: str):
         meeting = await db.get_meeting(meeting_id)
         if not meeting:
             raise HTTPException(status_code=404, detail="Meeting not found")
-        return meeting
+        # Already shaped like MeetingDetailsResponse by the DB layer: skip re-validating every segment
+        return FastJSONResponse(meeting)
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error getting meeting: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _segment_lines(db, meeting_id: str, start: Optional[float], end: Optional[float]) -> AsyncIterator[bytes]:
+    async for batch in db.iter_meeting_segments(meeting_id, start, end):
+        yield "".join(dumps(segment) + "\n" for segment in batch).encode("utf-8")
+
+
+async def _meeting_json(db, meeting: dict, start: Optional[float], end: Optional[float]) -> AsyncIterator[bytes]:
+    yield (dumps(meeting)[:-1] + ',"transcripts":[').encode("utf-8")
+    separator = ""
+    async for batch in db.iter_meeting_segments(meeting["id"], start, end):
+        yield (separator + ",".join(dumps(segment) for segment in batch)).encode("utf-8")
+        separator = ","
+    yield b"]}"
+
+
+@router.get("/get-meeting-transcripts/{meeting_id}")
+async def get_meeting_transcripts(meeting_id: str, start: Optional[float] = Query(None, ge=0),
+                                  end: Optional[float] = Query(None, ge=0),
+                                  format: Literal["ndjson", "json"] = "ndjson"):
+    """Stream a meeting's transcript segments in audio order, optionally only those overlapping [start, end) seconds.
+
+    ``ndjson`` sends one segment per line; ``json`` sends the /get-meeting
+    document, written out as the segments are read.
+    """
+    from main import db
+    if start is not None and end is not None and end <= start:
+        raise HTTPException(status_code=400, detail="end must be greater than start")
+    meeting = await db.get_meeting_info(meeting_id)
+    if not meeting:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+
+    if format == "ndjson":
+        return StreamingResponse(_segment_lines(db, meeting_id, start, end), media_type="application/x-ndjson")
+    return StreamingResponse(_meeting_json(db, meeting, start, end), media_type="application/json")
+
+@router.get("/changes")
+async def get_changes(since: int = Query(0, ge=0), limit: int = Query(1000, ge=1, le=10000)):
+    """Meetings, summaries and transcript segments created, updated or deleted after change sequence number ``since``.
+
+    Start with ``since=0`` (or after ``reset``: reload everything) and pass
+    back ``next``; repeat while ``has_more``.
+    """
+    from main import db
+    try:
+        return FastJSONResponse(await db.get_changes(since, limit))
+    except Exception as e:
+        logger.error(f"Error getting changes since {since}: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/save-meeting-title")
 async def save_meeting_title(data: MeetingTitleUpdate):
     """Save a meeting title"""
@@ -65,9 +119,13 @@ async def save_meeting_title(data: MeetingTitleUpdate):
 
 @router.post("/delete-meeting")
 async def delete_meeting(data: DeleteMeetingRequest):
-    """Delete a meeting and all its associated data"""
-    from main import db
+    """Delete a meeting and all its associated data, cancelling its running summary jobs and live summary"""
+    from main import db, ingest_batcher, live_summarizer, section_jobs, summary_jobs
     try:
+        summary_jobs.cancel(data.meeting_id, "deleted")
+        section_jobs.cancel(data.meeting_id, "deleted")
+        await live_summarizer.cancel(data.meeting_id)
+        await ingest_batcher.discard(data.meeting_id)
         success = await db.delete_meeting(data.meeting_id)
         if success:
             return {"message": "Meeting deleted successfully"}
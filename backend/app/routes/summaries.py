@@ -1,13 +1,53 @@
 from fastapi import APIRouter, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 from pydantic import BaseModel
 from typing import Optional
+import asyncio
 import logging
 import json
+import time
+
+from db import VersionConflictError
+from metrics import histogram
+from responses import FastJSONResponse
+from tracing import TracedRoute
+
+from prompts import build_section_prompt, detect_lang, language_detector
+from summary import (
+    AdmissionRejected,
+    AdmissionTicket,
+    CHUNKING_STRATEGIES,
+    CancellationToken,
+    DEFAULT_CHUNKING,
+    PREVIEW_FORMAT,
+    SECTION_KEYS,
+    JobCancelled,
+    LatencyProfile,
+    LiveSession,
+    SUMMARY_FORMAT,
+    TierStats,
+    build_preview,
+    build_summary_payload,
+    completed_summary_body,
+    estimate_summary,
+    fold_chunk_summary,
+    merge_chunk_summaries,
+    patch_section,
+    plan_for_deadline,
+    prompt_hash,
+    resolve_routing,
+    section_context,
+    section_title,
+    section_titles,
+    transform_summary,
+)
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
+
+JOB_SECONDS = histogram("maity_summary_job_duration_seconds", "Wall time of /process-transcript background jobs",
+                        ("outcome",))
 
 class TranscriptRequest(BaseModel):
     """Request model for transcript text, updated with meeting_id"""
@@ -18,109 +58,236 @@ class TranscriptRequest(BaseModel):
     chunk_size: Optional[int] = 5000
     overlap: Optional[int] = 1000
     custom_prompt: Optional[str] = "Generate a summary of the meeting transcript."
+    chunking: Optional[str] = None  # "fixed" or "topic"; server default when omitted
+    # Cheaper model for per-chunk extraction; `model` then only runs the final reduce.
+    # Defaults to MAITY_CHUNK_MODEL ("provider/model_name") when omitted.
+    chunk_model: Optional[str] = None
+    chunk_model_name: Optional[str] = None
+    # Seconds the caller can wait for the summary. The job is planned to fit and,
+    # if time still runs out, completes with a partial result.
+    deadline_seconds: Optional[float] = None
+
+class SummaryEstimateRequest(BaseModel):
+    """What /process-transcript would be asked to do; nothing is stored or run"""
+    text: str
+    model: str
+    model_name: str
+    chunk_size: Optional[int] = 5000
+    overlap: Optional[int] = 1000
+    custom_prompt: Optional[str] = "Generate a summary of the meeting transcript."
+    chunking: Optional[str] = None
+    chunk_model: Optional[str] = None
+    chunk_model_name: Optional[str] = None
 
 class MeetingSummaryUpdate(BaseModel):
     meeting_id: str
     summary: dict
+    base_version: Optional[int] = None  # reject the save if the summary changed since this version
 
+class SummaryRollbackRequest(BaseModel):
+    meeting_id: str
+    version: int
+    base_version: Optional[int] = None
 
-async def process_transcript_background(process_id: str, transcript: TranscriptRequest, custom_prompt: str):
-    """Background task to process transcript"""
+class SectionRegenerateRequest(BaseModel):
+    """Request model for regenerating one section of an existing summary"""
+    meeting_id: str
+    section: str  # one of SECTION_KEYS, e.g. "ImmediateActionItems"
+    model: str
+    model_name: str
+    custom_prompt: Optional[str] = ""
+    base_version: Optional[int] = None
+
+class LiveSummaryStartRequest(BaseModel):
+    """Request model for incremental summarization of a meeting that is still recording"""
+    meeting_id: str
+    model: str
+    model_name: str
+    window_tokens: Optional[int] = 1500
+    custom_prompt: Optional[str] = "Generate a summary of the meeting transcript."
+
+class LiveSummaryFinalizeRequest(BaseModel):
+    meeting_id: str
+
+class SummaryCancelRequest(BaseModel):
+    meeting_id: str
+
+
+async def _latency_profiles(db, extract_tier, reduce_tier):
+    """Per-model latency history of the tiers a job would run, keyed by tier label.
+
+    Per-call telemetry is preferred; jobs that ran before it was recorded
+    only left per-job totals.
+    """
+    profiles = {}
+    for tier_name, tier in (("extract", extract_tier), ("reduce", reduce_tier)):
+        if tier:
+            history = await db.get_llm_call_latency(tier.provider, tier.model_name, tier_name)
+            if not history["calls"]:
+                history = await db.get_tier_latency(tier.label, tier_name)
+            profiles[tier.label] = LatencyProfile.from_history(tier.provider, history)
+    return profiles
+
+
+async def _restore_previous_summary(meeting_id: str):
+    """Serve the last stored summary again after a failed or cancelled re-run replaced it with its preview"""
     from main import processor
+    version = await processor.db.restore_latest_summary_version(meeting_id, result_format=SUMMARY_FORMAT)
+    if version is not None:
+        logger.info(f"Kept summary version {version} of {meeting_id} as the current summary")
+
+
+async def process_transcript_background(process_id: str, transcript: TranscriptRequest, custom_prompt: str,
+                                        deadline_at: Optional[float] = None,
+                                        ticket: Optional[AdmissionTicket] = None,
+                                        cancel: Optional[CancellationToken] = None):
+    """Background task to process transcript
+
+    ``deadline_at`` is the ``time.monotonic()`` the result is due by;
+    ``ticket`` is the job's admission, released when the job ends. Once
+    ``cancel`` fires the job stops without writing anything: whoever
+    cancelled it owns the process row.
+    """
+    from main import processor, summary_jobs
+    started = time.monotonic()
+    telemetry = []
+    outcome = "failed"
     try:
         logger.info(f"Starting background processing for process_id: {process_id}")
 
         if not transcript.text or not transcript.text.strip():
             raise ValueError("Empty transcript text provided")
 
-        if transcript.model in ["claude", "groq", "openai"]:
-            api_key = await processor.db.get_api_key(transcript.model)
-            if not api_key:
-                provider_names = {"claude": "Anthropic", "groq": "Groq", "openai": "OpenAI"}
-                raise ValueError(f"{provider_names.get(transcript.model, transcript.model)} API key not configured. Please set your API key in the model settings.")
-
-        _, all_json_data = await processor.process_transcript(
+        extract_tier, reduce_tier = resolve_routing(
+            transcript.model, transcript.model_name, transcript.chunk_model, transcript.chunk_model_name
+        )
+        for tier in (extract_tier, reduce_tier):
+            if tier and tier.provider in ["claude", "groq", "openai"]:
+                api_key = await processor.db.get_api_key(tier.provider)
+                if not api_key:
+                    provider_names = {"claude": "Anthropic", "groq": "Groq", "openai": "OpenAI"}
+                    raise ValueError(f"{provider_names.get(tier.provider, tier.provider)} API key not configured. Please set your API key in the model settings.")
+
+        plan = None
+        if deadline_at is not None:
+            profiles = await _latency_profiles(processor.db, extract_tier, reduce_tier)
+            chunk_size, overlap = processor.chunk_window(extract_tier.provider, extract_tier.model_name,
+                                                         transcript.chunk_size, transcript.overlap)
+            plan = plan_for_deadline(len(transcript.text), deadline_at, chunk_size, overlap,
+                                     (extract_tier, reduce_tier), profiles)
+            reduce_tier = plan.reduce_tier
+            logger.info(f"Deadline plan for {process_id}: {plan.as_dict()}")
+
+        metadata = {"routing": {"extract": extract_tier.label, "reduce": reduce_tier.label if reduce_tier else None}}
+        unfinished = []
+        num_chunks, all_json_data = await processor.process_transcript(
             text=transcript.text,
-            model=transcript.model,
-            model_name=transcript.model_name,
+            model=extract_tier.provider,
+            model_name=extract_tier.model_name,
             chunk_size=transcript.chunk_size,
             overlap=transcript.overlap,
-            custom_prompt=custom_prompt
+            custom_prompt=custom_prompt,
+            meeting_id=transcript.meeting_id,
+            metadata=metadata,
+            chunking=transcript.chunking,
+            plan=plan,
+            unfinished=unfinished,
+            telemetry=telemetry,
+            cancel=cancel
         )
 
-        final_summary = {
-            "MeetingName": "",
-            "People": {"title": "People", "blocks": []},
-            "SessionSummary": {"title": "Session Summary", "blocks": []},
-            "CriticalDeadlines": {"title": "Critical Deadlines", "blocks": []},
-            "KeyItemsDecisions": {"title": "Key Items & Decisions", "blocks": []},
-            "ImmediateActionItems": {"title": "Immediate Action Items", "blocks": []},
-            "NextSteps": {"title": "Next Steps", "blocks": []},
-            "MeetingNotes": {
-                "meeting_name": "",
-                "sections": []
-            }
-        }
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+        if all_json_data:
+            # Keep the per-chunk results so single sections can be regenerated later
+            await processor.db.save_chunk_summaries(process_id, all_json_data)
+
+        final_summary = merge_chunk_summaries(all_json_data, label=process_id)
+        model_label = extract_tier.label
 
-        for json_str in all_json_data:
+        lang = language_detector.detect_for(transcript.meeting_id, transcript.text)
+
+        if reduce_tier and all_json_data:
+            # Two-tier routing: the strong model consolidates what the cheap one extracted
             try:
-                json_dict = json.loads(json_str)
-                if "MeetingName" in json_dict and json_dict["MeetingName"]:
-                    final_summary["MeetingName"] = json_dict["MeetingName"]
-                for key in final_summary:
-                    if key == "MeetingNotes" and key in json_dict:
-                        if isinstance(json_dict[key].get("sections"), list):
-                            for section in json_dict[key]["sections"]:
-                                if not section.get("blocks"):
-                                    section["blocks"] = []
-                            final_summary[key]["sections"].extend(json_dict[key]["sections"])
-                        if json_dict[key].get("meeting_name"):
-                            final_summary[key]["meeting_name"] = json_dict[key]["meeting_name"]
-                    elif key != "MeetingName" and key in json_dict and isinstance(json_dict[key], dict) and "blocks" in json_dict[key]:
-                        if isinstance(json_dict[key]["blocks"], list):
-                            final_summary[key]["blocks"].extend(json_dict[key]["blocks"])
-                            section_exists = False
-                            for section in final_summary["MeetingNotes"]["sections"]:
-                                if section["title"] == json_dict[key]["title"]:
-                                    section["blocks"].extend(json_dict[key]["blocks"])
-                                    section_exists = True
-                                    break
-
-                            if not section_exists:
-                                final_summary["MeetingNotes"]["sections"].append({
-                                    "title": json_dict[key]["title"],
-                                    "blocks": json_dict[key]["blocks"].copy() if json_dict[key]["blocks"] else []
-                                })
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse JSON chunk for {process_id}: {e}. Chunk: {json_str[:100]}...")
+                reduce = processor.reduce_summary(reduce_tier.provider, reduce_tier.model_name, final_summary,
+                                                  custom_prompt, lang=lang, metadata=metadata, telemetry=telemetry,
+                                                  cancel=cancel)
+                if plan is not None:
+                    reduce = asyncio.wait_for(reduce, timeout=max(0.0, plan.deadline_at - time.monotonic()))
+                final_summary = await reduce
+                model_label = f"{extract_tier.label}+{reduce_tier.label}"
+            except JobCancelled:
+                raise
             except Exception as e:
-                logger.error(f"Error processing chunk data for {process_id}: {e}. Chunk: {json_str[:100]}...")
-
+                logger.warning(f"Reduce with {reduce_tier.label} failed for {process_id}, keeping merged chunk summaries: {e!r}", exc_info=True)
+                metadata.setdefault("tiers", {}).setdefault("reduce", {})["error"] = repr(e)
+
+        partial = bool(unfinished)
+        if partial:
+            # Chunks cut off by the deadline are covered by the rule-based preview
+            preview = build_preview("\n".join(unfinished), lang)
+            fold_chunk_summary(final_summary, {key: value for key, value in preview.items()
+                                               if key not in ("MeetingName", "MeetingNotes")})
+            final_summary["MeetingName"] = final_summary["MeetingName"] or preview["MeetingName"]
+            metadata["deadline"]["partial"] = True
+            logger.warning(f"Deadline reached for {process_id}: {len(unfinished)} chunks summarized by rules only")
+
+        if cancel is not None:
+            cancel.raise_if_cancelled()
         if final_summary["MeetingName"]:
             await processor.db.update_meeting_name(transcript.meeting_id, final_summary["MeetingName"])
 
-        if all_json_data:
-            await processor.db.update_process(process_id, status="completed", result=json.dumps(final_summary))
+        if all_json_data or partial:
+            meeting_name, data_json = build_summary_payload(final_summary)
+            await processor.db.add_summary_version(
+                process_id, data_json, model=model_label,
+                prompt_hash=prompt_hash(custom_prompt), result_format=SUMMARY_FORMAT, meeting_name=meeting_name
+            )
+            await processor.db.update_process(process_id, status="completed", chunk_count=num_chunks,
+                                              processing_time=time.monotonic() - started,
+                                              metadata=metadata, partial=partial)
+            outcome = "partial" if partial else "completed"
             logger.info(f"Background processing completed for process_id: {process_id}")
         else:
             error_msg = "Summary generation failed: No chunks were processed successfully. Check logs for specific errors."
-            await processor.db.update_process(process_id, status="failed", error=error_msg)
+            await processor.db.update_process(process_id, status="failed", error=error_msg,
+                                              processing_time=time.monotonic() - started, metadata=metadata)
+            await _restore_previous_summary(process_id)
             logger.error(f"Background processing failed for process_id: {process_id} - {error_msg}")
 
+    except JobCancelled as e:
+        outcome = "cancelled"
+        logger.info(f"Background processing for {process_id} stopped: {e}")
     except ValueError as e:
         error_msg = str(e)
         logger.error(f"Configuration error in background processing for {process_id}: {error_msg}", exc_info=True)
         try:
-            await processor.db.update_process(process_id, status="failed", error=error_msg)
+            await processor.db.update_process(process_id, status="failed", error=error_msg,
+                                              processing_time=time.monotonic() - started)
+            await _restore_previous_summary(process_id)
         except Exception as db_e:
             logger.error(f"Failed to update DB status to failed for {process_id}: {db_e}", exc_info=True)
     except Exception as e:
         error_msg = f"Processing error: {str(e)}"
         logger.error(f"Error in background processing for {process_id}: {error_msg}", exc_info=True)
         try:
-            await processor.db.update_process(process_id, status="failed", error=error_msg)
+            await processor.db.update_process(process_id, status="failed", error=error_msg,
+                                              processing_time=time.monotonic() - started)
+            await _restore_previous_summary(process_id)
         except Exception as db_e:
             logger.error(f"Failed to update DB status to failed for {process_id}: {db_e}", exc_info=True)
+    finally:
+        JOB_SECONDS.observe(time.monotonic() - started, outcome=outcome)
+        if ticket is not None:
+            ticket.release()
+        if cancel is not None:
+            summary_jobs.finish(transcript.meeting_id, cancel)
+        if telemetry:
+            try:
+                await processor.db.record_llm_calls(process_id, telemetry)
+            except Exception as db_e:
+                logger.error(f"Failed to record LLM telemetry for {process_id}: {db_e}", exc_info=True)
 
 
 @router.post("/process-transcript")
@@ -128,9 +295,31 @@ async def process_transcript_api(
     transcript: TranscriptRequest,
     background_tasks: BackgroundTasks
 ):
-    """Process a transcript text with background processing"""
-    from main import processor
+    """Process a transcript text with background processing
+
+    Rejected with 429 and a ``Retry-After`` while the summary queue is full.
+    A job still running for the same meeting is cancelled.
+    """
+    from main import admission, processor, summary_jobs
+    if transcript.chunking is not None and transcript.chunking not in CHUNKING_STRATEGIES:
+        raise HTTPException(status_code=400, detail=f"Unknown chunking strategy '{transcript.chunking}'. Expected one of: {', '.join(CHUNKING_STRATEGIES)}")
+    if transcript.deadline_seconds is not None and transcript.deadline_seconds <= 0:
+        raise HTTPException(status_code=400, detail="deadline_seconds must be positive")
+    deadline_at = time.monotonic() + transcript.deadline_seconds if transcript.deadline_seconds else None
+
+    # Cancel the previous job first so it cannot overwrite this one's results, and so
+    # its admission slot counts for this submission
+    superseded = summary_jobs.cancel(transcript.meeting_id, "superseded")
+    try:
+        ticket = admission.admit(len(transcript.text.encode("utf-8")))
+    except AdmissionRejected as e:
+        if superseded:
+            await processor.db.update_process(transcript.meeting_id, status="cancelled", error=str(e))
+            await _restore_previous_summary(transcript.meeting_id)
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
     try:
+        cancel = summary_jobs.start(transcript.meeting_id, ticket)
         process_id = await processor.db.create_process(transcript.meeting_id)
 
         await processor.db.save_transcript(
@@ -142,32 +331,102 @@ async def process_transcript_api(
             transcript.overlap
         )
 
+        # New transcript: detect its language once, the background job reuses the cached value
+        language_detector.forget(transcript.meeting_id)
+        lang = language_detector.detect_for(transcript.meeting_id, transcript.text)
+
+        # Instant local preview; /get-summary serves it until the LLM result replaces it
+        preview_name, preview_json = build_summary_payload(build_preview(transcript.text, lang))
+        await processor.db.update_process(process_id, status="PENDING", result=preview_json,
+                                          result_format=PREVIEW_FORMAT, meeting_name=preview_name)
+
         custom_prompt = transcript.custom_prompt
 
         background_tasks.add_task(
             process_transcript_background,
             process_id,
             transcript,
-            custom_prompt
+            custom_prompt,
+            deadline_at,
+            ticket,
+            cancel
         )
 
-        return JSONResponse({
+        return FastJSONResponse({
             "message": "Processing started",
-            "process_id": process_id
+            "process_id": process_id,
+            "preview": {
+                "provisional": True,
+                "meetingName": preview_name,
+                "data": json.loads(preview_json)
+            }
         })
 
     except Exception as e:
+        ticket.release()
+        summary_jobs.cancel(transcript.meeting_id)
         logger.error(f"Error in process_transcript_api: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/cancel-summary")
+async def cancel_summary(request: SummaryCancelRequest):
+    """Cancel the summary job, live summary or section regeneration running for a meeting, aborting its in-flight LLM calls"""
+    from main import live_summarizer, processor, section_jobs, summary_jobs
+    cancelled = summary_jobs.cancel(request.meeting_id)
+    if await live_summarizer.cancel(request.meeting_id):
+        cancelled = True
+    section_cancelled = section_jobs.cancel(request.meeting_id)
+    if not cancelled:
+        # A section regeneration never touched the process row
+        return {"message": "Summary generation cancelled successfully" if section_cancelled
+                else "No active summary generation to cancel",
+                "meeting_id": request.meeting_id, "cancelled": section_cancelled}
+    try:
+        await processor.db.update_process(request.meeting_id, status="cancelled",
+                                          error="Generation was cancelled by user")
+        await _restore_previous_summary(request.meeting_id)
+    except Exception as e:
+        logger.error(f"Failed to update DB status to cancelled for {request.meeting_id}: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"message": "Summary generation cancelled successfully", "meeting_id": request.meeting_id,
+            "cancelled": True}
+
+@router.get("/summary-queue/stats")
+async def get_summary_queue_stats():
+    """Active summary jobs, queued transcript bytes, rejections and the recent drain rate"""
+    from main import admission
+    return admission.stats()
+
+@router.post("/estimate-summary")
+async def estimate_summary_api(request: SummaryEstimateRequest):
+    """Predict chunk count, tokens and wall time of /process-transcript without calling any LLM"""
+    from main import processor
+    chunking = request.chunking or DEFAULT_CHUNKING
+    if chunking not in CHUNKING_STRATEGIES:
+        raise HTTPException(status_code=400, detail=f"Unknown chunking strategy '{chunking}'. Expected one of: {', '.join(CHUNKING_STRATEGIES)}")
+
+    try:
+        extract_tier, reduce_tier = resolve_routing(request.model, request.model_name,
+                                                    request.chunk_model, request.chunk_model_name)
+        profiles = await _latency_profiles(processor.db, extract_tier, reduce_tier)
+        chunk_size, overlap = processor.chunk_window(extract_tier.provider, extract_tier.model_name,
+                                                     request.chunk_size, request.overlap)
+        return await asyncio.to_thread(
+            estimate_summary, request.text, (extract_tier, reduce_tier), profiles, chunk_size, overlap,
+            chunking, request.custom_prompt or "", processor.clean_transcripts
+        )
+    except Exception as e:
+        logger.error(f"Error estimating summary: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/get-summary/{meeting_id}")
 async def get_summary(meeting_id: str):
     """Get the summary for a given meeting ID"""
     from main import processor
     try:
-        result = await processor.db.get_transcript_data(meeting_id)
+        result = await processor.db.get_summary_result(meeting_id)
         if not result:
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=404,
                 content={
                     "status": "error",
@@ -180,9 +439,19 @@ async def get_summary(meeting_id: str):
                 }
             )
 
-        status = result.get("status", "unknown").lower()
-        logger.debug(f"Summary status for meeting {meeting_id}: {status}, error: {result.get('error')}")
+        status = (result.get("status") or "unknown").lower()
+        logger.debug("Summary status for meeting %s: %s, error: %s", meeting_id, status, result.get("error"))
+
+        # Fast path: the payload was transformed and serialized once when the job completed
+        if status == "completed" and result.get("result_format") == SUMMARY_FORMAT and result.get("result"):
+            return Response(
+                content=completed_summary_body(meeting_id, result.get("meeting_name"),
+                                               result.get("start_time"), result.get("end_time"),
+                                               result["result"], partial=result.get("partial", False)),
+                media_type="application/json"
+            )
 
+        # Legacy rows (stored before results were pre-transformed, possibly double-encoded)
         summary_data = None
         if result.get("result"):
             try:
@@ -205,34 +474,7 @@ async def get_summary(meeting_id: str):
 
         transformed_data = {}
         if isinstance(summary_data, dict) and status == "completed":
-            transformed_data["MeetingName"] = summary_data.get("MeetingName", "")
-
-            section_mapping = {}
-
-            for backend_key, frontend_key in section_mapping.items():
-                if backend_key in summary_data and isinstance(summary_data[backend_key], dict):
-                    transformed_data[frontend_key] = summary_data[backend_key]
-
-            if "MeetingNotes" in summary_data and isinstance(summary_data["MeetingNotes"], dict):
-                meeting_notes = summary_data["MeetingNotes"]
-                if isinstance(meeting_notes.get("sections"), list):
-                    transformed_data["_section_order"] = []
-                    used_keys = set()
-
-                    for index, section in enumerate(meeting_notes["sections"]):
-                        if isinstance(section, dict) and "title" in section and "blocks" in section:
-                            if not isinstance(section.get("blocks"), list):
-                                section["blocks"] = []
-
-                            base_key = section["title"].lower().replace(" & ", "_").replace(" ", "_")
-
-                            key = base_key
-                            if key in used_keys:
-                                key = f"{base_key}_{index}"
-
-                            used_keys.add(key)
-                            transformed_data[key] = section
-                            transformed_data["_section_order"].append(key)
+            transformed_data = transform_summary(summary_data)
 
         response = {
             "status": "processing" if status in ["processing", "pending", "started"] else status,
@@ -249,31 +491,45 @@ async def get_summary(meeting_id: str):
             response["data"] = None
             response["meetingName"] = None
             logger.info(f"Returning failed status with error: {response['error']}")
-            return JSONResponse(status_code=400, content=response)
+            return FastJSONResponse(status_code=400, content=response)
 
         elif status in ["processing", "pending", "started"]:
+            if result.get("result_format") == PREVIEW_FORMAT and isinstance(summary_data, dict):
+                # Rule-based preview stored by /process-transcript while the LLM runs
+                response["data"] = summary_data
+                response["provisional"] = True
+            else:
+                response["data"] = None
+                response["meetingName"] = None
+            return FastJSONResponse(status_code=202, content=response)
+
+        elif status == "cancelled":
+            response["error"] = result.get("error") or "Generation was cancelled by user"
             response["data"] = None
-            return JSONResponse(status_code=202, content=response)
+            response["meetingName"] = None
+            return FastJSONResponse(status_code=200, content=response)
 
         elif status == "completed":
+            if result.get("partial"):
+                response["partial"] = True
             if not summary_data:
                 response["status"] = "error"
                 response["error"] = "Completed but summary data is missing or invalid"
                 response["data"] = None
                 response["meetingName"] = None
-                return JSONResponse(status_code=500, content=response)
-            return JSONResponse(status_code=200, content=response)
+                return FastJSONResponse(status_code=500, content=response)
+            return FastJSONResponse(status_code=200, content=response)
 
         else:
             response["status"] = "error"
             response["error"] = f"Unknown or unexpected status: {status}"
             response["data"] = None
             response["meetingName"] = None
-            return JSONResponse(status_code=500, content=response)
+            return FastJSONResponse(status_code=500, content=response)
 
     except Exception as e:
         logger.error(f"Error getting summary for {meeting_id}: {str(e)}", exc_info=True)
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={
                 "status": "error",
@@ -291,11 +547,223 @@ async def save_meeting_summary(data: MeetingSummaryUpdate):
     """Save a meeting summary"""
     from main import db
     try:
-        await db.update_meeting_summary(data.meeting_id, data.summary)
-        return {"message": "Meeting summary saved successfully"}
+        meeting_name, data_json = build_summary_payload(data.summary)
+        version = await db.update_meeting_summary(data.meeting_id, data_json, result_format=SUMMARY_FORMAT,
+                                                  meeting_name=meeting_name, expected_version=data.base_version)
+        return {"message": "Meeting summary saved successfully", "version": version}
+    except VersionConflictError as ce:
+        raise HTTPException(status_code=409, detail=str(ce))
     except ValueError as ve:
         logger.error(f"Value error saving meeting summary: {str(ve)}")
         raise HTTPException(status_code=404, detail=str(ve))
     except Exception as e:
         logger.error(f"Error saving meeting summary: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/get-summary-versions/{meeting_id}")
+async def get_summary_versions(meeting_id: str):
+    """List the stored summary versions of a meeting, newest first"""
+    from main import db
+    try:
+        return {"meeting_id": meeting_id, "versions": await db.list_summary_versions(meeting_id)}
+    except Exception as e:
+        logger.error(f"Error listing summary versions for {meeting_id}: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/get-summary-version/{meeting_id}/{version}")
+async def get_summary_version(meeting_id: str, version: int):
+    """Get one historical summary version"""
+    from main import db
+    try:
+        summary_version = await db.get_summary_version(meeting_id, version)
+    except Exception as e:
+        logger.error(f"Error getting summary version {version} for {meeting_id}: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+    if summary_version is None:
+        raise HTTPException(status_code=404, detail="Summary version not found")
+    return {"meeting_id": meeting_id, **summary_version}
+
+@router.post("/rollback-summary")
+async def rollback_summary(data: SummaryRollbackRequest):
+    """Make an older summary version current again (stored as a new version)"""
+    from main import db
+    try:
+        summary_version = await db.get_summary_version(data.meeting_id, data.version)
+        if summary_version is None:
+            raise HTTPException(status_code=404, detail="Summary version not found")
+
+        meeting_name, data_json = build_summary_payload(summary_version["payload"])
+        version = await db.add_summary_version(
+            data.meeting_id, data_json, model=f"rollback:{data.version}",
+            prompt_hash=summary_version["prompt_hash"] or "", result_format=SUMMARY_FORMAT,
+            meeting_name=meeting_name, expected_version=data.base_version
+        )
+        return {"message": "Summary rolled back successfully", "version": version}
+    except HTTPException:
+        raise
+    except VersionConflictError as ce:
+        raise HTTPException(status_code=409, detail=str(ce))
+    except Exception as e:
+        logger.error(f"Error rolling back summary for {data.meeting_id}: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/regenerate-summary-section")
+async def regenerate_summary_section(data: SectionRegenerateRequest):
+    """Regenerate a single summary section from the cached per-chunk results.
+
+    Only the target section of every chunk is sent to the LLM, so this costs a
+    fraction of a full re-summarization; the rest of the summary is kept and
+    the patched summary is stored as a new version. ``/cancel-summary``
+    aborts it (409), as does a newer regeneration for the same meeting.
+    """
+    from main import processor, section_jobs
+    from transcript_processor import People, Section
+
+    if data.section not in SECTION_KEYS:
+        raise HTTPException(status_code=400, detail=f"Unknown section '{data.section}'. Expected one of: {', '.join(SECTION_KEYS)}")
+
+    try:
+        latest = await processor.db.get_latest_summary_version(data.meeting_id)
+        if latest is None:
+            raise HTTPException(status_code=404, detail="Meeting has no summary to patch")
+        base_version = data.base_version if data.base_version is not None else latest["version"]
+        if base_version != latest["version"]:
+            raise HTTPException(status_code=409, detail=f"Summary is at version {latest['version']}, not {base_version}")
+
+        chunk_results = await processor.db.get_chunk_summaries(data.meeting_id)
+        if not chunk_results:
+            raise HTTPException(status_code=409, detail="No cached chunk results for this meeting; regenerate the full summary instead")
+
+        context = section_context(chunk_results, data.section)
+        title = section_title(data.section)
+        prompt = build_section_prompt(detect_lang(context), title, context, data.custom_prompt or "")
+        result_type = People if data.section == "People" else Section
+        stats = TierStats(model=f"{data.model}/{data.model_name}", tier="section")
+        cancel = section_jobs.start(data.meeting_id)
+        try:
+            new_section = (await processor.generate_structured(data.model, data.model_name, prompt, result_type,
+                                                               stats=stats, cancel=cancel)).model_dump()
+        finally:
+            section_jobs.finish(data.meeting_id, cancel)
+            await processor.db.record_llm_calls(data.meeting_id, stats.records)
+
+        payload = patch_section(json.loads(latest["payload"]), data.section, new_section,
+                                section_titles(chunk_results, data.section))
+        meeting_name, data_json = build_summary_payload(payload)
+        version = await processor.db.add_summary_version(
+            data.meeting_id, data_json, model=f"section:{data.section}/{data.model}/{data.model_name}",
+            prompt_hash=latest["prompt_hash"] or "", result_format=SUMMARY_FORMAT,
+            meeting_name=meeting_name, expected_version=base_version
+        )
+        return {"meeting_id": data.meeting_id, "section": data.section, "data": new_section, "version": version}
+    except HTTPException:
+        raise
+    except (VersionConflictError, JobCancelled) as ce:
+        raise HTTPException(status_code=409, detail=str(ce))
+    except ValueError as ve:
+        logger.error(f"Configuration error regenerating section {data.section} for {data.meeting_id}: {str(ve)}")
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        logger.error(f"Error regenerating section {data.section} for {data.meeting_id}: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def finalize_live_summary_background(meeting_id: str, session: LiveSession):
+    """Background task that summarizes the last live window and stores the reduced summary.
+
+    ``session`` must have been claimed with ``LiveSummarizer.claim_finalize``,
+    so this task owns the meeting's process row until it finishes.
+    """
+    from main import processor, live_summarizer
+    try:
+        final_summary = await live_summarizer.finalize(meeting_id)
+
+        if final_summary["MeetingName"]:
+            await processor.db.update_meeting_name(meeting_id, final_summary["MeetingName"])
+
+        meeting_name, data_json = build_summary_payload(final_summary)
+        await processor.db.add_summary_version(
+            meeting_id, data_json, model=f"{session.model}/{session.model_name}",
+            prompt_hash=prompt_hash(session.custom_prompt), result_format=SUMMARY_FORMAT, meeting_name=meeting_name
+        )
+        await processor.db.update_process(meeting_id, status="completed")
+        logger.info(f"Live summary finalized for meeting_id: {meeting_id}")
+    except JobCancelled as e:
+        # /cancel-summary or /delete-meeting already updated (or removed) the process
+        logger.info(f"Finalizing live summary for {meeting_id} stopped: {e.reason}")
+    except Exception as e:
+        error_msg = f"Processing error: {str(e)}"
+        logger.error(f"Error finalizing live summary for {meeting_id}: {error_msg}", exc_info=True)
+        try:
+            await processor.db.update_process(meeting_id, status="failed", error=error_msg)
+        except Exception as db_e:
+            logger.error(f"Failed to update DB status to failed for {meeting_id}: {db_e}", exc_info=True)
+
+
+@router.post("/start-live-summary")
+async def start_live_summary(request: LiveSummaryStartRequest):
+    """Start summarizing a meeting incrementally as its segments are appended.
+
+    Starting a meeting that already has a live session returns that session
+    and leaves its process row alone.
+    """
+    from main import processor, live_summarizer
+    try:
+        if request.window_tokens is not None and request.window_tokens <= 0:
+            raise HTTPException(status_code=400, detail="window_tokens must be positive")
+        if not await processor.db.meeting_exists(request.meeting_id):
+            raise HTTPException(status_code=404, detail="Meeting not found")
+
+        session = await live_summarizer.start(
+            request.meeting_id,
+            request.model,
+            request.model_name,
+            custom_prompt=request.custom_prompt or "",
+            window_tokens=request.window_tokens or 1500,
+            on_start=lambda: processor.db.create_process(request.meeting_id),
+        )
+        return FastJSONResponse({
+            "message": "Live summary started",
+            "process_id": request.meeting_id,
+            "windows_completed": session.next_index
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in start_live_summary: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/get-live-summary/{meeting_id}")
+async def get_live_summary(meeting_id: str):
+    """Get the running summary of a meeting that is being summarized incrementally"""
+    from main import live_summarizer
+    session = live_summarizer.get_session(meeting_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="No live summary session for this meeting")
+    return FastJSONResponse({
+        "meeting_id": meeting_id,
+        "status": "failed" if session.error else "live",
+        "error": session.error,
+        "windows_completed": session.next_index,
+        "pending_chars": session.pending_chars,
+        "data": session.running_summary
+    })
+
+@router.post("/finalize-live-summary")
+async def finalize_live_summary(request: LiveSummaryFinalizeRequest, background_tasks: BackgroundTasks):
+    """Finish a live summary: summarize the last window and reduce all windows"""
+    from main import live_summarizer
+    try:
+        session = live_summarizer.claim_finalize(request.meeting_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="No live summary session for this meeting")
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    background_tasks.add_task(finalize_live_summary_background, request.meeting_id, session)
+    return FastJSONResponse({
+        "message": "Processing started",
+        "process_id": request.meeting_id
+    })
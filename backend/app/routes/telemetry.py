@@ -0,0 +1,64 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response
+from typing import Optional
+from datetime import datetime, timedelta
+import logging
+
+from tracing import TracedRoute
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(route_class=TracedRoute)
+
+
+@router.get("/llm-telemetry/stats")
+async def get_llm_telemetry_stats(hours: float = 24, provider: Optional[str] = None,
+                                  model: Optional[str] = None, tier: Optional[str] = None):
+    """p50/p95 latency, time-to-first-token and tokens/sec per model over the last ``hours``"""
+    from main import db
+    if hours <= 0:
+        raise HTTPException(status_code=400, detail="hours must be positive")
+    try:
+        until = datetime.utcnow()
+        since = until - timedelta(hours=hours)
+        stats = await db.get_llm_call_stats(since.isoformat(), until.isoformat(),
+                                            provider=provider, model=model, tier=tier)
+        return {"since": since.isoformat(), "until": until.isoformat(), "models": stats}
+    except Exception as e:
+        logger.error(f"Error getting LLM telemetry stats: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/llm-telemetry/calls/{meeting_id}")
+async def get_llm_telemetry_calls(meeting_id: str):
+    """List the LLM calls recorded for a meeting's summaries"""
+    from main import db
+    try:
+        return {"meeting_id": meeting_id, "calls": await db.get_llm_calls(meeting_id)}
+    except Exception as e:
+        logger.error(f"Error getting LLM calls for {meeting_id}: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/llm-telemetry/limits")
+async def get_llm_rate_limits():
+    """Current concurrency limit, bucket levels and retry counts per provider and API key"""
+    from summary import rate_limiters
+    return {"limiters": rate_limiters.stats()}
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """Prometheus text exposition of the in-process counters and histograms"""
+    import metrics
+    return Response(content=metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@router.get("/debug/profiles/{profile_id}")
+async def get_request_profile(profile_id: str):
+    """Sampling-profiler report of a request sent with ``X-Maity-Profile: 1``"""
+    from tracing import get_profile
+    report = get_profile(profile_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return Response(content=report, media_type="text/plain")
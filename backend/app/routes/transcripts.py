@@ -1,13 +1,17 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel, ValidationError
 from typing import Optional, List
+import asyncio
 import logging
 import time
 
+from ingest import Segment
+from responses import FastJSONResponse
+from tracing import TracedRoute
+
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(route_class=TracedRoute)
 
 class Transcript(BaseModel):
     id: str
@@ -25,6 +29,18 @@ class SaveTranscriptRequest(BaseModel):
 class SearchRequest(BaseModel):
     query: str
 
+class AppendSegment(BaseModel):
+    """One NDJSON line of /append-transcript"""
+    seq: int
+    text: str
+    timestamp: str
+    audio_start_time: Optional[float] = None
+    audio_end_time: Optional[float] = None
+    duration: Optional[float] = None
+
+# A single NDJSON line larger than this is rejected instead of buffered
+MAX_APPEND_LINE_BYTES = 1_000_000
+
 
 @router.post("/save-transcript")
 async def save_transcript(request: SaveTranscriptRequest):
@@ -66,7 +82,93 @@ async def search_transcripts(request: SearchRequest):
     from main import db
     try:
         results = await db.search_transcripts(request.query)
-        return JSONResponse(content=results)
+        return FastJSONResponse(content=results)
     except Exception as e:
         logger.error(f"Error searching transcripts: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/append-transcript/{meeting_id}")
+async def append_transcript(meeting_id: str, request: Request):
+    """Append segments to an existing meeting from a streamed NDJSON body.
+
+    Each line is one segment with a per-meeting, increasing ``seq``. Segments
+    are acknowledged once the ingest batcher has made them durable (journal
+    fsync, or SQLite commit when the journal is disabled); segments at or
+    below the last acknowledged ``seq`` are not stored again, so a client can
+    safely resend everything after the last ``acked_seq`` it received.
+
+    If a batch fails to commit, reading stops and the response is a 500 whose
+    ``acked_seq`` stays below the first failed segment.
+    """
+    from main import db, ingest_batcher
+
+    if not await db.meeting_exists(meeting_id):
+        raise HTTPException(status_code=404, detail="Meeting not found")
+
+    stats = {"accepted": 0, "duplicates": 0, "acked_seq": await ingest_batcher.last_acked_seq(meeting_id)}
+    pending = set()
+    failure = {}  # first commit error and the lowest seq that failed
+
+    def _on_committed(future, seq):
+        pending.discard(future)
+        error = asyncio.CancelledError() if future.cancelled() else future.exception()
+        if error is not None:
+            failure.setdefault("error", error)
+            failure["seq"] = min(failure.get("seq", seq), seq)
+            return
+        stats["accepted" if future.result() else "duplicates"] += 1
+        stats["acked_seq"] = max(stats["acked_seq"], seq)
+
+    async def _submit_line(line: bytes):
+        segment = AppendSegment.model_validate_json(line)
+        future = await ingest_batcher.submit(Segment(
+            meeting_id=meeting_id,
+            seq=segment.seq,
+            text=segment.text,
+            timestamp=segment.timestamp,
+            audio_start_time=segment.audio_start_time,
+            audio_end_time=segment.audio_end_time,
+            duration=segment.duration
+        ))
+        pending.add(future)
+        future.add_done_callback(lambda f, seq=segment.seq: _on_committed(f, seq))
+
+    def _response(status_code: int, error: Optional[str] = None):
+        content = {"status": "success" if error is None else "error", "meeting_id": meeting_id, **stats}
+        if failure:
+            # Later batches may have committed, but the client must resend from the failed segment
+            content["acked_seq"] = min(stats["acked_seq"], failure["seq"] - 1)
+        if error is not None:
+            content["error"] = error
+        return FastJSONResponse(status_code=status_code, content=content)
+
+    buffer = b""
+    try:
+        async for chunk in request.stream():
+            if failure:
+                break
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            if len(buffer) > MAX_APPEND_LINE_BYTES:
+                await asyncio.gather(*pending, return_exceptions=True)
+                return _response(413, "Segment line too large")
+            for line in lines:
+                if line.strip() and not failure:
+                    await _submit_line(line)
+        if buffer.strip() and not failure:
+            await _submit_line(buffer)
+
+        await asyncio.gather(*pending, return_exceptions=True)
+        if failure:
+            logger.error(f"Failed to commit segments from seq {failure['seq']} for meeting {meeting_id}: {failure['error']!r}")
+            return _response(500, f"Failed to commit segments: {failure['error']}")
+        return _response(200)
+
+    except ValidationError as e:
+        await asyncio.gather(*pending, return_exceptions=True)
+        logger.warning(f"Invalid segment line for meeting {meeting_id}: {str(e)}")
+        return _response(422, f"Invalid segment: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error appending transcript for {meeting_id}: {str(e)}", exc_info=True)
+        await asyncio.gather(*pending, return_exceptions=True)
+        return _response(500, str(e))
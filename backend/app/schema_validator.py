@@ -57,7 +57,10 @@ class SchemaValidator:
                 ('end_time', 'TEXT', ''),
                 ('chunk_count', 'INTEGER', 'DEFAULT 0'),
                 ('processing_time', 'REAL', 'DEFAULT 0.0'),
-                ('metadata', 'TEXT', '')
+                ('metadata', 'TEXT', ''),
+                ('result_format', 'TEXT', ''),
+                ('meeting_name', 'TEXT', ''),
+                ('partial', 'INTEGER', 'DEFAULT 0')
             ],
             'transcript_chunks': [
                 ('meeting_id', 'TEXT', 'PRIMARY KEY'),
@@ -69,6 +72,63 @@ class SchemaValidator:
                 ('overlap', 'INTEGER', ''),
                 ('created_at', 'TEXT', 'NOT NULL')
             ],
+            'summary_windows': [
+                ('meeting_id', 'TEXT', 'NOT NULL'),
+                ('window_index', 'INTEGER', 'NOT NULL'),
+                ('start_rowid', 'INTEGER', 'NOT NULL'),
+                ('end_rowid', 'INTEGER', 'NOT NULL'),
+                ('char_count', 'INTEGER', 'DEFAULT 0'),
+                ('result', 'TEXT', ''),
+                ('model', 'TEXT', ''),
+                ('model_name', 'TEXT', ''),
+                ('created_at', 'TEXT', 'NOT NULL')
+            ],
+            'chunk_summaries': [
+                ('meeting_id', 'TEXT', 'NOT NULL'),
+                ('chunk_index', 'INTEGER', 'NOT NULL'),
+                ('result', 'TEXT', 'NOT NULL'),
+                ('created_at', 'TEXT', 'NOT NULL')
+            ],
+            'summary_versions': [
+                ('meeting_id', 'TEXT', 'NOT NULL'),
+                ('version', 'INTEGER', 'NOT NULL'),
+                ('model', 'TEXT', ''),
+                ('prompt_hash', 'TEXT', ''),
+                ('created_at', 'TEXT', 'NOT NULL'),
+                ('payload', 'TEXT', 'NOT NULL'),
+                ('is_diff', 'INTEGER', 'NOT NULL DEFAULT 0'),
+                ('is_latest', 'INTEGER', 'NOT NULL DEFAULT 0')
+            ],
+            'ingest_cursors': [
+                ('meeting_id', 'TEXT', 'PRIMARY KEY'),
+                ('last_seq', 'INTEGER', 'NOT NULL'),
+                ('updated_at', 'TEXT', 'NOT NULL')
+            ],
+            'llm_calls': [
+                ('id', 'INTEGER', 'PRIMARY KEY AUTOINCREMENT'),
+                ('meeting_id', 'TEXT', ''),
+                ('provider', 'TEXT', 'NOT NULL'),
+                ('model', 'TEXT', 'NOT NULL'),
+                ('tier', 'TEXT', 'NOT NULL'),
+                ('chunk_index', 'INTEGER', ''),
+                ('prompt_tokens', 'INTEGER', 'DEFAULT 0'),
+                ('completion_tokens', 'INTEGER', 'DEFAULT 0'),
+                ('ttft_ms', 'REAL', ''),
+                ('latency_ms', 'REAL', 'NOT NULL'),
+                ('retries', 'INTEGER', 'DEFAULT 0'),
+                ('cached_tokens', 'INTEGER', 'DEFAULT 0'),
+                ('ok', 'INTEGER', 'NOT NULL DEFAULT 1'),
+                ('error', 'TEXT', ''),
+                ('created_at', 'TEXT', 'NOT NULL')
+            ],
+            'change_log': [
+                ('seq', 'INTEGER', 'PRIMARY KEY AUTOINCREMENT'),
+                ('entity', 'TEXT', 'NOT NULL'),
+                ('entity_id', 'TEXT', 'NOT NULL'),
+                ('meeting_id', 'TEXT', ''),
+                ('op', 'TEXT', 'NOT NULL'),
+                ('changed_at', 'TEXT', 'NOT NULL')
+            ],
             'settings': [
                 ('id', 'TEXT', 'PRIMARY KEY'),
                 ('provider', 'TEXT', 'NOT NULL'),
@@ -0,0 +1,66 @@
+"""
+Summarization pipeline helpers shared by the summary routes.
+
+    from summary import merge_chunk_summaries, LiveSummarizer
+"""
+from .admission import AdmissionController, AdmissionRejected, AdmissionTicket
+from .chunking import CHUNKING_STRATEGIES, DEFAULT_CHUNKING, fixed_chunk_sizes, fixed_chunks, split_transcript, topic_chunks
+from .cleanup import clean_transcript, collapse_loops
+from .deadline import DeadlinePlan, LatencyProfile, plan_for_deadline
+from .estimate import estimate_summary
+from .merge import empty_summary, fold_chunk_summary, merge_chunk_summaries
+from .jobs import CancellationToken, JobCancelled, JobRegistry
+from .live import LiveSession, LiveSummarizer
+from .payload import SUMMARY_FORMAT, build_summary_payload, completed_summary_body, prompt_hash, transform_summary
+from .preview import PREVIEW_FORMAT, build_preview
+from .ratelimit import ProviderLimiter, RateLimiterRegistry, rate_limiters
+from .routing import ModelTier, TierStats, resolve_routing
+from .sections import SECTION_KEYS, patch_section, section_context, section_title, section_titles
+from .tokens import CHARS_PER_TOKEN, estimate_tokens, tokens_to_chars
+
+__all__ = [
+    "AdmissionController",
+    "AdmissionRejected",
+    "AdmissionTicket",
+    "CHUNKING_STRATEGIES",
+    "DEFAULT_CHUNKING",
+    "fixed_chunk_sizes",
+    "fixed_chunks",
+    "split_transcript",
+    "topic_chunks",
+    "clean_transcript",
+    "collapse_loops",
+    "DeadlinePlan",
+    "LatencyProfile",
+    "plan_for_deadline",
+    "estimate_summary",
+    "empty_summary",
+    "fold_chunk_summary",
+    "merge_chunk_summaries",
+    "CancellationToken",
+    "JobCancelled",
+    "JobRegistry",
+    "LiveSession",
+    "LiveSummarizer",
+    "SUMMARY_FORMAT",
+    "build_summary_payload",
+    "completed_summary_body",
+    "prompt_hash",
+    "transform_summary",
+    "PREVIEW_FORMAT",
+    "build_preview",
+    "ProviderLimiter",
+    "RateLimiterRegistry",
+    "rate_limiters",
+    "ModelTier",
+    "TierStats",
+    "resolve_routing",
+    "SECTION_KEYS",
+    "patch_section",
+    "section_context",
+    "section_title",
+    "section_titles",
+    "CHARS_PER_TOKEN",
+    "estimate_tokens",
+    "tokens_to_chars",
+]
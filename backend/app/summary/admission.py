@@ -0,0 +1,125 @@
+import logging
+import math
+import os
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Summary jobs allowed to run at once, and transcript bytes they may hold in memory together
+MAX_ACTIVE_JOBS = int(os.getenv("MAITY_MAX_ACTIVE_JOBS", "4"))
+MAX_QUEUED_BYTES = int(os.getenv("MAITY_MAX_QUEUED_BYTES", str(64 * 1024 * 1024)))
+
+# Completions the drain rate is measured over, and the Retry-After bounds
+DRAIN_WINDOW_S = 600.0
+DEFAULT_RETRY_AFTER_S = 30
+MAX_RETRY_AFTER_S = 600
+
+
+class AdmissionRejected(Exception):
+    """Raised when a summary job would exceed the active-job or queued-bytes limit"""
+    def __init__(self, reason: str, retry_after: int):
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(f"Summary queue is full ({reason}); retry in {retry_after}s")
+
+
+class AdmissionTicket:
+    """An admitted job. ``release`` it once the job ends, however it ends."""
+    def __init__(self, controller: "AdmissionController", nbytes: int, admitted_at: float):
+        self.controller = controller
+        self.nbytes = nbytes
+        self.admitted_at = admitted_at
+        self.released = False
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.controller._release(self)
+
+
+class AdmissionController:
+    """Bounds the summary jobs in flight by count and by transcript bytes.
+
+    Every job holds its whole transcript in memory and competes for the same
+    provider, so past ``max_active_jobs`` or ``max_queued_bytes`` new jobs are
+    turned away instead of slowing every job down. The ``Retry-After`` given
+    with a rejection is how long the recent drain rate (jobs and bytes
+    completed over the last ``DRAIN_WINDOW_S``) needs to free enough room. A
+    single transcript larger than the byte budget is still admitted when
+    nothing else is running, or it could never run at all.
+    """
+
+    def __init__(self, max_active_jobs: int = MAX_ACTIVE_JOBS, max_queued_bytes: int = MAX_QUEUED_BYTES,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_active_jobs = max_active_jobs
+        self.max_queued_bytes = max_queued_bytes
+        self.clock = clock
+        self.active_jobs = 0
+        self.queued_bytes = 0
+        self.admitted = 0
+        self.rejected = {"jobs": 0, "bytes": 0}
+        self._started = clock()
+        self._completed: Deque[Tuple[float, int]] = deque()  # (finished at, bytes)
+
+    def admit(self, nbytes: int) -> AdmissionTicket:
+        """Admit a job over ``nbytes`` of transcript, or raise ``AdmissionRejected``"""
+        if self.active_jobs >= self.max_active_jobs:
+            reason = "jobs"
+        elif self.active_jobs and self.queued_bytes + nbytes > self.max_queued_bytes:
+            reason = "bytes"
+        else:
+            self.active_jobs += 1
+            self.queued_bytes += nbytes
+            self.admitted += 1
+            return AdmissionTicket(self, nbytes, self.clock())
+
+        self.rejected[reason] += 1
+        retry_after = self.retry_after(nbytes)
+        logger.warning(f"Rejecting summary job of {nbytes} bytes ({reason} limit): {self.active_jobs} active, "
+                       f"{self.queued_bytes} bytes queued; retry in {retry_after}s")
+        raise AdmissionRejected(reason, retry_after)
+
+    def _release(self, ticket: AdmissionTicket):
+        self.active_jobs -= 1
+        self.queued_bytes -= ticket.nbytes
+        self._completed.append((self.clock(), ticket.nbytes))
+        self._trim()
+
+    def _trim(self):
+        horizon = self.clock() - DRAIN_WINDOW_S
+        while self._completed and self._completed[0][0] < horizon:
+            self._completed.popleft()
+
+    def drain_rate(self) -> Tuple[float, float]:
+        """Jobs and bytes completed per second over the drain window"""
+        self._trim()
+        span = min(DRAIN_WINDOW_S, self.clock() - self._started)
+        if not self._completed or span <= 0:
+            return 0.0, 0.0
+        return len(self._completed) / span, sum(nbytes for _, nbytes in self._completed) / span
+
+    def retry_after(self, nbytes: int) -> int:
+        """Seconds until a job of ``nbytes`` would fit, at the current drain rate"""
+        jobs_per_sec, bytes_per_sec = self.drain_rate()
+        if not jobs_per_sec:
+            return DEFAULT_RETRY_AFTER_S
+        jobs_over = self.active_jobs - self.max_active_jobs + 1
+        bytes_over = self.queued_bytes + nbytes - self.max_queued_bytes
+        seconds = max(jobs_over / jobs_per_sec if jobs_over > 0 else 0.0,
+                      bytes_over / bytes_per_sec if bytes_over > 0 else 0.0)
+        return min(MAX_RETRY_AFTER_S, max(1, math.ceil(seconds)))
+
+    def stats(self) -> Dict:
+        jobs_per_sec, bytes_per_sec = self.drain_rate()
+        return {
+            "active_jobs": self.active_jobs,
+            "queued_bytes": self.queued_bytes,
+            "max_active_jobs": self.max_active_jobs,
+            "max_queued_bytes": self.max_queued_bytes,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "drain_jobs_per_sec": round(jobs_per_sec, 4),
+            "drain_bytes_per_sec": round(bytes_per_sec, 1),
+        }
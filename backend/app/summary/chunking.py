@@ -0,0 +1,232 @@
+import logging
+import os
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from prompts import FUNCTION_WORDS
+
+logger = logging.getLogger(__name__)
+
+CHUNKING_STRATEGIES = ("fixed", "topic")
+DEFAULT_CHUNKING = os.getenv("MAITY_CHUNKING_STRATEGY", "fixed")
+
+# TextTiling parameters: words per token-sequence and sequences per block
+SEQUENCE_WORDS = 20
+BLOCK_SEQUENCES = 6
+# Characters a term is truncated to; a cheap stand-in for stemming
+STEM_CHARS = 6
+
+_WORD_RE = re.compile(r"\S+")
+_TERM_RE = re.compile(r"[^\W\d_]{3,}")
+_SENTENCE_END_RE = re.compile(r"[.!?…]\s|\n")
+_STOPWORDS = frozenset().union(*FUNCTION_WORDS.values())
+
+
+def _fixed_step(chunk_size: int, overlap: int) -> int:
+    step = chunk_size - overlap
+    if step <= 0:
+        logger.warning(f"Overlap ({overlap}) >= chunk_size ({chunk_size}). Adjusting overlap.")
+        step = chunk_size - max(0, chunk_size - 100)
+    return step
+
+
+def fixed_chunks(text: str, chunk_size: int, overlap: int) -> List[str]:
+    """Split ``text`` into fixed-size character chunks with ``overlap``."""
+    step = _fixed_step(chunk_size, overlap)
+    return [text[i:i + chunk_size] for i in range(0, len(text), step)]
+
+
+def fixed_chunk_sizes(length: int, chunk_size: int, overlap: int) -> List[int]:
+    """Lengths of the chunks ``fixed_chunks`` makes of a ``length``-char text, without slicing it."""
+    step = _fixed_step(chunk_size, overlap)
+    return [min(chunk_size, length - start) for start in range(0, length, step)]
+
+
+def _sequence_terms(text: str, word_starts: np.ndarray):
+    """Sparse (sequence, term, count) triples of the token-sequences of ``text``"""
+    vocabulary = {}
+    term_ids, term_starts = [], []
+    for match in _TERM_RE.finditer(text.lower()):
+        term = match.group()
+        if term in _STOPWORDS:
+            continue
+        term_ids.append(vocabulary.setdefault(term[:STEM_CHARS], len(vocabulary)))
+        term_starts.append(match.start())
+    if not term_ids:
+        return None
+    # Sequence of each term: index of the word it falls in, divided by SEQUENCE_WORDS
+    seqs = (np.searchsorted(word_starts, np.asarray(term_starts, dtype=np.int64), side="right") - 1) // SEQUENCE_WORDS
+    keys = seqs * len(vocabulary) + np.asarray(term_ids, dtype=np.int64)
+    keys, counts = np.unique(keys, return_counts=True)
+    return keys // len(vocabulary), keys % len(vocabulary), counts.astype(np.float64), len(vocabulary)
+
+
+def _block_sums(seq, term, count, offsets, gaps: int, vocabulary: int):
+    """Sum the term vectors of the sequences at ``gap + offset`` for every gap.
+
+    Each (sequence, term) entry is expanded to the gaps whose block contains
+    it, so the work is O(nnz * BLOCK_SEQUENCES).
+    """
+    gap = (seq[:, None] - offsets[None, :]).ravel()
+    keep = (gap >= 0) & (gap < gaps)
+    keys = gap[keep] * vocabulary + np.repeat(term, len(offsets))[keep]
+    values = np.repeat(count, len(offsets))[keep]
+    keys, inverse = np.unique(keys, return_inverse=True)
+    return keys, np.bincount(inverse, weights=values)
+
+
+def gap_similarities(text: str, word_starts: np.ndarray) -> np.ndarray:
+    """Cosine similarity between the blocks left and right of every sequence gap.
+
+    Gap ``g`` sits between token-sequence ``g`` and ``g + 1``.
+    """
+    triples = _sequence_terms(text, word_starts)
+    sequences = (len(word_starts) + SEQUENCE_WORDS - 1) // SEQUENCE_WORDS
+    gaps = sequences - 1
+    if triples is None or gaps <= 0:
+        return np.zeros(max(gaps, 0))
+    seq, term, count, vocabulary = triples
+
+    # Left block of gap g: sequences g-k+1..g; right block: g+1..g+k
+    left_keys, left = _block_sums(seq, term, count, -np.arange(BLOCK_SEQUENCES), gaps, vocabulary)
+    right_keys, right = _block_sums(seq, term, count, np.arange(1, BLOCK_SEQUENCES + 1), gaps, vocabulary)
+
+    left_norm = np.bincount(left_keys // vocabulary, weights=left ** 2, minlength=gaps)
+    right_norm = np.bincount(right_keys // vocabulary, weights=right ** 2, minlength=gaps)
+    _, left_index, right_index = np.intersect1d(left_keys, right_keys, assume_unique=True, return_indices=True)
+    dot = np.bincount(left_keys[left_index] // vocabulary,
+                      weights=left[left_index] * right[right_index], minlength=gaps)
+
+    denominator = np.sqrt(left_norm * right_norm)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(denominator > 0, dot / denominator, 0.0)
+
+
+def depth_scores(similarities: np.ndarray) -> np.ndarray:
+    """TextTiling depth score of every gap, in linear time.
+
+    The left (right) peak of a gap is found by climbing while similarity
+    keeps rising; since the climb from gap i passes through gap i-1's climb,
+    each peak is derived from its neighbour's.
+    """
+    scores = np.convolve(similarities, np.ones(3) / 3, mode="same") if len(similarities) >= 3 else similarities
+    n = len(scores)
+    left_peak = scores.copy()
+    right_peak = scores.copy()
+    for i in range(1, n):
+        if scores[i - 1] >= scores[i]:
+            left_peak[i] = left_peak[i - 1]
+    for i in range(n - 2, -1, -1):
+        if scores[i + 1] >= scores[i]:
+            right_peak[i] = right_peak[i + 1]
+    return (left_peak - scores) + (right_peak - scores)
+
+
+def _snap(text: str, position: int, lookback: int) -> int:
+    """Move a cut back to the end of the sentence it falls in, if one is close"""
+    start = max(0, position - lookback)
+    last_end = None
+    for match in _SENTENCE_END_RE.finditer(text, start, position):
+        last_end = match.end()
+    return last_end if last_end is not None else position
+
+
+def topic_chunks(text: str, max_chars: int, min_chars: Optional[int] = None) -> List[str]:
+    """Split ``text`` into topically coherent chunks (TextTiling).
+
+    Token-sequences of ``SEQUENCE_WORDS`` words are compared block against
+    block; gaps whose depth score stands out (mean - std/2) become topic
+    boundaries. Segments shorter than ``min_chars`` are merged into a
+    neighbour and segments longer than ``max_chars`` are split again at
+    their deepest gap, so every chunk fits the model budget.
+    """
+    if len(text) <= max_chars:
+        return [text] if text else []
+    min_chars = min_chars if min_chars is not None else max_chars // 4
+
+    word_starts = np.fromiter((match.start() for match in _WORD_RE.finditer(text)), dtype=np.int64)
+    depths = depth_scores(gap_similarities(text, word_starts))
+    # Char offset where each gap cuts: the start of the next sequence's first word
+    gap_offsets = word_starts[SEQUENCE_WORDS::SEQUENCE_WORDS][:len(depths)]
+
+    if len(depths):
+        cutoff = depths.mean() - depths.std() / 2
+        is_peak = np.r_[True, depths[1:] >= depths[:-1]] & np.r_[depths[:-1] >= depths[1:], True]
+        boundaries = np.flatnonzero((depths > cutoff) & is_peak & (depths > 0))
+    else:
+        boundaries = np.array([], dtype=np.int64)
+
+    cuts = {0: np.inf, len(text): np.inf}
+    cuts.update((int(gap_offsets[g]), float(depths[g])) for g in boundaries)
+    segments = _enforce_budget(cuts, gap_offsets, depths, max_chars, min_chars)
+
+    # Move every cut back to a sentence end when the following chunk still fits
+    lookback = SEQUENCE_WORDS * 12
+    chunks = []
+    start = 0
+    for index, end in enumerate(segments[1:], start=1):
+        if end < len(text):
+            snapped = _snap(text, end, lookback)
+            if snapped > start and segments[index + 1] - snapped <= max_chars:
+                end = snapped
+        chunks.append(text[start:end])
+        start = end
+    logger.info(f"Topic segmentation: {len(chunks)} chunks from {len(boundaries)} boundaries "
+                f"(sizes {min(map(len, chunks))}-{max(map(len, chunks))} chars)")
+    return chunks
+
+
+def _enforce_budget(cuts: Dict[int, float], gap_offsets: np.ndarray, depths: np.ndarray,
+                    max_chars: int, min_chars: int) -> List[int]:
+    """Turn ``{offset: depth}`` cuts into chunk offsets that respect the size limits.
+
+    Segments above ``max_chars`` are split at their deepest inner gap (or
+    evenly when there is none); segments below ``min_chars`` are merged
+    across whichever of their two cuts is shallower, if the result fits.
+    """
+    offsets = sorted(cuts)
+    split = [offsets[0]]
+    for start, end in zip(offsets[:-1], offsets[1:]):
+        pending = [(start, end)]
+        while pending:
+            start, end = pending.pop()
+            if end - start <= max_chars:
+                split.append(end)
+                continue
+            inner = np.flatnonzero((gap_offsets > start + min_chars // 2) & (gap_offsets < end - min_chars // 2))
+            if len(inner):
+                deepest = inner[np.argmax(depths[inner])]
+                middle, cuts[int(gap_offsets[deepest])] = int(gap_offsets[deepest]), float(depths[deepest])
+            else:
+                middle, cuts[start + max_chars] = start + max_chars, 0.0
+            pending.append((middle, end))
+            pending.append((start, middle))
+
+    merged = [split[0]]
+    i = 1
+    while i < len(split):
+        start, end = merged[-1], split[i]
+        if end - start < min_chars:
+            right_fits = i + 1 < len(split) and split[i + 1] - start <= max_chars
+            left_fits = len(merged) > 1 and end - merged[-2] <= max_chars
+            if right_fits and (not left_fits or cuts[end] <= cuts[start]):
+                i += 1  # drop the cut at `end`: this segment runs on to the next cut
+                continue
+            if left_fits:
+                merged[-1] = end  # drop the cut at `start`: join the previous segment
+                i += 1
+                continue
+        merged.append(end)
+        i += 1
+    return merged
+
+
+def split_transcript(text: str, strategy: str, chunk_size: int, overlap: int) -> List[str]:
+    """Chunk a transcript with the given strategy ("fixed" or "topic")."""
+    if strategy == "topic":
+        return topic_chunks(text, max_chars=chunk_size)
+    if strategy != "fixed":
+        logger.warning(f"Unknown chunking strategy '{strategy}', using fixed-size chunks")
+    return fixed_chunks(text, chunk_size, overlap)
@@ -0,0 +1,164 @@
+import logging
+import re
+from typing import Dict, List, Tuple
+
+from .tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Longest phrase (in words) looked for when collapsing ASR repetition loops,
+# and how many back-to-back copies make a loop.
+MAX_LOOP_WORDS = 20
+MIN_LOOP_REPEATS = 3
+
+_STRIP = ".,;:!?¡¿…\"'()[]-"
+
+# Text Whisper is known to produce on silence or music. Credits are dropped
+# wherever they appear; short courtesy phrases only when they are a whole
+# segment on their own line.
+_HALLUCINATED_CREDITS = re.compile(
+    r"\s*(?:subt[ií]tulos (?:realizados )?por la comunidad de amara\.org|"
+    r"subtitles by the amara\.org community|sous-titres r[ée]alis[ée]s par la communaut[ée] d'amara\.org|"
+    r"untertitel (?:der|von) (?:der )?amara\.org-community|legendas pela comunidade amara\.org|"
+    r"¡?suscr[ií]bete(?: al canal)?!?|thanks for watching!?|thank you for watching\.?|"
+    r"please subscribe\.?|gracias por ver(?: el v[ií]deo)?\.?|obrigado por assistir\.?)",
+    re.IGNORECASE,
+)
+_SILENCE_LINES = frozenset([
+    "gracias", "muchas gracias", "thank you", "thanks", "you", "obrigado", "obrigada",
+    "merci", "danke", "adiós", "bye", "música", "music", "aplausos", "applause", "silencio",
+])
+
+# Pure interjections: always noise, removed with the punctuation that follows them
+_INTERJECTIONS = {
+    "es": r"e+h+|e+h*m+|m{2,}|h?m+h*m+|a+h+m*",
+    "en": r"u+h+|u+h*m+|e+r+m+|m{2,}|h+m+",
+    "pt": r"é{2,}|h[ãu]m*|ã+|m{2,}",
+    "fr": r"e+u+h+|h+e+u+|b+a+h+|m{2,}|h+u+m+",
+    "de": r"ä+h+m*|ö+h*m+|h+m+|m{2,}",
+}
+
+# Discourse markers: only removed when set off by commas or at the start of a
+# sentence followed by a comma ("Bueno, ...", ", o sea, "), so that "este
+# proyecto" or "pues claro" are left alone.
+_MARKERS = {
+    "es": r"o sea|este|bueno|pues|digamos|a ver|tipo",
+    "en": r"you know|i mean|like|so|well|basically|actually",
+    "pt": r"tipo|então|né|sabe|assim",
+    "fr": r"genre|ben|bon|en fait|du coup|tu vois",
+    "de": r"also|halt|sozusagen|quasi|irgendwie",
+}
+
+
+def _filler_patterns(lang: str) -> Tuple[re.Pattern, re.Pattern]:
+    interjections = re.compile(
+        r"\b(?:" + _INTERJECTIONS.get(lang, _INTERJECTIONS["es"]) + r")\b[,.…]*\s*",
+        re.IGNORECASE,
+    )
+    markers = re.compile(
+        r"(?:(?<=^)|(?<=[.!?¿¡]\s)|(?<=,\s))(?:" + _MARKERS.get(lang, _MARKERS["es"]) + r")\s*,\s*",
+        re.IGNORECASE | re.MULTILINE,
+    )
+    return interjections, markers
+
+
+_PATTERNS = {lang: _filler_patterns(lang) for lang in _INTERJECTIONS}
+
+
+def _normalize(word: str) -> str:
+    return word.strip(_STRIP).lower()
+
+
+def collapse_loops(words: List[str]) -> Tuple[List[str], int]:
+    """Keep one copy of any phrase repeated ``MIN_LOOP_REPEATS``+ times in a row.
+
+    Returns the kept words and how many were dropped.
+    """
+    norm = [_normalize(word) for word in words]
+    total = len(words)
+
+    # next_same[i]: next position holding the same word. A loop of period n
+    # starting at i needs norm[i + n] == norm[i], so only those n are tried.
+    next_same = [total] * total
+    last_seen = {}
+    for i in range(total - 1, -1, -1):
+        next_same[i] = last_seen.get(norm[i], total)
+        last_seen[norm[i]] = i
+
+    kept = []
+    dropped = 0
+    i = 0
+    while i < total:
+        loop = None
+        j = next_same[i]
+        while j < total and j - i <= MAX_LOOP_WORDS:
+            n = j - i
+            if i + n * MIN_LOOP_REPEATS > total:
+                break
+            unit = norm[i:j]
+            repeats = 1
+            while norm[i + repeats * n:i + (repeats + 1) * n] == unit:
+                repeats += 1
+            if repeats >= MIN_LOOP_REPEATS:
+                loop = (n, repeats)
+                break
+            j = next_same[j]
+        if loop:
+            n, repeats = loop
+            kept.extend(words[i:i + n])
+            dropped += n * (repeats - 1)
+            i += n * repeats
+        else:
+            kept.append(words[i])
+            i += 1
+    return kept, dropped
+
+
+def clean_transcript(text: str, lang: str = "es") -> Tuple[str, Dict]:
+    """Strip fillers and ASR artifacts from a transcript before it is chunked.
+
+    - drops known Whisper silence hallucinations (Amara.org credits,
+      "Thanks for watching", lone "Gracias." segments),
+    - collapses back-to-back duplicate segments and repeated phrase loops,
+    - removes interjections and comma-delimited discourse markers for ``lang``.
+
+    Returns the cleaned text and stats, including ``token_reduction`` (the
+    fraction of estimated LLM input tokens saved).
+    """
+    interjections, markers = _PATTERNS.get(lang, _PATTERNS["es"])
+    stats = {"lang": lang, "hallucinations": 0, "duplicate_segments": 0, "loop_words": 0, "fillers": 0}
+
+    lines = []
+    previous = None
+    for line in text.splitlines():
+        line, credits = _HALLUCINATED_CREDITS.subn("", line)
+        stats["hallucinations"] += credits
+        normalized = " ".join(line.lower().split()).strip(_STRIP)
+        if not normalized:
+            continue
+        if normalized in _SILENCE_LINES:
+            stats["hallucinations"] += 1
+            continue
+        if normalized == previous:
+            stats["duplicate_segments"] += 1
+            continue
+        previous = normalized
+
+        line, removed = interjections.subn("", line)
+        stats["fillers"] += removed
+        line, removed = markers.subn("", line)
+        stats["fillers"] += removed
+
+        words, dropped = collapse_loops(line.split())
+        stats["loop_words"] += dropped
+        if words:
+            lines.append(" ".join(words))
+
+    cleaned = "\n".join(lines)
+    tokens_before = estimate_tokens(text)
+    tokens_after = estimate_tokens(cleaned)
+    stats["tokens_before"] = tokens_before
+    stats["tokens_after"] = tokens_after
+    stats["token_reduction"] = round(1 - tokens_after / tokens_before, 4) if tokens_before else 0.0
+    logger.debug(f"Transcript cleanup ({lang}): {stats}")
+    return cleaned, stats
@@ -0,0 +1,189 @@
+import logging
+import math
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .routing import ModelTier
+from .tokens import CHARS_PER_TOKEN
+
+logger = logging.getLogger(__name__)
+
+# Most chunks processed at once against a remote provider. A local Ollama
+# server runs one generation at a time unless OLLAMA_NUM_PARALLEL is raised.
+MAX_CHUNK_CONCURRENCY = int(os.getenv("MAITY_MAX_CHUNK_CONCURRENCY", "4"))
+OLLAMA_CONCURRENCY = int(os.getenv("MAITY_OLLAMA_CONCURRENCY", "1"))
+
+# Assumed speed of a model with no history yet: completion tokens per second
+# (which sets the fixed cost of a call), prompt processing time per input
+# token, and completion size per call
+DEFAULT_TOKENS_PER_SEC = {"ollama": 20.0, "claude": 60.0, "openai": 60.0, "groq": 300.0}
+DEFAULT_PROMPT_MS_PER_TOKEN = {"ollama": 2.0, "claude": 0.5, "openai": 0.5, "groq": 0.1}
+DEFAULT_OUTPUT_TOKENS = 600
+
+# Smallest chunk the planner shrinks to, and time kept back for merging and
+# storing the result once the chunks stop.
+MIN_CHUNK_CHARS = 1000
+SAFETY_MARGIN_S = 1.0
+
+
+@dataclass
+class LatencyProfile:
+    """Historical latency of one model, from the LLM calls of past jobs.
+
+    A call is modelled as a fixed cost (generating the completion, which does
+    not shrink with the prompt) plus a cost per prompt token, so smaller
+    chunks only save the prompt part.
+    """
+    provider: str
+    calls: int = 0
+    latency_ms: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    fixed_ms: Optional[float] = None
+    prompt_ms_per_token: Optional[float] = None
+
+    @classmethod
+    def from_history(cls, provider: str, history: Dict) -> "LatencyProfile":
+        """Build a profile from ``DatabaseManager.get_llm_call_latency`` sums.
+
+        Calls that recorded a time to first token split their latency
+        directly: TTFT is the prompt cost, the rest is the fixed cost.
+        Otherwise latency is fitted against prompt size by least squares.
+        Plain ``get_tier_latency`` totals only give the mean, which is then
+        split using the provider's default completion speed.
+        """
+        profile = cls(provider, history["calls"], history["latency_ms"], history["input_tokens"],
+                      history.get("output_tokens", 0))
+        ttft_calls, ttft_ms = history.get("ttft_calls", 0), history.get("ttft_ms", 0.0)
+        if ttft_calls and history.get("ttft_input_tokens"):
+            profile.prompt_ms_per_token = ttft_ms / history["ttft_input_tokens"]
+            profile.fixed_ms = max(0.0, history["ttft_latency_ms"] - ttft_ms) / ttft_calls
+            return profile
+
+        n, sx, sy = profile.calls, profile.input_tokens, profile.latency_ms
+        sxx, sxy = history.get("input_tokens_sq", 0), history.get("input_tokens_latency", 0.0)
+        denominator = n * sxx - sx * sx
+        if n >= 3 and denominator > 0:
+            slope = (n * sxy - sx * sy) / denominator
+            intercept = (sy - slope * sx) / n
+            if slope >= 0 and intercept >= 0:
+                profile.prompt_ms_per_token, profile.fixed_ms = slope, intercept
+        return profile
+
+    @property
+    def output_tokens_per_call(self) -> int:
+        if self.calls and self.output_tokens:
+            return round(self.output_tokens / self.calls)
+        return DEFAULT_OUTPUT_TOKENS
+
+    @property
+    def call_ms(self) -> float:
+        """Fixed cost of one call, whatever its prompt size"""
+        if self.fixed_ms is not None:
+            return self.fixed_ms
+        default_ms = self.output_tokens_per_call / DEFAULT_TOKENS_PER_SEC.get(self.provider, 60.0) * 1000
+        if self.calls:
+            return min(default_ms, self.latency_ms / self.calls)
+        return default_ms
+
+    @property
+    def ms_per_prompt_token(self) -> float:
+        if self.prompt_ms_per_token is not None:
+            return self.prompt_ms_per_token
+        if self.calls and self.input_tokens:
+            # What the mean call took beyond its fixed cost
+            return max(0.0, self.latency_ms - self.call_ms * self.calls) / self.input_tokens
+        return DEFAULT_PROMPT_MS_PER_TOKEN.get(self.provider, 0.5)
+
+    def call_seconds(self, chars: int) -> float:
+        """Expected latency of one call whose prompt holds ``chars`` characters."""
+        return (self.call_ms + self.ms_per_prompt_token * max(1, chars // CHARS_PER_TOKEN)) / 1000
+
+
+@dataclass
+class DeadlinePlan:
+    """How a job is run so that it finishes within its deadline."""
+    extract_tier: ModelTier
+    reduce_tier: Optional[ModelTier]
+    chunk_size: int
+    overlap: int
+    concurrency: int
+    expected_seconds: float
+    fits: bool
+    deadline_at: float  # time.monotonic() by which the job must be done
+    reduce_seconds: float = 0.0
+
+    @property
+    def stop_at(self) -> float:
+        """When unfinished chunks are abandoned, keeping time for the reduce and the merge."""
+        return self.deadline_at - self.reduce_seconds - SAFETY_MARGIN_S
+
+    def as_dict(self) -> Dict:
+        return {
+            "extract": self.extract_tier.label,
+            "reduce": self.reduce_tier.label if self.reduce_tier else None,
+            "chunk_size": self.chunk_size,
+            "overlap": self.overlap,
+            "concurrency": self.concurrency,
+            "expected_seconds": round(self.expected_seconds, 2),
+            "fits": self.fits,
+        }
+
+
+def _max_concurrency(tier: ModelTier) -> int:
+    return max(1, OLLAMA_CONCURRENCY if tier.provider == "ollama" else MAX_CHUNK_CONCURRENCY)
+
+
+def _extract_seconds(text_chars: int, chunk_size: int, overlap: int, concurrency: int,
+                     profile: LatencyProfile) -> float:
+    step = max(chunk_size - overlap, 1)
+    chunks = max(1, math.ceil(text_chars / step))
+    return math.ceil(chunks / concurrency) * profile.call_seconds(min(chunk_size, text_chars))
+
+
+def plan_for_deadline(text_chars: int, deadline_at: float, chunk_size: int, overlap: int,
+                      routing: Tuple[ModelTier, Optional[ModelTier]],
+                      profiles: Dict[str, LatencyProfile]) -> DeadlinePlan:
+    """Pick chunk size, concurrency and model tiers to finish by ``deadline_at``.
+
+    Options are tried from best to cheapest quality: the requested routing
+    first, then the same extraction without the LLM reduce. Within a routing,
+    lower concurrency and larger chunks are preferred. When nothing fits, the
+    cheapest routing is run at full concurrency with the smallest chunks
+    (``fits=False``): the job degrades to a partial summary when time runs
+    out, and small chunks lose the least work at the cut.
+    """
+    extract, reduce = routing
+    candidates: List[Tuple[ModelTier, Optional[ModelTier]]] = [(extract, reduce)]
+    if reduce is not None:
+        candidates.append((extract, None))
+
+    sizes = []
+    size = chunk_size
+    while size >= MIN_CHUNK_CHARS or not sizes:
+        sizes.append(size)
+        size //= 2
+
+    budget = deadline_at - time.monotonic() - SAFETY_MARGIN_S
+    plan = None
+    for extract_tier, reduce_tier in candidates:
+        extract_profile = profiles.get(extract_tier.label) or LatencyProfile(extract_tier.provider)
+        reduce_seconds = 0.0
+        if reduce_tier is not None:
+            # The reduce prompt is roughly the size of one chunk of merged summaries
+            reduce_profile = profiles.get(reduce_tier.label) or LatencyProfile(reduce_tier.provider)
+            reduce_seconds = reduce_profile.call_seconds(chunk_size)
+        for concurrency in range(1, _max_concurrency(extract_tier) + 1):
+            for size in sizes:
+                size_overlap = min(overlap, size // 5)
+                seconds = reduce_seconds + _extract_seconds(text_chars, size, size_overlap, concurrency, extract_profile)
+                plan = DeadlinePlan(extract_tier, reduce_tier, size, size_overlap, concurrency, seconds,
+                                    fits=seconds <= budget, deadline_at=deadline_at, reduce_seconds=reduce_seconds)
+                if plan.fits:
+                    return plan
+    # The last option tried is the cheapest routing, full concurrency, smallest chunks
+    logger.info(f"No plan fits the {budget + SAFETY_MARGIN_S:.1f}s left (degraded plan needs "
+                f"{plan.expected_seconds:.1f}s); the result may be partial")
+    return plan
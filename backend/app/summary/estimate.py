@@ -0,0 +1,103 @@
+import logging
+import math
+import time
+from typing import Dict, Optional, Tuple
+
+from prompts import build_prompt, build_reduce_prompt, language_detector
+
+from .chunking import fixed_chunk_sizes, topic_chunks
+from .cleanup import clean_transcript
+from .deadline import LatencyProfile
+from .routing import ModelTier
+from .tokens import CHARS_PER_TOKEN, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Cleanup and topic segmentation are linear in the text; past this many
+# characters they run on a prefix and the result is scaled to the full
+# length, so an estimate stays in milliseconds even for 10MB transcripts.
+SAMPLE_CHARS = 100_000
+
+
+def _tier_estimate(tier: ModelTier, profile: LatencyProfile, prompt_chars) -> Dict:
+    input_tokens = sum(max(1, chars // CHARS_PER_TOKEN) for chars in prompt_chars)
+    return {
+        "model": tier.label,
+        "calls": len(prompt_chars),
+        "input_tokens": input_tokens,
+        "output_tokens": profile.output_tokens_per_call * len(prompt_chars),
+        "seconds": round(sum(profile.call_seconds(chars) for chars in prompt_chars), 2),
+        "history_calls": profile.calls,  # 0: provider defaults were used
+    }
+
+
+def estimate_summary(text: str, routing: Tuple[ModelTier, Optional[ModelTier]], profiles: Dict[str, LatencyProfile],
+                     chunk_size: int, overlap: int, strategy: str = "fixed", custom_prompt: str = "",
+                     clean: bool = True) -> Dict:
+    """Predict chunks, tokens and wall time of a summary job without calling any LLM.
+
+    Mirrors ``TranscriptProcessor.process_transcript``: optional cleanup, the
+    same chunker, the same per-chunk prompt and, with two-tier routing, one
+    reduce call over the merged chunk results. Chunks run one after another,
+    as they do without a deadline; latency comes from ``profiles`` (per-model
+    history) or provider defaults.
+    """
+    started = time.perf_counter()
+    extract, reduce = routing
+    lang = language_detector.detect(text)
+    sampled = len(text) > SAMPLE_CHARS
+    sample = text[:SAMPLE_CHARS]
+
+    length = len(text)
+    cleanup = None
+    if clean and sample:
+        cleaned, stats = clean_transcript(sample, lang)
+        if cleaned.strip():
+            sample = cleaned
+            length = round(len(text) * len(cleaned) / min(len(text), SAMPLE_CHARS))
+        cleanup = {"token_reduction": stats["token_reduction"]}
+
+    if strategy == "topic":
+        sizes = [len(chunk) for chunk in topic_chunks(sample, max_chars=chunk_size)]
+        if sampled and sizes:
+            # The last chunk of the sample is cut short by the prefix, so it is not representative
+            average = sum(sizes[:-1]) / (len(sizes) - 1) if len(sizes) > 1 else chunk_size
+            count = math.ceil(length / average)
+            sizes = [min(chunk_size, length // count)] * count
+    else:
+        sizes = fixed_chunk_sizes(length, chunk_size, overlap)
+
+    template_chars = len(build_prompt(lang, "", custom_prompt))
+    extract_profile = profiles.get(extract.label) or LatencyProfile(extract.provider)
+    tiers = {"extract": _tier_estimate(extract, extract_profile, [size + template_chars for size in sizes]),
+             "reduce": None}
+    if reduce is not None and sizes:
+        # The reduce reads the merged chunk results, about one completion per chunk
+        reduce_profile = profiles.get(reduce.label) or LatencyProfile(reduce.provider)
+        merged_chars = tiers["extract"]["output_tokens"] * CHARS_PER_TOKEN
+        tiers["reduce"] = _tier_estimate(reduce, reduce_profile,
+                                         [merged_chars + len(build_reduce_prompt(lang, "", custom_prompt))])
+
+    used = [tier for tier in tiers.values() if tier]
+    input_tokens = sum(tier["input_tokens"] for tier in used)
+    output_tokens = sum(tier["output_tokens"] for tier in used)
+    estimate = {
+        "chars": len(text),
+        "input_chars": length,
+        "lang": lang,
+        "chunking": strategy,
+        "chunk_size": chunk_size,
+        "overlap": overlap,
+        "chunks": len(sizes),
+        "sampled": sampled,
+        "cleanup": cleanup,
+        "transcript_tokens": estimate_tokens(text),
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "total_tokens": input_tokens + output_tokens,
+        "predicted_seconds": round(sum(tier["seconds"] for tier in used), 2),
+        "tiers": tiers,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+    logger.debug(f"Summary estimate: {estimate}")
+    return estimate
@@ -0,0 +1,96 @@
+import asyncio
+import logging
+from typing import Awaitable, Dict, Optional, Tuple, TypeVar
+
+from .admission import AdmissionTicket
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class JobCancelled(Exception):
+    """Raised inside a summary job once its ``CancellationToken`` is cancelled"""
+    def __init__(self, reason: str):
+        self.reason = reason
+        super().__init__(f"Summary job cancelled ({reason})")
+
+
+class CancellationToken:
+    """Cooperative cancellation of one summary job.
+
+    Long waits go through ``run``, which aborts the awaited call (and with it
+    any in-flight HTTP stream) as soon as the token is cancelled; loops call
+    ``raise_if_cancelled`` between steps.
+    """
+
+    def __init__(self):
+        self.reason: Optional[str] = None
+        self._event = asyncio.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.reason is not None
+
+    def cancel(self, reason: str = "cancelled"):
+        if self.reason is None:
+            self.reason = reason
+            self._event.set()
+
+    def raise_if_cancelled(self):
+        if self.reason is not None:
+            raise JobCancelled(self.reason)
+
+    async def run(self, awaitable: Awaitable[T]) -> T:
+        """Await ``awaitable``, cancelling it and raising ``JobCancelled`` if the token fires first"""
+        self.raise_if_cancelled()
+        task = asyncio.ensure_future(awaitable)
+        waiter = asyncio.ensure_future(self._event.wait())
+        try:
+            await asyncio.wait({task, waiter}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            waiter.cancel()
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        if task.cancelled():
+            self.raise_if_cancelled()
+        return task.result()
+
+
+class JobRegistry:
+    """The summary job in flight per meeting, so it can be cancelled.
+
+    Starting a job for a meeting cancels the one already running for it
+    ("superseded"): only the newest submission may write results. A job's
+    admission ticket is released as soon as it is cancelled, so its slot is
+    free before the job gets to unwind.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, Tuple[CancellationToken, Optional[AdmissionTicket]]] = {}
+
+    def start(self, meeting_id: str, ticket: Optional[AdmissionTicket] = None) -> CancellationToken:
+        self.cancel(meeting_id, "superseded")
+        token = CancellationToken()
+        self._jobs[meeting_id] = (token, ticket)
+        return token
+
+    def cancel(self, meeting_id: str, reason: str = "cancelled") -> bool:
+        """Cancel the job running for ``meeting_id``; False if there is none"""
+        token, ticket = self._jobs.pop(meeting_id, (None, None))
+        if token is None:
+            return False
+        token.cancel(reason)
+        if ticket is not None:
+            ticket.release()
+        logger.info(f"Cancelled summary job of meeting {meeting_id} ({reason})")
+        return True
+
+    def finish(self, meeting_id: str, token: CancellationToken):
+        """Forget a job that ended, unless a newer one already replaced it"""
+        if self._jobs.get(meeting_id, (None,))[0] is token:
+            del self._jobs[meeting_id]
+
+    def running(self, meeting_id: str) -> bool:
+        return meeting_id in self._jobs
@@ -0,0 +1,305 @@
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .admission import AdmissionRejected
+from .jobs import CancellationToken, JobCancelled
+from .merge import empty_summary, fold_chunk_summary
+from .tokens import tokens_to_chars
+
+logger = logging.getLogger(__name__)
+
+# Failed windows are retried after RETRY_BASE_S, doubling up to RETRY_MAX_S;
+# the session is marked failed after MAX_ATTEMPTS failures in a row
+MAX_ATTEMPTS = 5
+RETRY_BASE_S = 2.0
+RETRY_MAX_S = 300.0
+
+
+@dataclass
+class LiveSession:
+    """State of one meeting being summarized while it is still recording."""
+    meeting_id: str
+    model: str
+    model_name: str
+    custom_prompt: str
+    window_chars: int
+    cursor: int = 0  # rowid of the last segment already read from the transcripts table
+    next_index: int = 0
+    pending: List[Tuple[int, str]] = field(default_factory=list)
+    pending_chars: int = 0
+    running_summary: Dict = field(default_factory=empty_summary)
+    wake: asyncio.Event = field(default_factory=asyncio.Event)
+    stopping: bool = False
+    finalizing: bool = False  # claimed by a /finalize-live-summary request
+    cancel: CancellationToken = field(default_factory=CancellationToken)
+    failures: int = 0  # consecutive failed window attempts
+    retry_at: float = 0.0  # loop time before which no window is attempted
+    error: Optional[str] = None  # set once the session gave up
+    task: Optional[asyncio.Task] = None
+
+
+class LiveSummarizer:
+    """Summarizes a meeting window by window while segments are appended.
+
+    Each session polls the ``transcripts`` table for new segments (writers can
+    call ``notify`` to skip the wait). Whenever the unsummarized text reaches
+    the token budget, that window is summarized in the background, persisted
+    to ``summary_windows`` and folded into the running summary. ``finalize``
+    only has to summarize the tail window and merge the stored window results.
+
+    Windows count against ``admission`` like any summary job (a rejected
+    window waits for the given Retry-After) and run under the session's
+    ``CancellationToken``. A failing window is retried with exponential
+    backoff; after ``max_attempts`` failures the session stops and its
+    process is marked failed, though ``finalize`` may still be tried.
+    """
+
+    def __init__(self, db, processor, poll_interval: float = 2.0, admission=None,
+                 max_attempts: int = MAX_ATTEMPTS, retry_base_s: float = RETRY_BASE_S,
+                 retry_max_s: float = RETRY_MAX_S):
+        self.db = db
+        self.processor = processor
+        self.poll_interval = poll_interval
+        self.admission = admission
+        self.max_attempts = max_attempts
+        self.retry_base_s = retry_base_s
+        self.retry_max_s = retry_max_s
+        self.sessions: Dict[str, LiveSession] = {}
+
+    async def start(self, meeting_id: str, model: str, model_name: str, custom_prompt: str = "",
+                    window_tokens: int = 1500,
+                    on_start: Optional[Callable[[], Awaitable[object]]] = None) -> LiveSession:
+        """Start (or resume) incremental summarization of a meeting.
+
+        Returns the running session if there already is one. ``on_start`` is
+        awaited only when a new session is created, before it starts polling;
+        if it raises, no session is started.
+        """
+        if meeting_id in self.sessions:
+            return self.sessions[meeting_id]
+
+        session = LiveSession(
+            meeting_id=meeting_id,
+            model=model,
+            model_name=model_name,
+            custom_prompt=custom_prompt,
+            window_chars=tokens_to_chars(window_tokens),
+        )
+        # Registered before awaiting anything, so a concurrent start gets this session
+        self.sessions[meeting_id] = session
+
+        try:
+            if on_start is not None:
+                await on_start()
+            # Resume after a restart: skip segments already covered by stored windows
+            for window in await self.db.get_summary_windows(meeting_id):
+                session.cursor = max(session.cursor, window["end_rowid"])
+                session.next_index = window["window_index"] + 1
+                for chunk_summary in window["result"] or []:
+                    fold_chunk_summary(session.running_summary, chunk_summary)
+        except BaseException:
+            if self.sessions.get(meeting_id) is session:
+                del self.sessions[meeting_id]
+            raise
+
+        session.task = asyncio.create_task(self._run(session))
+        logger.info(f"Started live summary for meeting {meeting_id} (window={session.window_chars} chars, resume_at_window={session.next_index})")
+        return session
+
+    def notify(self, meeting_id: str):
+        """Signal that new segments were committed for a meeting"""
+        session = self.sessions.get(meeting_id)
+        if session:
+            session.wake.set()
+
+    def get_session(self, meeting_id: str) -> Optional[LiveSession]:
+        return self.sessions.get(meeting_id)
+
+    def claim_finalize(self, meeting_id: str) -> LiveSession:
+        """Reserve a session for finalizing, so only the first finalize request runs.
+
+        Raises ``KeyError`` if there is no session and ``RuntimeError`` if it
+        is already being finalized. Synchronous, so two requests cannot both
+        claim the same session.
+        """
+        session = self.sessions.get(meeting_id)
+        if session is None:
+            raise KeyError(meeting_id)
+        if session.finalizing:
+            raise RuntimeError(f"Live summary for meeting {meeting_id} is already being finalized")
+        session.finalizing = True
+        return session
+
+    async def finalize(self, meeting_id: str) -> Dict:
+        """Summarize the remaining tail and reduce all windows into the final summary.
+
+        The session is removed only once this succeeds; if the tail window or
+        the reduce fails it stays (and is released from ``claim_finalize``),
+        so finalizing can be retried.
+        """
+        session = self.sessions.get(meeting_id)
+        if session is None:
+            raise ValueError(f"No live summary session for meeting {meeting_id}")
+
+        session.stopping = True
+        session.wake.set()
+        if session.task:
+            await session.task
+
+        try:
+            await self._read_new_segments(session)
+            if session.pending:
+                await self._summarize_window(session, len(session.pending))
+
+            # Cheap reduce: no LLM call, just fold the stored per-chunk results in order
+            windows = await self.db.get_summary_windows(meeting_id)
+            chunk_summaries = [chunk_summary for window in windows for chunk_summary in window["result"] or []]
+            # Keep the per-chunk results so single sections can be regenerated later
+            await self.db.save_chunk_summaries(meeting_id, [json.dumps(chunk_summary) for chunk_summary in chunk_summaries])
+
+            final_summary = empty_summary()
+            for chunk_summary in chunk_summaries:
+                fold_chunk_summary(final_summary, chunk_summary)
+        except BaseException:
+            session.finalizing = False
+            raise
+
+        if self.sessions.get(meeting_id) is session:
+            del self.sessions[meeting_id]
+        logger.info(f"Finalized live summary for meeting {meeting_id} from {len(windows)} windows")
+        return final_summary
+
+    async def cancel(self, meeting_id: str, reason: str = "cancelled") -> bool:
+        """Stop a session without producing a final summary; False if there is none.
+
+        Also aborts a finalize in progress, which then raises ``JobCancelled``.
+        """
+        session = self.sessions.pop(meeting_id, None)
+        if session is None:
+            return False
+        session.cancel.cancel(reason)
+        if session.task:
+            session.task.cancel()
+            try:
+                await session.task
+            except asyncio.CancelledError:
+                pass
+        logger.info(f"Cancelled live summary of meeting {meeting_id} ({reason})")
+        return True
+
+    async def shutdown(self):
+        for meeting_id in list(self.sessions):
+            await self.cancel(meeting_id, "shutdown")
+
+    async def _run(self, session: LiveSession):
+        loop = asyncio.get_running_loop()
+        while not session.stopping:
+            try:
+                await asyncio.wait_for(session.wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            session.wake.clear()
+            if session.stopping:
+                break
+
+            try:
+                await self._read_new_segments(session)
+                if loop.time() < session.retry_at:
+                    continue
+                while session.pending_chars >= session.window_chars and not session.stopping:
+                    await self._summarize_window(session, self._window_length(session), admit=True)
+                    session.failures = 0
+            except asyncio.CancelledError:
+                raise
+            except JobCancelled:
+                return
+            except AdmissionRejected as e:
+                session.retry_at = loop.time() + e.retry_after
+                logger.info(f"Live summary window for meeting {session.meeting_id} deferred {e.retry_after}s: {str(e)}")
+            except Exception as e:
+                # Segments stay pending and are retried after the backoff
+                session.failures += 1
+                if session.failures >= self.max_attempts:
+                    await self._give_up(session, e)
+                    return
+                delay = min(self.retry_max_s, self.retry_base_s * 2 ** (session.failures - 1))
+                session.retry_at = loop.time() + delay
+                logger.error(f"Live summary window failed for meeting {session.meeting_id} "
+                             f"(attempt {session.failures}/{self.max_attempts}, retry in {delay:.0f}s): {str(e)}",
+                             exc_info=True)
+
+    async def _give_up(self, session: LiveSession, error: Exception):
+        session.error = f"Live summary window failed {session.failures} times: {str(error)}"
+        logger.error(f"Giving up live summary of meeting {session.meeting_id}: {session.error}", exc_info=True)
+        try:
+            await self.db.update_process(session.meeting_id, status="failed", error=session.error)
+        except Exception as db_e:
+            logger.error(f"Failed to mark live summary of {session.meeting_id} as failed: {db_e}", exc_info=True)
+
+    async def _read_new_segments(self, session: LiveSession):
+        while True:
+            rows = await self.db.get_segments_after(session.meeting_id, session.cursor)
+            if not rows:
+                return
+            for rowid, text in rows:
+                session.pending.append((rowid, text))
+                session.pending_chars += len(text) + 1
+            session.cursor = rows[-1][0]
+
+    @staticmethod
+    def _window_length(session: LiveSession) -> int:
+        """Number of pending segments that make up the next complete window"""
+        total = 0
+        for count, (_, text) in enumerate(session.pending, start=1):
+            total += len(text) + 1
+            if total >= session.window_chars:
+                return count
+        return len(session.pending)
+
+    async def _summarize_window(self, session: LiveSession, segment_count: int, admit: bool = False):
+        segments = session.pending[:segment_count]
+        text = " ".join(text for _, text in segments)
+
+        ticket = self.admission.admit(len(text.encode("utf-8"))) if admit and self.admission else None
+        telemetry = []
+        try:
+            _, all_json_data = await self.processor.process_transcript(
+                text=text,
+                model=session.model,
+                model_name=session.model_name,
+                chunk_size=len(text) + 1,
+                overlap=0,
+                custom_prompt=session.custom_prompt,
+                meeting_id=session.meeting_id,
+                telemetry=telemetry,
+                cancel=session.cancel,
+            )
+        finally:
+            if ticket is not None:
+                ticket.release()
+        session.cancel.raise_if_cancelled()
+        await self.db.record_llm_calls(session.meeting_id, telemetry)
+        if not all_json_data:
+            raise ValueError(f"Window {session.next_index} produced no summary")
+
+        chunk_summaries = [json.loads(chunk_json) for chunk_json in all_json_data]
+        await self.db.save_summary_window(
+            session.meeting_id,
+            session.next_index,
+            segments[0][0],
+            segments[-1][0],
+            len(text),
+            chunk_summaries,
+            session.model,
+            session.model_name,
+        )
+        for chunk_json in all_json_data:
+            fold_chunk_summary(session.running_summary, json.loads(chunk_json))
+
+        del session.pending[:segment_count]
+        session.pending_chars = sum(len(t) + 1 for _, t in session.pending)
+        logger.info(f"Summarized live window {session.next_index} for meeting {session.meeting_id} ({len(segments)} segments, {len(text)} chars)")
+        session.next_index += 1
@@ -0,0 +1,76 @@
+import json
+import logging
+from typing import Dict, Iterable
+
+from tracing import traced
+
+logger = logging.getLogger(__name__)
+
+
+def empty_summary() -> Dict:
+    """Return the skeleton every merged summary starts from."""
+    return {
+        "MeetingName": "",
+        "People": {"title": "People", "blocks": []},
+        "SessionSummary": {"title": "Session Summary", "blocks": []},
+        "CriticalDeadlines": {"title": "Critical Deadlines", "blocks": []},
+        "KeyItemsDecisions": {"title": "Key Items & Decisions", "blocks": []},
+        "ImmediateActionItems": {"title": "Immediate Action Items", "blocks": []},
+        "NextSteps": {"title": "Next Steps", "blocks": []},
+        "MeetingNotes": {
+            "meeting_name": "",
+            "sections": []
+        }
+    }
+
+
+def fold_chunk_summary(final_summary: Dict, json_dict: Dict) -> Dict:
+    """Fold one per-chunk SummaryResponse dict into ``final_summary`` in place.
+
+    Folding is order-preserving, so folding chunk results one at a time gives
+    the same summary as merging the whole list at once.
+    """
+    if "MeetingName" in json_dict and json_dict["MeetingName"]:
+        final_summary["MeetingName"] = json_dict["MeetingName"]
+    for key in final_summary:
+        if key == "MeetingNotes" and key in json_dict:
+            if isinstance(json_dict[key].get("sections"), list):
+                for section in json_dict[key]["sections"]:
+                    if not section.get("blocks"):
+                        section["blocks"] = []
+                final_summary[key]["sections"].extend(json_dict[key]["sections"])
+            if json_dict[key].get("meeting_name"):
+                final_summary[key]["meeting_name"] = json_dict[key]["meeting_name"]
+        elif key != "MeetingName" and key in json_dict and isinstance(json_dict[key], dict) and "blocks" in json_dict[key]:
+            if isinstance(json_dict[key]["blocks"], list):
+                final_summary[key]["blocks"].extend(json_dict[key]["blocks"])
+                section_exists = False
+                for section in final_summary["MeetingNotes"]["sections"]:
+                    if section["title"] == json_dict[key]["title"]:
+                        section["blocks"].extend(json_dict[key]["blocks"])
+                        section_exists = True
+                        break
+
+                if not section_exists:
+                    final_summary["MeetingNotes"]["sections"].append({
+                        "title": json_dict[key]["title"],
+                        "blocks": json_dict[key]["blocks"].copy() if json_dict[key]["blocks"] else []
+                    })
+    return final_summary
+
+
+@traced("merge")
+def merge_chunk_summaries(all_json_data: Iterable[str], label: str = "") -> Dict:
+    """Merge the per-chunk JSON strings returned by the processor into one summary.
+
+    Chunks that cannot be parsed are logged and skipped.
+    """
+    final_summary = empty_summary()
+    for json_str in all_json_data:
+        try:
+            fold_chunk_summary(final_summary, json.loads(json_str))
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse JSON chunk for {label}: {e}. Chunk: {json_str[:100]}...")
+        except Exception as e:
+            logger.error(f"Error processing chunk data for {label}: {e}. Chunk: {json_str[:100]}...")
+    return final_summary
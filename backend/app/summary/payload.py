@@ -0,0 +1,96 @@
+import hashlib
+import json
+import logging
+from typing import Dict, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional fast path
+    orjson = None
+
+from tracing import traced
+
+logger = logging.getLogger(__name__)
+
+# summary_processes.result_format of results stored by store-time transformation.
+# Rows without it predate the change and are parsed/transformed on read.
+SUMMARY_FORMAT = "frontend-v1"
+
+
+def dumps(obj) -> str:
+    """Serialize to compact JSON, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def transform_summary(summary_data: Dict) -> Dict:
+    """Turn a merged summary into the shape /get-summary returns as ``data``.
+
+    Each MeetingNotes section becomes a top-level key derived from its title,
+    and ``_section_order`` keeps the original order for the frontend.
+    """
+    transformed_data = {"MeetingName": summary_data.get("MeetingName", "")}
+
+    if "MeetingNotes" in summary_data and isinstance(summary_data["MeetingNotes"], dict):
+        meeting_notes = summary_data["MeetingNotes"]
+        if isinstance(meeting_notes.get("sections"), list):
+            transformed_data["_section_order"] = []
+            used_keys = set()
+
+            for index, section in enumerate(meeting_notes["sections"]):
+                if isinstance(section, dict) and "title" in section and "blocks" in section:
+                    if not isinstance(section.get("blocks"), list):
+                        section["blocks"] = []
+
+                    base_key = section["title"].lower().replace(" & ", "_").replace(" ", "_")
+
+                    key = base_key
+                    if key in used_keys:
+                        key = f"{base_key}_{index}"
+
+                    used_keys.add(key)
+                    transformed_data[key] = section
+                    transformed_data["_section_order"].append(key)
+
+    return transformed_data
+
+
+@traced("summary.serialize")
+def build_summary_payload(summary: Dict) -> Tuple[str, str]:
+    """Return ``(meeting_name, data_json)`` ready to be stored once and served as-is.
+
+    Accepts either a merged summary (with ``MeetingNotes``) or data already in
+    the frontend shape, e.g. an edited summary saved back by the client.
+    """
+    if "MeetingNotes" in summary:
+        data = transform_summary(summary)
+    else:
+        data = summary
+    return data.get("MeetingName") or "", dumps(data)
+
+
+@traced("summary.serialize")
+def completed_summary_body(meeting_id: str, meeting_name: Optional[str], start: Optional[str],
+                           end: Optional[str], data_json: str, partial: bool = False) -> str:
+    """Assemble the /get-summary response around the stored payload without re-parsing it"""
+    return (
+        '{"status":"completed"'
+        + (',"partial":true' if partial else '')
+        + f',"meetingName":{dumps(meeting_name)}'
+        f',"meeting_id":{dumps(meeting_id)}'
+        f',"start":{dumps(start)}'
+        f',"end":{dumps(end)}'
+        f',"data":{data_json}}}'
+    )
+
+
+def prompt_hash(custom_prompt: Optional[str]) -> str:
+    """Short, stable fingerprint of the user prompt a summary was generated with"""
+    return hashlib.sha256((custom_prompt or "").strip().encode("utf-8")).hexdigest()[:16]
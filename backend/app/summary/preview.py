@@ -0,0 +1,176 @@
+import logging
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+
+from prompts import FUNCTION_WORDS, detect_lang
+
+from .merge import empty_summary, fold_chunk_summary
+
+logger = logging.getLogger(__name__)
+
+# summary_processes.result_format of a provisional rule-based summary that is
+# stored while the LLM job runs; the LLM result replaces it when ready.
+PREVIEW_FORMAT = "preview-v1"
+
+# Only the beginning of very long transcripts is scanned, so the preview stays
+# in the low milliseconds no matter how long the meeting was.
+MAX_PREVIEW_CHARS = 200_000
+MAX_ITEMS = 15
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?¡¿])\s+|\n+")
+
+_ACTION_PATTERNS = {
+    "es": re.compile(
+        r"\b(voy a|vamos a|va a|van a|hay que|tengo que|tenemos que|tienes que|tiene que|"
+        r"debemos|debo|necesitamos|me encargo|te encargas|se encarga|queda pendiente|"
+        r"quedamos en|mando|envío|enviaré|revisaré|haré)\b",
+        re.IGNORECASE,
+    ),
+    "en": re.compile(
+        r"\b(i'll|i will|we'll|we will|you'll|he'll|she'll|they'll|we need to|i need to|"
+        r"need to|have to|going to|let's|follow up|action item|to-do|todo|will send|"
+        r"will review|take care of)\b",
+        re.IGNORECASE,
+    ),
+}
+
+_MONTHS = {
+    "es": "enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|setiembre|octubre|noviembre|diciembre",
+    "en": "january|february|march|april|may|june|july|august|september|october|november|december",
+}
+
+_DATE_PATTERNS = {
+    "es": re.compile(
+        r"\b(lunes|martes|miércoles|miercoles|jueves|viernes|sábado|sabado|domingo|"
+        r"pasado mañana|mañana|la próxima semana|la semana que viene|fin de mes|"
+        r"fin de semana|\d{1,2} de (?:" + _MONTHS["es"] + r")|"
+        r"(?:antes del|para el|el día) \d{1,2}|\d{1,2}/\d{1,2}(?:/\d{2,4})?)\b",
+        re.IGNORECASE,
+    ),
+    "en": re.compile(
+        r"\b(monday|tuesday|wednesday|thursday|friday|saturday|sunday|tomorrow|tonight|"
+        r"next week|end of (?:the )?(?:day|week|month|quarter)|eod|eow|"
+        r"(?:" + _MONTHS["en"] + r") \d{1,2}(?:st|nd|rd|th)?|\d{1,2}(?:st|nd|rd|th)? of (?:" + _MONTHS["en"] + r")|"
+        r"\d{1,2}/\d{1,2}(?:/\d{2,4})?)\b",
+        re.IGNORECASE,
+    ),
+}
+
+_NAME = r"([A-ZÁÉÍÓÚÑ][a-záéíóúñü]+(?: [A-ZÁÉÍÓÚÑ][a-záéíóúñü]+)?)"
+
+# "Ana:" / "[00:01:02] Ana López:" speaker labels at the start of a line
+_SPEAKER_LABEL = re.compile(r"^\s*(?:\[[^\]]*\]\s*)?" + _NAME + r"\s*:", re.MULTILINE)
+
+_SPEAKER_PREFIX = re.compile(r"^\s*(?:\[[^\]]*\]\s*)?(?:" + _NAME + r"\s*:)?")
+
+_INTRODUCTIONS = {
+    "es": re.compile(r"\b(?:soy|me llamo|habla|les presento a|con nosotros está)\s+" + _NAME),
+    "en": re.compile(r"\b(?:I'm|I am|this is|my name is|meet|joining us is)\s+" + _NAME),
+}
+
+_NOT_NAMES = frozenset([
+    "Speaker", "Hablante", "Usuario", "User", "Sistema", "System", "Nota", "Note",
+    "Micrófono", "Microphone", "Yo", "Me", "Mic", "Okay", "Bueno", "Hola", "Hello",
+])
+
+_AGENDA_PATTERNS = {
+    "es": re.compile(
+        r"\b(?:vamos a hablar (?:del?|sobre)|el tema (?:de hoy )?es|reunión (?:de|sobre|para)|"
+        r"la agenda (?:de hoy )?es|hoy revisamos)\s+([^.,;!?\n]{3,60})",
+        re.IGNORECASE,
+    ),
+    "en": re.compile(
+        r"\b(?:we(?:'re| are) going to (?:talk|discuss) about|today we(?:'ll| will) (?:discuss|review|cover)|"
+        r"the agenda (?:for today )?is|meeting (?:about|on|for))\s+([^.,;!?\n]{3,60})",
+        re.IGNORECASE,
+    ),
+}
+
+_FILLER_WORDS = frozenset([
+    "bueno", "entonces", "pues", "vale", "okay", "sí", "claro", "gracias", "digamos",
+    "yeah", "right", "really", "thanks", "thank", "going", "think", "something",
+    "tenemos", "vamos", "estamos", "están", "porque", "ahora", "aquí", "there's", "that's",
+])
+
+_TITLES = {
+    "es": {"People": "Participantes", "CriticalDeadlines": "Fechas y plazos", "ImmediateActionItems": "Posibles tareas"},
+    "en": {"People": "People", "CriticalDeadlines": "Dates & Deadlines", "ImmediateActionItems": "Candidate Action Items"},
+}
+
+
+def _sentences(text: str) -> List[str]:
+    sentences = []
+    for sentence in _SENTENCE_SPLIT.split(text):
+        sentence = _SPEAKER_PREFIX.sub("", sentence).strip()
+        if len(sentence) > 3:
+            sentences.append(sentence)
+    return sentences
+
+
+def _participants(text: str, lang: str) -> List[str]:
+    counts = Counter(_SPEAKER_LABEL.findall(text))
+    counts.update(_INTRODUCTIONS[lang].findall(text))
+    return [name for name, _ in counts.most_common() if name.split()[0] not in _NOT_NAMES][:MAX_ITEMS]
+
+
+def _title(text: str, lang: str) -> str:
+    match = _AGENDA_PATTERNS[lang].search(text)
+    if match:
+        topic = match.group(1).strip()
+        return topic[:1].upper() + topic[1:]
+
+    stopwords = FUNCTION_WORDS.get(lang, frozenset()) | _FILLER_WORDS
+    words = Counter(
+        word for word in re.findall(r"[a-záéíóúñü]{5,}", text.lower())
+        if word not in stopwords
+    )
+    keywords = [word for word, count in words.most_common(3) if count > 1]
+    if not keywords:
+        return ""
+    return ", ".join(keywords).capitalize()
+
+
+def _blocks(prefix: str, items: List[str]) -> List[Dict]:
+    return [
+        {"id": f"preview-{prefix}-{index}", "type": "bullet", "content": item, "color": "gray"}
+        for index, item in enumerate(items)
+    ]
+
+
+def build_preview(text: str, lang: Optional[str] = None) -> Dict:
+    """Extract a provisional summary from a transcript with local rules (no LLM).
+
+    Picks out candidate action items ("voy a", "hay que", "I'll", ...),
+    sentences mentioning dates or deadlines, named participants (speaker
+    labels and self-introductions) and a provisional meeting title. The
+    result has the same shape as a merged LLM summary, so it goes through
+    ``build_summary_payload`` like any other.
+    """
+    sample = text[:MAX_PREVIEW_CHARS]
+    lang = lang or detect_lang(sample[:5000])
+    if lang not in _ACTION_PATTERNS:
+        lang = "es"
+
+    actions, dates = [], []
+    for sentence in _sentences(sample):
+        if _AGENDA_PATTERNS[lang].search(sentence):
+            continue  # "vamos a hablar de..." announces the topic, it is not a task
+        if len(actions) < MAX_ITEMS and _ACTION_PATTERNS[lang].search(sentence):
+            actions.append(sentence)
+        if len(dates) < MAX_ITEMS and _DATE_PATTERNS[lang].search(sentence):
+            dates.append(sentence)
+        if len(actions) >= MAX_ITEMS and len(dates) >= MAX_ITEMS:
+            break
+
+    titles = _TITLES[lang]
+    title = _title(sample, lang)
+    chunk = {
+        "MeetingName": title,
+        "People": {"title": titles["People"], "blocks": _blocks("people", _participants(sample, lang))},
+        "CriticalDeadlines": {"title": titles["CriticalDeadlines"], "blocks": _blocks("date", dates)},
+        "ImmediateActionItems": {"title": titles["ImmediateActionItems"], "blocks": _blocks("action", actions)},
+        "MeetingNotes": {"meeting_name": title, "sections": []},
+    }
+    logger.debug(f"Built rule-based preview ({lang}): {len(actions)} actions, {len(dates)} dates")
+    return fold_chunk_summary(empty_summary(), chunk)
@@ -0,0 +1,259 @@
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+import httpx
+
+from metrics import LOCK_WAIT_SECONDS
+from tracing import span
+
+from .deadline import DEFAULT_OUTPUT_TOKENS, OLLAMA_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Published per-key limits of the lowest paid tiers: (requests/min, tokens/min).
+# MAITY_<PROVIDER>_RPM / MAITY_<PROVIDER>_TPM override them, 0 means unlimited.
+DEFAULT_LIMITS = {
+    "claude": (50, 40_000),
+    "openai": (500, 200_000),
+    "groq": (30, 6_000),
+    "ollama": (0, 0),
+}
+DEFAULT_MAX_CONCURRENCY = 8
+
+# Retries of transient errors (429, 5xx, timeouts, dropped connections), with
+# full-jitter exponential backoff
+MAX_RETRIES = int(os.getenv("MAITY_LLM_MAX_RETRIES", "3"))
+BACKOFF_BASE_S = 1.0
+BACKOFF_MAX_S = 30.0
+
+# AIMD: the concurrency limit grows by one per limit's worth of successful
+# calls and is cut on overload. A call slower per prompt token than
+# LATENCY_TOLERANCE times the running average counts as a soft overload.
+OVERLOAD_DECREASE = 0.5
+LATENCY_DECREASE = 0.9
+LATENCY_TOLERANCE = 2.0
+LATENCY_EWMA_ALPHA = 0.1
+
+_OVERLOAD_STATUS = {429, 503, 529}
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether an LLM call that failed with ``error`` is worth retrying"""
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int) and status > 0:
+        return status in (408, 409, 425, 429) or status >= 500
+    return isinstance(error, (httpx.TransportError, asyncio.TimeoutError, ConnectionError))
+
+
+def is_overload(error: BaseException) -> bool:
+    """Whether ``error`` says the provider is rate limiting or overloaded"""
+    return getattr(error, "status_code", None) in _OVERLOAD_STATUS
+
+
+class TokenBucket:
+    """Refills ``per_minute`` units a minute, holding at most a minute's worth.
+
+    Waiters are served in arrival order. A request larger than the whole
+    bucket is clamped to it, so it waits for a full bucket instead of forever.
+    """
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.clock = clock
+        self._updated = clock()
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _refill(self):
+        now = self.clock()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` units are available"""
+        self._refill()
+        return max(0.0, (min(amount, self.capacity) - self.level) / self.rate)
+
+    async def acquire(self, amount: float):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while (delay := self.wait_time(amount)) > 0:
+                await asyncio.sleep(delay)
+            self.level -= min(amount, self.capacity)
+
+    def drain(self):
+        """Empty the bucket, e.g. after the provider answered 429"""
+        self._refill()
+        self.level = min(self.level, 0.0)
+
+
+class AIMDConcurrency:
+    """Concurrency limit adjusted by additive increase / multiplicative decrease."""
+
+    def __init__(self, maximum: int, initial: Optional[int] = None, minimum: int = 1,
+                 clock: Callable[[], float] = time.monotonic):
+        self.maximum = maximum
+        self.minimum = minimum
+        self.limit = float(min(maximum, initial or maximum))
+        self.in_flight = 0
+        self.clock = clock
+        self.latency_per_token: Optional[float] = None  # running average, seconds
+        self._last_decrease = float("-inf")
+        self._condition: Optional[asyncio.Condition] = None
+
+    async def acquire(self):
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < max(self.minimum, int(self.limit)))
+            self.in_flight += 1
+
+    async def release(self):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def _decrease(self, factor: float, started: float):
+        # Calls already in flight when the limit was cut report the same congestion
+        if started < self._last_decrease:
+            return
+        self.limit = max(float(self.minimum), self.limit * factor)
+        self._last_decrease = self.clock()
+
+    def on_success(self, started: float, latency_s: float, prompt_tokens: int):
+        per_token = latency_s / max(1, prompt_tokens)
+        average = self.latency_per_token
+        self.latency_per_token = per_token if average is None else \
+            average + LATENCY_EWMA_ALPHA * (per_token - average)
+        if average is not None and per_token > LATENCY_TOLERANCE * average:
+            self._decrease(LATENCY_DECREASE, started)
+        else:
+            self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+
+    def on_overload(self, started: float):
+        self._decrease(OVERLOAD_DECREASE, started)
+
+
+class ProviderLimiter:
+    """Rate and concurrency limits shared by every call to one provider and API key.
+
+    A call first takes a request and its estimated tokens (prompt plus an
+    expected completion) from the per-minute buckets, then an AIMD
+    concurrency slot. Transient errors are retried with full-jitter backoff;
+    429/overloaded answers also cut the concurrency limit and empty the
+    request bucket, so the callers sharing the key back off together.
+    """
+
+    def __init__(self, provider: str, rpm: int = 0, tpm: int = 0, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 max_retries: int = MAX_RETRIES, backoff_base: float = BACKOFF_BASE_S,
+                 clock: Callable[[], float] = time.monotonic):
+        self.provider = provider
+        self.requests = TokenBucket(rpm, clock) if rpm else None
+        self.tokens = TokenBucket(tpm, clock) if tpm else None
+        self.concurrency = AIMDConcurrency(max_concurrency, initial=min(max_concurrency, 4), clock=clock)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.clock = clock
+        self.calls = 0
+        self.retries = 0
+        self.overloads = 0
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(BACKOFF_MAX_S, self.backoff_base * 2 ** attempt))
+
+    async def call(self, factory: Callable[[], Awaitable[T]], prompt_tokens: int,
+                   on_retry: Optional[Callable[[BaseException], None]] = None) -> T:
+        """Run ``factory()`` within the limits, retrying transient errors.
+
+        ``factory`` must start a fresh request every time it is called.
+        ``on_retry`` is called with the error before each retry.
+        """
+        attempt = 0
+        while True:
+            if self.requests is not None:
+                with LOCK_WAIT_SECONDS.time(lock="llm_requests"):
+                    await self.requests.acquire(1)
+            if self.tokens is not None:
+                with LOCK_WAIT_SECONDS.time(lock="llm_tokens"):
+                    await self.tokens.acquire(prompt_tokens + DEFAULT_OUTPUT_TOKENS)
+            with LOCK_WAIT_SECONDS.time(lock="llm_concurrency"):
+                await self.concurrency.acquire()
+            started = self.clock()
+            try:
+                with span(f"llm.{self.provider}"):
+                    result = await factory()
+            except Exception as e:
+                if is_overload(e):
+                    self.overloads += 1
+                    self.concurrency.on_overload(started)
+                    if self.requests is not None:
+                        self.requests.drain()
+                if attempt >= self.max_retries or not is_transient(e):
+                    raise
+                error = e
+            else:
+                self.calls += 1
+                self.concurrency.on_success(started, self.clock() - started, prompt_tokens)
+                return result
+            finally:
+                await self.concurrency.release()
+
+            delay = self._backoff(attempt)
+            attempt += 1
+            self.retries += 1
+            logger.warning(f"{self.provider} call failed ({error!r}); retry {attempt}/{self.max_retries} "
+                           f"in {delay:.1f}s, concurrency limit {self.concurrency.limit:.1f}")
+            if on_retry is not None:
+                on_retry(error)
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict:
+        return {
+            "provider": self.provider,
+            "concurrency_limit": round(self.concurrency.limit, 2),
+            "in_flight": self.concurrency.in_flight,
+            "requests_available": round(self.requests.level, 1) if self.requests else None,
+            "tokens_available": round(self.tokens.level, 1) if self.tokens else None,
+            "calls": self.calls,
+            "retries": self.retries,
+            "overloads": self.overloads,
+        }
+
+
+def _limits(provider: str) -> Tuple[int, int, int]:
+    rpm, tpm = DEFAULT_LIMITS.get(provider, (0, 0))
+    prefix = f"MAITY_{provider.upper()}"
+    default_concurrency = OLLAMA_CONCURRENCY if provider == "ollama" else DEFAULT_MAX_CONCURRENCY
+    return (int(os.getenv(f"{prefix}_RPM", rpm)), int(os.getenv(f"{prefix}_TPM", tpm)),
+            max(1, int(os.getenv(f"{prefix}_MAX_CONCURRENCY", default_concurrency))))
+
+
+class RateLimiterRegistry:
+    """One ``ProviderLimiter`` per provider and API key, shared by every job"""
+
+    def __init__(self):
+        self._limiters: Dict[str, ProviderLimiter] = {}
+
+    def get(self, provider: str, api_key: Optional[str] = None) -> ProviderLimiter:
+        # Keys are only kept as a short fingerprint
+        fingerprint = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:8]
+        name = f"{provider}:{fingerprint}"
+        if name not in self._limiters:
+            rpm, tpm, max_concurrency = _limits(provider)
+            self._limiters[name] = ProviderLimiter(provider, rpm, tpm, max_concurrency)
+        return self._limiters[name]
+
+    def stats(self) -> Dict[str, Dict]:
+        return {name: limiter.stats() for name, limiter in self._limiters.items()}
+
+
+rate_limiters = RateLimiterRegistry()
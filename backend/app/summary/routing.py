@@ -0,0 +1,125 @@
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from metrics import counter, histogram
+
+logger = logging.getLogger(__name__)
+
+LLM_CALL_SECONDS = histogram("maity_llm_call_duration_seconds", "LLM call latency, retries included",
+                             ("provider", "model", "tier", "outcome"))
+LLM_TTFT_SECONDS = histogram("maity_llm_time_to_first_token_seconds", "Time to the first streamed token",
+                             ("provider", "model", "tier"))
+LLM_TOKENS = counter("maity_llm_tokens_total", "Tokens sent to and generated by LLMs",
+                     ("provider", "model", "tier", "direction"))
+LLM_RETRIES = counter("maity_llm_retries_total", "Retried LLM requests", ("provider", "model", "tier"))
+
+
+@dataclass(frozen=True)
+class ModelTier:
+    """A provider/model pair one stage of the pipeline runs on."""
+    provider: str
+    model_name: str
+
+    @property
+    def label(self) -> str:
+        return f"{self.provider}/{self.model_name}"
+
+
+@dataclass
+class TierStats:
+    """Latency and token accounting of the LLM calls made by one tier.
+
+    Besides the totals, every call is kept in ``records`` in the shape of the
+    ``llm_calls`` telemetry table.
+    """
+    model: str = ""
+    calls: int = 0
+    failures: int = 0
+    latency_ms: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    tier: str = "extract"
+    records: List[Dict] = field(default_factory=list, repr=False)
+
+    def record(self, latency_s: float, input_tokens: int, output_tokens: int, ok: bool = True,
+               chunk_index: Optional[int] = None, ttft_s: Optional[float] = None, retries: int = 0,
+               cached_tokens: int = 0, error: Optional[str] = None):
+        self.calls += 1
+        if not ok:
+            self.failures += 1
+        self.latency_ms += latency_s * 1000
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+
+        provider, _, model_name = self.model.partition("/")
+        LLM_CALL_SECONDS.observe(latency_s, provider=provider, model=model_name, tier=self.tier,
+                                 outcome="ok" if ok else "error")
+        LLM_TOKENS.inc(input_tokens, provider=provider, model=model_name, tier=self.tier, direction="prompt")
+        LLM_TOKENS.inc(output_tokens, provider=provider, model=model_name, tier=self.tier, direction="completion")
+        if ttft_s is not None:
+            LLM_TTFT_SECONDS.observe(ttft_s, provider=provider, model=model_name, tier=self.tier)
+        if retries:
+            LLM_RETRIES.inc(retries, provider=provider, model=model_name, tier=self.tier)
+        self.records.append({
+            "provider": provider,
+            "model": model_name,
+            "tier": self.tier,
+            "chunk_index": chunk_index,
+            "prompt_tokens": input_tokens,
+            "completion_tokens": output_tokens,
+            "ttft_ms": round(ttft_s * 1000, 1) if ttft_s is not None else None,
+            "latency_ms": round(latency_s * 1000, 1),
+            "retries": retries,
+            "cached_tokens": cached_tokens,
+            "ok": ok,
+            "error": error,
+            "created_at": datetime.utcnow().isoformat(),
+        })
+
+    def as_dict(self) -> Dict:
+        return {
+            "model": self.model,
+            "calls": self.calls,
+            "failures": self.failures,
+            "latency_ms": round(self.latency_ms, 1),
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+        }
+
+
+def parse_tier(spec: Optional[str]) -> Optional[ModelTier]:
+    """Parse a "provider/model_name" spec such as "ollama/gemma3:1b"."""
+    if not spec or "/" not in spec:
+        return None
+    provider, model_name = spec.split("/", 1)
+    if not provider or not model_name:
+        return None
+    return ModelTier(provider.strip(), model_name.strip())
+
+
+def resolve_routing(model: str, model_name: str, chunk_model: Optional[str] = None,
+                    chunk_model_name: Optional[str] = None) -> Tuple[ModelTier, Optional[ModelTier]]:
+    """Return ``(extract_tier, reduce_tier)`` for a summarization job.
+
+    The requested model is the strong tier. When a cheaper extraction model
+    is configured, per request (``chunk_model``/``chunk_model_name``) or via
+    ``MAITY_CHUNK_MODEL="provider/model_name"``, chunks are extracted with it
+    and the requested model only runs the final reduce. Otherwise the
+    requested model extracts every chunk and there is no LLM reduce
+    (``reduce_tier`` is None).
+    """
+    strong = ModelTier(model, model_name)
+    if chunk_model and chunk_model_name:
+        extract = ModelTier(chunk_model, chunk_model_name)
+    else:
+        spec = os.getenv("MAITY_CHUNK_MODEL", "")
+        extract = parse_tier(spec)
+        if spec and extract is None:
+            logger.warning(f"Ignoring MAITY_CHUNK_MODEL={spec!r}: expected 'provider/model_name'")
+
+    if extract is None or extract == strong:
+        return strong, None
+    return extract, strong
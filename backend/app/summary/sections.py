@@ -0,0 +1,96 @@
+import json
+import logging
+from typing import Dict, Iterable, List, Optional, Set
+
+from .merge import empty_summary
+
+logger = logging.getLogger(__name__)
+
+# Top-level SummaryResponse sections that can be regenerated on their own
+SECTION_KEYS = (
+    "People",
+    "SessionSummary",
+    "CriticalDeadlines",
+    "KeyItemsDecisions",
+    "ImmediateActionItems",
+    "NextSteps",
+)
+
+
+def section_title(section: str) -> str:
+    """Canonical title of a section key, e.g. 'KeyItemsDecisions' -> 'Key Items & Decisions'"""
+    return empty_summary()[section]["title"]
+
+
+def section_key(title: str) -> str:
+    """Key a section title gets in the stored frontend payload (see ``transform_summary``)"""
+    return title.lower().replace(" & ", "_").replace(" ", "_")
+
+
+def _parse_chunks(chunk_results: Iterable[str]) -> List[Dict]:
+    chunks = []
+    for json_str in chunk_results:
+        try:
+            chunks.append(json.loads(json_str))
+        except json.JSONDecodeError as e:
+            logger.warning(f"Skipping unreadable cached chunk summary: {e}")
+    return chunks
+
+
+def section_context(chunk_results: Iterable[str], section: str) -> str:
+    """Build the LLM context for regenerating ``section`` from cached per-chunk results.
+
+    Only the target section and the chunk's session summary (for grounding)
+    are kept, so the prompt is a fraction of the size of the transcript.
+    """
+    lines = []
+    for index, chunk in enumerate(_parse_chunks(chunk_results), start=1):
+        entry = {}
+        if section != "SessionSummary" and isinstance(chunk.get("SessionSummary"), dict):
+            entry["SessionSummary"] = chunk["SessionSummary"].get("blocks", [])
+        if isinstance(chunk.get(section), dict):
+            entry[section] = chunk[section].get("blocks", [])
+        if entry:
+            lines.append(f"[{index}] " + json.dumps(entry, ensure_ascii=False, separators=(",", ":")))
+    return "\n".join(lines)
+
+
+def section_titles(chunk_results: Iterable[str], section: str) -> Set[str]:
+    """Every title the chunks used for ``section``, plus its canonical title"""
+    titles = {section_title(section)}
+    for chunk in _parse_chunks(chunk_results):
+        if isinstance(chunk.get(section), dict) and chunk[section].get("title"):
+            titles.add(chunk[section]["title"])
+    return titles
+
+
+def patch_section(payload: Dict, section: str, new_section: Dict, titles: Optional[Set[str]] = None) -> Dict:
+    """Return a copy of a stored frontend payload with one section replaced.
+
+    The section is located through the titles it was generated under; when
+    the merge spread it over several keys they collapse into the first one.
+    If the payload has no such section yet it is appended.
+    """
+    titles = titles or {section_title(section)}
+    wanted = {section_key(title) for title in titles}
+
+    patched = dict(payload)
+    order = list(patched.get("_section_order", []))
+    matches = [key for key in order if key in wanted or (
+        isinstance(patched.get(key), dict) and patched[key].get("title") in titles
+    )]
+
+    if matches:
+        target = matches[0]
+        for key in matches[1:]:
+            patched.pop(key, None)
+            order.remove(key)
+    else:
+        target = section_key(new_section.get("title") or section_title(section))
+        while target in patched:
+            target = f"{target}_{len(order)}"
+        order.append(target)
+
+    patched[target] = new_section
+    patched["_section_order"] = order
+    return patched
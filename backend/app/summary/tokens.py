@@ -0,0 +1,21 @@
+"""Cheap token estimation shared by the summarization pipeline.
+
+Chunk sizes in this codebase are expressed in characters; these helpers
+convert between characters and an approximate token count without loading
+any tokenizer.
+"""
+
+# Rough average for Spanish/English prose across the providers we use.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in ``text``."""
+    if not text:
+        return 0
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def tokens_to_chars(tokens: int) -> int:
+    """Convert a token budget into the equivalent character budget."""
+    return max(1, tokens) * CHARS_PER_TOKEN
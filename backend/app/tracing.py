@@ -0,0 +1,254 @@
+"""
+Per-request tracing spans, reported in a ``Server-Timing`` header, and an
+opt-in sampling profiler.
+
+A trace lives in a context variable for the duration of one request; spans
+opened outside a request (startup, background work after the response) are
+no-ops costing one ``ContextVar.get``.
+
+    from tracing import span, traced
+
+    with span("merge"):
+        ...
+
+    @traced("db.get_meeting")
+    async def get_meeting(...): ...
+
+Profiling: send ``X-Maity-Profile: 1`` (or set ``MAITY_PROFILE_REQUESTS=1``
+for every request). The response carries an ``X-Maity-Profile-Id`` whose
+call-tree report is served by ``GET /debug/profiles/{profile_id}``.
+"""
+import asyncio
+import functools
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi.routing import APIRoute
+
+TRACING_ENABLED = os.getenv("MAITY_TRACING", "1") != "0"
+PROFILE_ALL = os.getenv("MAITY_PROFILE_REQUESTS", "0") == "1"
+PROFILE_HEADER = b"x-maity-profile"
+PROFILE_INTERVAL_S = 0.001
+MAX_PROFILES = 20
+
+_current: ContextVar[Optional["Trace"]] = ContextVar("maity_trace", default=None)
+
+
+class Trace:
+    """Span timings of one request, summed per span name in first-seen order"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: Dict[str, List] = {}  # name -> [calls, seconds]
+
+    def add(self, name: str, seconds: float):
+        entry = self.spans.get(name)
+        if entry is None:
+            self.spans[name] = [1, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+
+    def server_timing(self) -> str:
+        parts = []
+        for name, (calls, seconds) in self.spans.items():
+            desc = f';desc="{calls} calls"' if calls > 1 else ""
+            parts.append(f"{name}{desc};dur={seconds * 1000:.2f}")
+        parts.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.2f}")
+        return ", ".join(parts)
+
+
+class span:
+    """Time a block into the current request's trace, if there is one"""
+    __slots__ = ("name", "trace", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.trace = _current.get()
+        if self.trace is not None:
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.trace is not None:
+            self.trace.add(self.name, time.perf_counter() - self.started)
+
+
+def traced(name: str):
+    """Decorate a function or coroutine function to run inside ``span(name)``"""
+    def decorate(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class TracedRoute(APIRoute):
+    """APIRoute that splits a request into the endpoint itself and FastAPI's own work.
+
+    ``endpoint`` is the route function; ``serialize`` is everything else the
+    route handler does, i.e. request parsing plus response_model validation
+    and JSON encoding.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        # include_router rebuilds routes from already wrapped endpoints
+        if not getattr(endpoint, "_traced_endpoint", False):
+            endpoint = traced("endpoint")(endpoint)
+            endpoint._traced_endpoint = True
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def traced_handler(request):
+            trace = _current.get()
+            if trace is None:
+                return await handler(request)
+            started = time.perf_counter()
+            before = trace.spans.get("endpoint", [0, 0.0])[1]
+            try:
+                return await handler(request)
+            finally:
+                endpoint = trace.spans.get("endpoint", [0, 0.0])[1] - before
+                trace.add("serialize", time.perf_counter() - started - endpoint)
+        return traced_handler
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name}  {os.path.basename(code.co_filename)}:{code.co_firstlineno}"
+
+
+class SamplingProfiler:
+    """Samples the stack of one thread (by default the caller's) from a helper thread.
+
+    Like pyinstrument it records wall-clock samples, so time the event loop
+    spends waiting (e.g. in ``select`` while SQLite works in aiosqlite's
+    thread) shows up as such. Other requests running on the same loop at
+    the same time are sampled too.
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL_S, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.started = self.elapsed = 0.0
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="maity-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> "SamplingProfiler":
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.samples[tuple(reversed(stack))] += 1
+
+    def report(self, min_share: float = 0.01) -> str:
+        """Call tree with the share of samples under every frame, hiding frames below ``min_share``"""
+        total = sum(self.samples.values())
+        lines = [f"{total} samples over {self.elapsed * 1000:.1f} ms (every {self.interval * 1000:g} ms)"]
+        if not total:
+            return lines[0] + "\n"
+        tree: Dict = {}
+        for stack, count in self.samples.items():
+            node = tree
+            for label in stack:
+                entry = node.setdefault(label, [0, {}])
+                entry[0] += count
+                node = entry[1]
+
+        def walk(node: Dict, depth: int):
+            for label, (count, children) in sorted(node.items(), key=lambda item: -item[1][0]):
+                if count / total < min_share:
+                    continue
+                lines.append(f"{count / total * self.elapsed * 1000:9.1f} ms {count / total:6.1%}  "
+                             f"{'  ' * depth}{label}")
+                walk(children, depth + 1)
+
+        walk(tree, 0)
+        return "\n".join(lines) + "\n"
+
+
+_profiles: "OrderedDict[str, str]" = OrderedDict()
+
+
+def get_profile(profile_id: str) -> Optional[str]:
+    return _profiles.get(profile_id)
+
+
+def _store_profile(method: str, path: str, profiler: SamplingProfiler) -> str:
+    profile_id = uuid.uuid4().hex[:12]
+    _profiles[profile_id] = f"{method} {path}\n{profiler.report()}"
+    while len(_profiles) > MAX_PROFILES:
+        _profiles.popitem(last=False)
+    return profile_id
+
+
+class TracingMiddleware:
+    """ASGI middleware opening a trace per request and adding ``Server-Timing`` to the response"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not TRACING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        trace = Trace()
+        token = _current.set(trace)
+        profiler = None
+        if PROFILE_ALL or dict(scope["headers"]).get(PROFILE_HEADER) in (b"1", b"true"):
+            profiler = SamplingProfiler()
+            profiler.start()
+
+        async def send_traced(message):
+            nonlocal profiler
+            if message["type"] == "http.response.start":
+                headers: List[Tuple[bytes, bytes]] = list(message.get("headers", []))
+                headers.append((b"server-timing", trace.server_timing().encode("latin-1")))
+                if profiler is not None:
+                    profile_id = _store_profile(scope["method"], scope["path"], profiler.stop())
+                    profiler = None
+                    headers.append((b"x-maity-profile-id", profile_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_traced)
+        finally:
+            _current.reset(token)
+            if profiler is not None:
+                profiler.stop()
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Tuple, Literal
+from typing import Dict, List, Optional, Tuple, Literal, Type
 from pydantic_ai import Agent
 from pydantic_ai.models.anthropic import AnthropicModel
 from pydantic_ai.models.groq import GroqModel
@@ -8,8 +8,10 @@ from pydantic_ai.providers.openai import OpenAIProvider
 from pydantic_ai.providers.groq import GroqProvider
 from pydantic_ai.providers.anthropic import AnthropicProvider
 
+import json
 import logging
 import os
+import time
 from dotenv import load_dotenv
 from db import DatabaseManager
 from ollama import chat
@@ -17,22 +19,22 @@ import asyncio
 from ollama import AsyncClient
 
 # LLM-004: prompts localizados (es/en) — reemplaza el prompt hardcodeado en inglés
-from prompts import build_prompt, detect_lang
+from prompts import build_prompt, build_reduce_prompt, language_detector
+from summary import CancellationToken, DEFAULT_CHUNKING, DeadlinePlan, JobCancelled, ProviderLimiter, TierStats, clean_transcript, empty_summary, estimate_tokens, fold_chunk_summary, rate_limiters, split_transcript
 
-
-
-
-# Set up logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 load_dotenv()  # Load environment variables from .env file
 
 db = DatabaseManager()
 
+
+async def _cancellable(awaitable, cancel: Optional[CancellationToken]):
+    """Await ``awaitable``, aborting it when ``cancel`` fires (see ``CancellationToken.run``)"""
+    if cancel is None:
+        return await awaitable
+    return await cancel.run(awaitable)
+
 class Block(BaseModel):
     """Represents a block of content in a section.
     
@@ -86,7 +88,10 @@ class TranscriptProcessor:
         logger.info("TranscriptProcessor initialized.")
         self.db = DatabaseManager()
         self.active_clients = []  # Track active Ollama client sessions
-    async def process_transcript(self, text: str, model: str, model_name: str, chunk_size: int = 5000, overlap: int = 1000, custom_prompt: str = "") -> Tuple[int, List[str]]:
+        # Strip fillers and ASR artifacts before chunking (MAITY_TRANSCRIPT_CLEANUP=0 disables it)
+        self.clean_transcripts = os.getenv("MAITY_TRANSCRIPT_CLEANUP", "1") != "0"
+
+    async def process_transcript(self, text: str, model: str, model_name: str, chunk_size: int = 5000, overlap: int = 1000, custom_prompt: str = "", meeting_id: Optional[str] = None, metadata: Optional[Dict] = None, chunking: Optional[str] = None, plan: Optional[DeadlinePlan] = None, unfinished: Optional[List[str]] = None, telemetry: Optional[List[Dict]] = None, cancel: Optional[CancellationToken] = None) -> Tuple[int, List[str]]:
         """
         Process transcript text into chunks and generate structured summaries for each chunk using an AI model.
 
@@ -97,6 +102,17 @@ class TranscriptProcessor:
             chunk_size: The size of each text chunk.
             overlap: The overlap between consecutive chunks.
             custom_prompt: A custom prompt to use for the AI model.
+            meeting_id: Optional meeting ID, used to cache the detected language per meeting.
+            metadata: Optional dict that receives job stats (e.g. "preprocess" token reduction,
+                per-tier latency and tokens under "tiers" -> "extract").
+            chunking: Chunking strategy, "fixed" (chunk_size/overlap windows) or "topic"
+                (topic segmentation, chunk_size is the maximum); defaults to MAITY_CHUNKING_STRATEGY.
+            plan: Optional deadline plan; sets chunk size and concurrency, and chunks still
+                running at ``plan.stop_at`` are abandoned.
+            unfinished: Optional list that receives the text of the abandoned chunks.
+            telemetry: Optional list that receives one record per LLM call (see ``TierStats.records``).
+            cancel: Optional cancellation token; once cancelled, in-flight LLM calls are aborted
+                and ``JobCancelled`` is raised.
 
         Returns:
             A tuple containing:
@@ -109,44 +125,17 @@ class TranscriptProcessor:
         all_json_data = []
         agent = None # Define agent variable
         llm = None # Define llm variable
+        stats = None
 
         try:
             # Select and initialize the AI model and agent
-            if model == "claude":
-                api_key = await db.get_api_key("claude")
-                if not api_key: raise ValueError("ANTHROPIC_API_KEY environment variable not set")
-                llm = AnthropicModel(model_name, provider=AnthropicProvider(api_key=api_key))
-                logger.info(f"Using Claude model: {model_name}")
-            elif model == "ollama":
-                # Use environment variable for Ollama host configuration
-                ollama_host = os.getenv('OLLAMA_HOST', 'http://localhost:11434')
-                ollama_base_url = f"{ollama_host}/v1"
-                ollama_model = OpenAIModel(
-                    model_name=model_name, provider=OpenAIProvider(base_url=ollama_base_url)
-                )
-                llm = ollama_model
-                if model_name.lower().startswith("phi4") or model_name.lower().startswith("llama"):
-                    chunk_size = 10000
-                    overlap = 1000
-                else:
-                    chunk_size = 30000
-                    overlap = 1000
-                logger.info(f"Using Ollama model: {model_name}")
-            elif model == "groq":
-                api_key = await db.get_api_key("groq")
-                if not api_key: raise ValueError("GROQ_API_KEY environment variable not set")
-                llm = GroqModel(model_name, provider=GroqProvider(api_key=api_key))
-                logger.info(f"Using Groq model: {model_name}")
-            # --- ADD OPENAI SUPPORT HERE ---
-            elif model == "openai":
-                api_key = await db.get_api_key("openai")
-                if not api_key: raise ValueError("OPENAI_API_KEY environment variable not set")
-                llm = OpenAIModel(model_name, provider=OpenAIProvider(api_key=api_key))
-                logger.info(f"Using OpenAI model: {model_name}")
-            # --- END OPENAI SUPPORT ---
+            llm = await self._get_llm(model, model_name)
+            limiter = await self._limiter(model)
+            if plan is not None:
+                # The deadline planner already sized the chunks for this model
+                chunk_size, overlap = plan.chunk_size, plan.overlap
             else:
-                logger.error(f"Unsupported model provider requested: {model}")
-                raise ValueError(f"Unsupported model provider: {model}")
+                chunk_size, overlap = self.chunk_window(model, model_name, chunk_size, overlap)
 
             # Initialize the agent with the selected LLM
             agent = Agent(
@@ -156,32 +145,56 @@ class TranscriptProcessor:
             )
             logger.info("Pydantic-AI Agent initialized.")
 
-            # Split transcript into chunks
-            step = chunk_size - overlap
-            if step <= 0:
-                logger.warning(f"Overlap ({overlap}) >= chunk_size ({chunk_size}). Adjusting overlap.")
-                overlap = max(0, chunk_size - 100)
-                step = chunk_size - overlap
+            if self.clean_transcripts:
+                lang = language_detector.detect_for(meeting_id, text)
+                cleaned, cleanup_stats = await asyncio.to_thread(clean_transcript, text, lang)
+                logger.info(f"Transcript cleanup: {cleanup_stats['tokens_before']} -> {cleanup_stats['tokens_after']} tokens "
+                            f"({cleanup_stats['token_reduction']:.1%} saved)")
+                if cleaned.strip():
+                    text = cleaned
+                if metadata is not None:
+                    metadata["preprocess"] = cleanup_stats
 
-            chunks = [text[i:i+chunk_size] for i in range(0, len(text), step)]
+            # Split transcript into chunks
+            strategy = chunking or DEFAULT_CHUNKING
+            chunks = await asyncio.to_thread(split_transcript, text, strategy, chunk_size, overlap)
             num_chunks = len(chunks)
-            logger.info(f"Split transcript into {num_chunks} chunks.")
-
-            # LLM-004: detectar idioma del transcript para usar prompt localizado (es/en)
-            full_text_sample = " ".join(chunks[:3])
-            lang = detect_lang(full_text_sample)
-            logger.info(f"LLM-004: detected language '{lang}' for transcript (chunks={num_chunks})")
-
-            for i, chunk in enumerate(chunks):
-                logger.info(f"Processing chunk {i+1}/{num_chunks}...")
+            logger.info(f"Split transcript into {num_chunks} chunks ({strategy}).")
+            if metadata is not None:
+                metadata["chunking"] = {"strategy": strategy, "chunks": num_chunks,
+                                        "max_chars": max((len(chunk) for chunk in chunks), default=0)}
+
+            # LLM-004: detectar idioma por chunk (con caché por reunión) para usar prompt localizado
+            langs = language_detector.detect_chunks(chunks, meeting_id=meeting_id)
+            logger.info(f"LLM-004: detected languages {sorted(set(langs))} for transcript (chunks={num_chunks})")
+
+            stats = TierStats(model=f"{model}/{model_name}")
+            if metadata is not None:
+                metadata.setdefault("tiers", {})["extract"] = stats.as_dict()
+
+            async def summarize_chunk(i: int, chunk: str) -> Optional[str]:
+                if cancel is not None:
+                    cancel.raise_if_cancelled()
+                logger.debug("Processing chunk %d/%d...", i + 1, num_chunks)
                 try:
                     # Run the agent to get the structured summary for the chunk
                     if model != "ollama":
-                        localized_prompt = build_prompt(lang, chunk, custom_prompt)
-                        summary_result = await agent.run(localized_prompt)
+                        localized_prompt = build_prompt(langs[i], chunk, custom_prompt)
+                        started = time.perf_counter()
+                        retried = []
+                        try:
+                            summary_result = await _cancellable(limiter.call(
+                                lambda: agent.run(localized_prompt), estimate_tokens(localized_prompt),
+                                on_retry=retried.append), cancel)
+                        except Exception as e:
+                            stats.record(time.perf_counter() - started, estimate_tokens(localized_prompt), 0, ok=False,
+                                         chunk_index=i, retries=len(retried), error=repr(e))
+                            raise
+                        self._record_run(stats, started, summary_result, chunk_index=i, retries=len(retried))
                     else:
-                        logger.info(f"Using Ollama model: {model_name} and chunk size: {chunk_size} with overlap: {overlap}")
-                        response = await self.chat_ollama_model(model_name, chunk, custom_prompt)
+                        logger.debug("Using Ollama model: %s and chunk size: %d with overlap: %d", model_name, chunk_size, overlap)
+                        response = await self.chat_ollama_model(model_name, chunk, custom_prompt, lang=langs[i],
+                                                                 stats=stats, chunk_index=i, cancel=cancel)
                         
                         # Check if response is already a SummaryResponse object or a string that needs validation
                         if isinstance(response, SummaryResponse):
@@ -190,8 +203,7 @@ class TranscriptProcessor:
                             # If it's a string (JSON), validate it
                             summary_result = SummaryResponse.model_validate_json(response)
                             
-                        logger.info(f"Summary result for chunk {i+1}: {summary_result}")
-                        logger.info(f"Summary result type for chunk {i+1}: {type(summary_result)}")
+                        logger.debug("Summary result for chunk %d: %r", i + 1, summary_result)
 
                     if hasattr(summary_result, 'data') and isinstance(summary_result.data, SummaryResponse):
                          final_summary_pydantic = summary_result.data
@@ -199,26 +211,216 @@ class TranscriptProcessor:
                          final_summary_pydantic = summary_result
                     else:
                          logger.error(f"Unexpected result type from agent for chunk {i+1}: {type(summary_result)}")
-                         continue # Skip this chunk
+                         return None # Skip this chunk
 
+                    logger.debug("Successfully generated summary for chunk %d.", i + 1)
                     # Convert the Pydantic model to a JSON string
-                    chunk_summary_json = final_summary_pydantic.model_dump_json()
-                    all_json_data.append(chunk_summary_json)
-                    logger.info(f"Successfully generated summary for chunk {i+1}.")
+                    return final_summary_pydantic.model_dump_json()
 
+                except JobCancelled:
+                    raise
                 except Exception as chunk_error:
                     logger.error(f"Error processing chunk {i+1}: {chunk_error}", exc_info=True)
+                    return None
+
+            if plan is None:
+                for i, chunk in enumerate(chunks):
+                    chunk_summary_json = await summarize_chunk(i, chunk)
+                    if chunk_summary_json:
+                        all_json_data.append(chunk_summary_json)
+            else:
+                # Deadline-bound: run up to plan.concurrency chunks at once and drop whatever
+                # is still running at plan.stop_at. The semaphore wakes waiters in order, so
+                # chunks are still started front to back.
+                semaphore = asyncio.Semaphore(plan.concurrency)
+
+                async def bounded(i: int, chunk: str) -> Optional[str]:
+                    async with semaphore:
+                        return await summarize_chunk(i, chunk)
+
+                tasks = [asyncio.create_task(bounded(i, chunk)) for i, chunk in enumerate(chunks)]
+                done, pending = await asyncio.wait(tasks, timeout=max(0.0, plan.stop_at - time.monotonic()))
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                if cancel is not None:
+                    cancel.raise_if_cancelled()
+
+                for chunk, task in zip(chunks, tasks):
+                    if task in done:
+                        if task.result():
+                            all_json_data.append(task.result())
+                    elif unfinished is not None:
+                        unfinished.append(chunk)
+                if pending:
+                    logger.warning(f"Deadline reached: {len(pending)}/{num_chunks} chunks left unprocessed")
+                if metadata is not None:
+                    metadata["deadline"] = {**plan.as_dict(), "completed_chunks": len(done), "total_chunks": num_chunks}
 
             logger.info(f"Finished processing all {num_chunks} chunks.")
+            if metadata is not None:
+                metadata["tiers"]["extract"] = stats.as_dict()
+            if telemetry is not None:
+                telemetry.extend(stats.records)
             return num_chunks, all_json_data
 
+        except JobCancelled as e:
+            logger.info(f"Transcript processing stopped: {e}")
+            if telemetry is not None and stats is not None:
+                telemetry.extend(stats.records)  # the calls made so far were still paid for
+            raise
         except Exception as e:
             logger.error(f"Error during transcript processing: {str(e)}", exc_info=True)
             raise
     
-    async def chat_ollama_model(self, model_name: str, transcript: str, custom_prompt: str):
-        # LLM-004: usar prompt localizado (es/en) para Ollama también
-        lang = detect_lang(transcript)
+    @staticmethod
+    def chunk_window(model: str, model_name: str, chunk_size: int, overlap: int) -> Tuple[int, int]:
+        """Chunk size and overlap actually used for a model (local models get larger windows)."""
+        if model == "ollama":
+            if model_name.lower().startswith("phi4") or model_name.lower().startswith("llama"):
+                return 10000, 1000
+            return 30000, 1000
+        return chunk_size, overlap
+
+    async def _get_llm(self, model: str, model_name: str):
+        """Build the pydantic-ai model for a provider ('claude', 'ollama', 'groq', 'openai')."""
+        if model == "claude":
+            api_key = await db.get_api_key("claude")
+            if not api_key: raise ValueError("ANTHROPIC_API_KEY environment variable not set")
+            logger.info(f"Using Claude model: {model_name}")
+            return AnthropicModel(model_name, provider=AnthropicProvider(api_key=api_key))
+        elif model == "ollama":
+            # Use environment variable for Ollama host configuration
+            ollama_host = os.getenv('OLLAMA_HOST', 'http://localhost:11434')
+            ollama_base_url = f"{ollama_host}/v1"
+            logger.info(f"Using Ollama model: {model_name}")
+            return OpenAIModel(
+                model_name=model_name, provider=OpenAIProvider(base_url=ollama_base_url)
+            )
+        elif model == "groq":
+            api_key = await db.get_api_key("groq")
+            if not api_key: raise ValueError("GROQ_API_KEY environment variable not set")
+            logger.info(f"Using Groq model: {model_name}")
+            return GroqModel(model_name, provider=GroqProvider(api_key=api_key))
+        elif model == "openai":
+            api_key = await db.get_api_key("openai")
+            if not api_key: raise ValueError("OPENAI_API_KEY environment variable not set")
+            logger.info(f"Using OpenAI model: {model_name}")
+            return OpenAIModel(model_name, provider=OpenAIProvider(api_key=api_key))
+        else:
+            logger.error(f"Unsupported model provider requested: {model}")
+            raise ValueError(f"Unsupported model provider: {model}")
+
+    async def _limiter(self, model: str) -> ProviderLimiter:
+        """Rate limiter shared by every call to a provider with the configured API key (or Ollama host)"""
+        if model == "ollama":
+            return rate_limiters.get(model, os.getenv('OLLAMA_HOST', 'http://127.0.0.1:11434'))
+        return rate_limiters.get(model, await db.get_api_key(model))
+
+    @staticmethod
+    def _record_run(stats: Optional[TierStats], started: float, result, chunk_index: Optional[int] = None,
+                    retries: int = 0):
+        """Record latency and provider-reported token usage of a pydantic-ai run.
+
+        Extra requests of the run are output-validation retries, added to the
+        ``retries`` of transient errors; prompt-cache reads are reported in the
+        usage details by Anthropic and OpenAI.
+        """
+        if stats is None:
+            return
+        usage = result.usage()
+        details = usage.details or {}
+        stats.record(time.perf_counter() - started, usage.request_tokens or 0, usage.response_tokens or 0,
+                     chunk_index=chunk_index, retries=retries + max(0, (usage.requests or 1) - 1),
+                     cached_tokens=details.get("cache_read_input_tokens") or details.get("cached_tokens") or 0)
+
+    async def generate_structured(self, model: str, model_name: str, prompt: str, result_type: Type[BaseModel],
+                                  stats: Optional[TierStats] = None,
+                                  cancel: Optional[CancellationToken] = None) -> BaseModel:
+        """Run a single prompt and return a validated ``result_type`` instance.
+
+        Used for targeted calls (e.g. regenerating one summary section or the
+        reduce step) that do not go through chunking. Latency and token usage
+        are added to ``stats`` when given; ``cancel`` aborts the call.
+        """
+        limiter = await self._limiter(model)
+        retried = []
+        started = time.perf_counter()
+        if model == "ollama":
+            ollama_host = os.getenv('OLLAMA_HOST', 'http://127.0.0.1:11434')
+            client = AsyncClient(host=ollama_host)
+            self.active_clients.append(client)
+            try:
+                response = await _cancellable(limiter.call(lambda: client.chat(
+                    model=model_name,
+                    messages=[{'role': 'system', 'content': prompt}],
+                    format=result_type.model_json_schema(),
+                ), estimate_tokens(prompt), on_retry=retried.append), cancel)
+                content = response['message']['content']
+                if stats is not None:  # not streamed: no time-to-first-token
+                    stats.record(time.perf_counter() - started,
+                                 getattr(response, 'prompt_eval_count', None) or estimate_tokens(prompt),
+                                 getattr(response, 'eval_count', None) or estimate_tokens(content),
+                                 retries=len(retried))
+                return result_type.model_validate_json(content)
+            finally:
+                if client in self.active_clients:
+                    self.active_clients.remove(client)
+
+        agent = Agent(await self._get_llm(model, model_name), result_type=result_type, result_retries=2)
+        try:
+            result = await _cancellable(limiter.call(lambda: agent.run(prompt), estimate_tokens(prompt),
+                                                     on_retry=retried.append), cancel)
+        except Exception as e:
+            if stats is not None:
+                stats.record(time.perf_counter() - started, estimate_tokens(prompt), 0, ok=False,
+                             retries=len(retried), error=repr(e))
+            raise
+        self._record_run(stats, started, result, retries=len(retried))
+        return result.data
+
+    async def reduce_summary(self, model: str, model_name: str, summary: Dict, custom_prompt: str = "",
+                             lang: str = "es", metadata: Optional[Dict] = None,
+                             telemetry: Optional[List[Dict]] = None,
+                             cancel: Optional[CancellationToken] = None) -> Dict:
+        """Consolidate a merged chunk summary with a (stronger) model.
+
+        ``summary`` is the deterministic merge of the chunk results; the model
+        rewrites it into one deduplicated ``SummaryResponse``, which is folded
+        back into the merged-summary shape (``MeetingNotes.sections`` included)
+        the rest of the pipeline expects. Stats are stored under
+        ``metadata["tiers"]["reduce"]`` and the call is appended to
+        ``telemetry``.
+        """
+        stats = TierStats(model=f"{model}/{model_name}", tier="reduce")
+        # The merge mirrors every top-level section into MeetingNotes; send only the topic notes
+        mirrored = {value["title"] for key, value in summary.items()
+                    if key not in ("MeetingName", "MeetingNotes") and isinstance(value, dict) and "title" in value}
+        notes = summary.get("MeetingNotes") or {}
+        sections = {key: value for key, value in summary.items() if key != "MeetingNotes"}
+        sections["MeetingNotes"] = {
+            "meeting_name": notes.get("meeting_name", ""),
+            "sections": [section for section in notes.get("sections", []) if section.get("title") not in mirrored],
+        }
+        prompt = build_reduce_prompt(lang, json.dumps(sections, ensure_ascii=False, separators=(",", ":")), custom_prompt)
+        try:
+            reduced = await self.generate_structured(model, model_name, prompt, SummaryResponse, stats=stats,
+                                                     cancel=cancel)
+        finally:
+            if metadata is not None:
+                metadata.setdefault("tiers", {})["reduce"] = stats.as_dict()
+            if telemetry is not None:
+                telemetry.extend(stats.records)
+        logger.info(f"Reduced {len(summary)} merged sections with {model}/{model_name} in {stats.latency_ms:.0f} ms")
+        final_summary = fold_chunk_summary(empty_summary(), reduced.model_dump())
+        final_summary["MeetingName"] = final_summary["MeetingName"] or summary.get("MeetingName", "")
+        return final_summary
+
+    async def chat_ollama_model(self, model_name: str, transcript: str, custom_prompt: str, lang: Optional[str] = None,
+                                stats: Optional[TierStats] = None, chunk_index: Optional[int] = None,
+                                cancel: Optional[CancellationToken] = None):
+        # LLM-004: usar prompt localizado para Ollama también
+        lang = lang or language_detector.detect(transcript)
         localized_content = build_prompt(lang, transcript, custom_prompt)
         message = {
             'role': 'system',
@@ -230,27 +432,51 @@ class TranscriptProcessor:
         client = AsyncClient(host=ollama_host)
         self.active_clients.append(client)
         
-        try:
+        async def stream():
+            # A retry restarts the whole generation
+            attempt_started = time.perf_counter()
             response = await client.chat(model=model_name, messages=[message], stream=True, format=SummaryResponse.model_json_schema())
-            
+
             full_response = ""
+            prompt_tokens = output_tokens = first_token = None
             async for part in response:
-                content = part['message']['content']
-                print(content, end='', flush=True)
-                full_response += content
+                if first_token is None:
+                    first_token = time.perf_counter() - attempt_started
+                full_response += part['message']['content']
+                # Token counts only come with the final part of the stream
+                prompt_tokens = getattr(part, 'prompt_eval_count', None) or prompt_tokens
+                output_tokens = getattr(part, 'eval_count', None) or output_tokens
+            return full_response, prompt_tokens, output_tokens, first_token
+
+        limiter = await self._limiter("ollama")
+        retried = []
+        started = time.perf_counter()
+        try:
+            # Cancelling aborts the HTTP stream, which stops the generation on the Ollama server
+            full_response, prompt_tokens, output_tokens, first_token = await _cancellable(limiter.call(
+                stream, estimate_tokens(localized_content), on_retry=retried.append), cancel)
+
+            if stats is not None:
+                stats.record(time.perf_counter() - started,
+                             prompt_tokens or estimate_tokens(localized_content),
+                             output_tokens or estimate_tokens(full_response),
+                             chunk_index=chunk_index, ttft_s=first_token, retries=len(retried))
             
             try:
                 summary = SummaryResponse.model_validate_json(full_response)
-                print("\n", summary.model_dump_json(indent=2), type(summary))
+                logger.debug("Parsed Ollama summary for chunk %s", chunk_index)
                 return summary
             except Exception as e:
-                print(f"\nError parsing response: {e}")
+                logger.debug("Error parsing Ollama response for chunk %s: %s", chunk_index, e)
                 return full_response
         except asyncio.CancelledError:
             logger.info("Ollama request was cancelled during shutdown")
             raise
         except Exception as e:
             logger.error(f"Error in Ollama chat: {e}")
+            if stats is not None:
+                stats.record(time.perf_counter() - started, estimate_tokens(localized_content), 0, ok=False,
+                             chunk_index=chunk_index, retries=len(retried), error=repr(e))
             raise
         finally:
             # Remove the client from active clients list
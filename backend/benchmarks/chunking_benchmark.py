@@ -0,0 +1,70 @@
+"""
+Benchmark topic segmentation against transcript length.
+
+Builds synthetic meetings that alternate between a few agenda topics and
+times topic_chunks (TextTiling) next to the fixed-size splitter. Time per MB
+should stay roughly flat as the transcript grows.
+
+Usage (from backend/):
+    python benchmarks/chunking_benchmark.py --hours 1,4,16,64
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from summary import fixed_chunks, topic_chunks  # noqa: E402
+
+_TOPICS = [
+    "presupuesto proyecto aprobación finanzas cierre trimestral costos gastos inversión facturas proveedores",
+    "campaña marketing digital redes sociales anuncios contenido métricas conversión audiencia",
+    "equipo desarrollo migración base datos servidores despliegue pruebas integración código",
+    "contratación personal entrevistas candidatos recursos humanos vacantes salarios capacitación",
+]
+_GLUE = ["y", "la", "de", "que", "para", "con", "el", "los", "una", "entonces"]
+
+# Roughly 150 spoken words per minute
+_WORDS_PER_HOUR = 9000
+
+
+def _meeting(hours: float, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts = []
+    words = 0
+    while words < hours * _WORDS_PER_HOUR:
+        vocabulary = rng.choice(_TOPICS).split() + _GLUE
+        sentences = rng.randint(15, 60)
+        parts.append(". ".join(" ".join(rng.choice(vocabulary) for _ in range(15)) for _ in range(sentences)) + ".")
+        words += sentences * 15
+    return "\n".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", default="1,4,16,64")
+    parser.add_argument("--max-chars", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'hours':>6}  {'size':>9}  {'fixed':>9}  {'topic':>9}  {'topic/MB':>9}  chunks (min-max chars)")
+    for hours in (float(h) for h in args.hours.split(",")):
+        text = _meeting(hours)
+
+        start = time.perf_counter()
+        fixed_chunks(text, args.max_chars, 1000)
+        fixed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        chunks = topic_chunks(text, args.max_chars)
+        topic = time.perf_counter() - start
+
+        megabytes = len(text.encode("utf-8")) / 1_048_576
+        sizes = [len(chunk) for chunk in chunks]
+        print(f"{hours:>6g}  {megabytes:>6.2f} MB  {fixed * 1000:>6.1f} ms  {topic * 1000:>6.0f} ms  "
+              f"{topic * 1000 / megabytes:>6.0f} ms  {len(chunks)} ({min(sizes)}-{max(sizes)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark DB size and read latency of compressed vs. plain large-text columns.
+
+Fills a fresh SQLite database per codec with meetings that each have a full
+transcript in transcript_chunks and a summary JSON in summary_processes, then
+reports the file size and the latency of get_transcript_data (the /get-summary
+read path).
+
+Usage (from backend/):
+    python benchmarks/compression_benchmark.py --meetings 50 --transcript-kb 500
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from db import DatabaseManager  # noqa: E402
+
+_WORDS = (
+    "bueno entonces la reunión de hoy es para revisar el avance del proyecto y los "
+    "pendientes del cliente vamos a necesitar el reporte para el viernes ok perfect "
+    "the deadline is next week and we need to confirm the budget with finance"
+).split()
+
+
+def _transcript(size_bytes: int, seed: int) -> str:
+    rng = random.Random(seed)
+    words = []
+    total = 0
+    while total < size_bytes:
+        word = rng.choice(_WORDS)
+        words.append(word)
+        total += len(word) + 1
+    return " ".join(words)
+
+
+def _summary(seed: int) -> dict:
+    rng = random.Random(seed)
+    blocks = [{"id": str(i), "type": "bullet", "content": " ".join(rng.choices(_WORDS, k=20)), "color": ""}
+              for i in range(200)]
+    return {"MeetingName": f"Meeting {seed}", "MeetingNotes": {"meeting_name": "", "sections": [
+        {"title": "Notes", "blocks": blocks}]}}
+
+
+async def _run(codec: str, meetings: int, transcript_kb: int, reads: int):
+    os.environ["MAITY_DB_COMPRESSION"] = codec
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        db = DatabaseManager(db_path=path)
+
+        for i in range(meetings):
+            meeting_id = f"bench-{i}"
+            await db.save_meeting(meeting_id, f"Bench {i}")
+            await db.create_process(meeting_id)
+            await db.save_transcript(meeting_id, _transcript(transcript_kb * 1024, i), "ollama", "gemma", 5000, 1000)
+            await db.update_process(meeting_id, status="completed", result=_summary(i))
+
+        size = os.path.getsize(path)
+        latencies = []
+        for i in range(reads):
+            start = time.perf_counter()
+            await db.get_transcript_data(f"bench-{i % meetings}")
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        print(f"{codec:>5}: db={size / 1_048_576:8.2f} MB  "
+              f"read p50={statistics.median(latencies):6.2f} ms  "
+              f"p95={sorted(latencies)[int(len(latencies) * 0.95) - 1]:6.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--meetings", type=int, default=50)
+    parser.add_argument("--transcript-kb", type=int, default=500)
+    parser.add_argument("--reads", type=int, default=200)
+    parser.add_argument("--codecs", default="none,zlib,zstd")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    for codec in args.codecs.split(","):
+        asyncio.run(_run(codec, args.meetings, args.transcript_kb, args.reads))
+
+
+if __name__ == "__main__":
+    main()
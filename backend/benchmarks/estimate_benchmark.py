@@ -0,0 +1,49 @@
+"""
+Benchmark the /estimate-summary pre-flight against transcript size.
+
+Times estimate_summary on synthetic meetings (see chunking_benchmark.py) and
+compares its chunk count with cleaning and chunking the whole transcript for
+real. The estimate should stay in the milliseconds however long the meeting.
+
+Usage (from backend/):
+    python benchmarks/estimate_benchmark.py --hours 1,16,128 --chunking topic
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from chunking_benchmark import _meeting  # noqa: E402
+from summary import ModelTier, clean_transcript, estimate_summary, split_transcript  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", default="1,16,128")
+    parser.add_argument("--chunking", choices=("fixed", "topic"), default="fixed")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    tier = ModelTier("claude", "claude-3-5-sonnet")
+    print(f"{'hours':>6}  {'size':>9}  {'estimate':>9}  {'real':>9}  chunks (estimated/real)")
+    for hours in (float(h) for h in args.hours.split(",")):
+        text = _meeting(hours)
+
+        start = time.perf_counter()
+        estimate = estimate_summary(text, (tier, None), {}, args.chunk_size, 1000, args.chunking)
+        estimated = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cleaned, _ = clean_transcript(text, estimate["lang"])
+        chunks = split_transcript(cleaned, args.chunking, args.chunk_size, 1000)
+        real = time.perf_counter() - start
+
+        megabytes = len(text.encode("utf-8")) / 1_048_576
+        print(f"{hours:>6g}  {megabytes:>6.2f} MB  {estimated * 1000:>6.1f} ms  {real * 1000:>6.0f} ms  "
+              f"{estimate['chunks']}/{len(chunks)}")
+
+
+if __name__ == "__main__":
+    main()
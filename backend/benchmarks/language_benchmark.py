@@ -0,0 +1,90 @@
+"""
+Benchmark language detection cost against transcript size.
+
+Compares the previous detect_lang approach (lowercase and split the first
+three chunks joined together) with LanguageDetector, which only samples a
+bounded prefix, for transcripts from 10 KB to 10 MB. The detector's time
+should stay flat while the old approach grows with the chunk size.
+
+Usage (from backend/):
+    python benchmarks/language_benchmark.py --sizes-kb 10,100,1000,10000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from prompts import FUNCTION_WORDS, LanguageDetector  # noqa: E402
+
+_WORDS = (
+    "bueno entonces la reunión de hoy es para revisar el avance del proyecto y los "
+    "pendientes del cliente vamos a necesitar el reporte para el viernes y hay que "
+    "confirmar el presupuesto con finanzas antes de la próxima semana"
+).split()
+
+
+def _transcript(size_bytes: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    words = []
+    total = 0
+    while total < size_bytes:
+        word = rng.choice(_WORDS)
+        words.append(word)
+        total += len(word) + 1
+    return " ".join(words)
+
+
+def _legacy_detect(text: str, default: str = "es") -> str:
+    """The es/en heuristic detect_lang used before LanguageDetector"""
+    words = text.lower().split()
+    if not words:
+        return default
+    es_score = sum(1 for w in words if w.rstrip(".,;:!?") in FUNCTION_WORDS["es"])
+    en_score = sum(1 for w in words if w.rstrip(".,;:!?") in FUNCTION_WORDS["en"])
+    total = es_score + en_score
+    if total == 0:
+        return default
+    ratio = es_score / total
+    if ratio >= 0.4:
+        return "es"
+    elif ratio <= 0.25:
+        return "en"
+    return default
+
+
+def _time(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes-kb", default="10,100,1000,10000")
+    parser.add_argument("--chunk-size", type=int, default=30000, help="chunk size of the old join(chunks[:3]) sample")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    detector = LanguageDetector()
+    print(f"{'size':>9}  {'legacy (3 chunks)':>18}  {'detector':>9}  {'detect_chunks':>14}")
+    for size_kb in (int(s) for s in args.sizes_kb.split(",")):
+        text = _transcript(size_kb * 1024)
+        step = args.chunk_size
+        chunks = [text[i:i + step] for i in range(0, len(text), step)]
+
+        legacy = _time(lambda: _legacy_detect(" ".join(chunks[:3])), args.repeat)
+        sampled = _time(lambda: detector.detect(text), args.repeat)
+        per_chunk = _time(lambda: detector.detect_chunks(chunks), max(1, args.repeat // 5))
+        print(f"{size_kb:>6} KB  {legacy:>15.3f} ms  {sampled:>6.3f} ms  "
+              f"{per_chunk:>8.3f} ms ({len(chunks)} chunks)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark /get-summary polling throughput under the old and the queued logging setup.
+
+"sync" reproduces the previous configuration: the root logger at DEBUG (as
+transcript_processor's basicConfig left it) with a StreamHandler writing
+every record, aiosqlite's per-query debug lines included, from the request
+path. "queued" is log_config.configure_logging() at its default INFO level,
+with the writer on the QueueListener thread. Both write to a real file so
+the cost of the write itself is measured, not a /dev/null shortcut.
+
+Usage (from backend/):
+    python benchmarks/logging_benchmark.py --requests 2000 --concurrency 8
+"""
+import argparse
+import asyncio
+import importlib
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+import httpx  # noqa: E402
+
+import log_config  # noqa: E402
+
+from compression_benchmark import _summary  # noqa: E402
+
+SYNC_FORMAT = '%(asctime)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s'
+
+
+def _configure(mode: str, path: str):
+    root = logging.getLogger()
+    log_config.shutdown_logging()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    stream = open(path, "a", encoding="utf-8")
+    if mode == "sync":
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(logging.Formatter(SYNC_FORMAT))
+        root.addHandler(handler)
+        root.setLevel(logging.DEBUG)
+    else:
+        log_config.configure_logging(stream)
+    # Only the server's logging is under test, not the benchmark's HTTP client
+    for name in ("httpx", "httpcore"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    return stream
+
+
+async def _poll(client: httpx.AsyncClient, meeting_ids, requests: int, concurrency: int):
+    latencies = []
+
+    async def worker(offset: int):
+        for i in range(offset, requests, concurrency):
+            started = time.perf_counter()
+            response = await client.get(f"/get-summary/{meeting_ids[i % len(meeting_ids)]}")
+            assert response.status_code in (200, 202), response.text
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+    return requests / (time.perf_counter() - started), latencies
+
+
+async def _run(mode: str, tmp: str, requests: int, concurrency: int):
+    log_path = os.path.join(tmp, f"{mode}.log")
+    stream = _configure(mode, log_path)
+    import main
+    importlib.reload(main)  # main configures logging on import; put the mode under test back
+    stream.close()
+    stream = _configure(mode, log_path)
+
+    # Half the pollers wait on a running job, half fetch a finished summary
+    meeting_ids = []
+    for i in range(8):
+        meeting_id = f"{mode}-{i}"
+        await main.db.save_meeting(meeting_id, f"Bench {meeting_id}")
+        await main.db.create_process(meeting_id)
+        if i % 2:
+            await main.db.update_process(meeting_id, status="completed", result=_summary(i))
+        meeting_ids.append(meeting_id)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench") as client:
+        await _poll(client, meeting_ids, concurrency * 10, concurrency)  # warm up
+        throughput, latencies = await _poll(client, meeting_ids, requests, concurrency)
+    await main.shutdown_event()
+
+    log_config.shutdown_logging()
+    stream.close()
+    print(f"{mode:>6}: {throughput:8.1f} req/s  p50={statistics.median(latencies):6.2f} ms  "
+          f"p95={sorted(latencies)[int(len(latencies) * 0.95) - 1]:6.2f} ms  "
+          f"log={os.path.getsize(log_path) / 1024:8.1f} KB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--modes", default="sync,queued")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_PATH"] = os.path.join(tmp, "bench.db")
+        os.environ["MAITY_JOURNAL_DIR"] = os.path.join(tmp, "journal")
+        for mode in args.modes.split(","):
+            asyncio.run(_run(mode, tmp, args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark /get-meeting on a long meeting: serialization and compression.
+
+Stores one meeting with --segments transcript segments, then times:
+
+  * serialization alone: response_model validation and dump + stdlib json
+    (the previous path) against FastJSONResponse (orjson, no re-validation);
+  * the whole request through the ASGI app, for the previous route (a copy
+    with response_model validation and JSONResponse) and the current one,
+    uncompressed and with gzip / brotli. Compressed latencies include the
+    client decoding the body.
+
+Usage (from backend/):
+    python benchmarks/serialization_benchmark.py --segments 5000 --requests 50
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from compression_benchmark import _transcript  # noqa: E402
+
+
+def _seed(db, meeting_id: str, segments: int):
+    with sqlite3.connect(db.db_path) as conn:
+        conn.executemany("""
+            INSERT INTO transcripts (
+                meeting_id, transcript, timestamp, summary, action_items, key_points,
+                audio_start_time, audio_end_time, duration
+            ) VALUES (?, ?, ?, '', '', '', ?, ?, ?)
+        """, [(meeting_id, _transcript(120, i), f"2025-01-01T12:{i // 60 % 60:02d}:{i % 60:02d}",
+               i * 3.0, i * 3.0 + 2.5, 2.5) for i in range(segments)])
+
+
+def _time(func, repeat: int) -> float:
+    """Median milliseconds of ``func()``"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+async def _request(client: httpx.AsyncClient, path: str, encoding: str, requests: int):
+    samples = []
+    size = 0
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = await client.get(path, headers={"Accept-Encoding": encoding})
+        assert response.status_code == 200, response.text
+        samples.append((time.perf_counter() - started) * 1000)
+        size = int(response.headers.get("content-length", len(response.content)))
+    return statistics.median(samples), size
+
+
+async def _run(segments: int, requests: int):
+    import main
+    from responses import FastJSONResponse
+    from routes.meetings import MeetingDetailsResponse
+
+    meeting_id = "bench-long"
+    await main.db.save_meeting(meeting_id, "Long meeting")
+    _seed(main.db, meeting_id, segments)
+    meeting = await main.db.get_meeting(meeting_id)
+
+    def before():
+        # What FastAPI's serialize_response does with a response_model
+        validated = MeetingDetailsResponse.model_validate(meeting)
+        return JSONResponse(validated.model_dump(mode="json")).body
+
+    def after():
+        return FastJSONResponse(meeting).body
+
+    assert len(before()) >= len(after())  # stdlib json adds spaces after separators
+    print(f"{segments} segments, {len(after()) / 1024:.0f} KB of JSON")
+    print(f"  serialize  validate+json {_time(before, requests):8.2f} ms   orjson {_time(after, requests):8.2f} ms")
+
+    # The route as it was: response_model validation and stdlib JSONResponse, no compression
+    legacy = FastAPI()
+
+    @legacy.get("/get-meeting/{meeting_id}", response_model=MeetingDetailsResponse, response_class=JSONResponse)
+    async def get_meeting(meeting_id: str):
+        return await main.db.get_meeting(meeting_id)
+
+    path = f"/get-meeting/{meeting_id}"
+    for name, app, encoding in (("previous", legacy, "identity"), ("current", main.app, "identity"),
+                                ("current", main.app, "gzip"), ("current", main.app, "br")):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            await _request(client, path, encoding, 3)  # warm up
+            latency, size = await _request(client, path, encoding, requests)
+        print(f"  {name:>8} {encoding:>8}  p50={latency:8.2f} ms  body={size / 1024:8.1f} KB")
+    await main.shutdown_event()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--segments", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_PATH"] = os.path.join(tmp, "bench.db")
+        os.environ["MAITY_JOURNAL_DIR"] = os.path.join(tmp, "journal")
+        os.environ.setdefault("MAITY_LOG_LEVEL", "WARNING")
+        asyncio.run(_run(args.segments, args.requests))
+
+
+if __name__ == "__main__":
+    main()
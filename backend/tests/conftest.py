@@ -51,5 +51,8 @@ async def test_client(tmp_db_path):
     ) as client:
         yield client
 
+    # Stop background workers (ingest batcher, live summaries) on this event loop
+    await main_module.shutdown_event()
+
     # Clean up the environment variable
     os.environ.pop("DATABASE_PATH", None)
@@ -1,5 +1,8 @@
 """Tests for the FastAPI REST endpoints."""
 
+import asyncio
+import json
+
 import pytest
 
 
@@ -49,3 +52,798 @@ class TestApiEndpoints:
         assert response.status_code == 404
         data = response.json()
         assert data["status"] == "error"
+
+    @pytest.mark.asyncio
+    async def test_api_live_summary_requires_session(self, test_client):
+        """Live summary endpoints should 404 for meetings without a session."""
+        response = await test_client.get("/get-live-summary/nonexistent-id")
+        assert response.status_code == 404
+
+        response = await test_client.post("/finalize-live-summary", json={"meeting_id": "nonexistent-id"})
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_api_start_live_summary_keeps_running_session(self, test_client, monkeypatch):
+        """Starting a live summary twice returns the running session without
+        resetting its process row; unknown meetings get a 404."""
+        import main
+
+        start = {"model": "ollama", "model_name": "llama3.1:8b"}
+        response = await test_client.post("/start-live-summary", json={"meeting_id": "missing-meeting", **start})
+        assert response.status_code == 404
+
+        save_response = await test_client.post("/save-transcript", json={"meeting_title": "Live Restart", "transcripts": []})
+        meeting_id = save_response.json()["meeting_id"]
+        response = await test_client.post("/start-live-summary", json={"meeting_id": meeting_id, **start})
+        assert response.status_code == 200
+        session = main.live_summarizer.get_session(meeting_id)
+
+        await main.db.update_process(meeting_id, status="completed", result={"MeetingName": "Kept"})
+        response = await test_client.post("/start-live-summary", json={"meeting_id": meeting_id, **start})
+        assert response.status_code == 200
+        assert main.live_summarizer.get_session(meeting_id) is session
+        stored = await main.db.get_summary_result(meeting_id)
+        assert stored["status"] == "completed"
+        assert json.loads(stored["result"]) == {"MeetingName": "Kept"}
+
+    @pytest.mark.asyncio
+    async def test_api_finalize_live_summary_once(self, test_client, tmp_db_path, monkeypatch):
+        """A second finalize while the first is running gets a 409 and cannot
+        mark the first one's completed summary as failed."""
+        import sqlite3
+
+        import main
+
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        class SlowProcessor:
+            async def process_transcript(self, text, model, model_name, chunk_size, overlap, custom_prompt,
+                                         meeting_id=None, telemetry=None, cancel=None, **kwargs):
+                started.set()
+                await release.wait()
+                return 1, [json.dumps({"MeetingName": "Cierre", "NextSteps": {"title": "Next Steps", "blocks": [
+                    {"id": "a", "type": "bullet", "content": "Enviar acta", "color": ""}]}})]
+
+        monkeypatch.setattr(main.live_summarizer, "processor", SlowProcessor())
+        save_response = await test_client.post("/save-transcript", json={"meeting_title": "Live Finalize", "transcripts": [
+            {"id": "1", "text": "Hay que enviar el acta.", "timestamp": "2025-01-01T12:00:00"},
+        ]})
+        meeting_id = save_response.json()["meeting_id"]
+        response = await test_client.post("/start-live-summary", json={
+            "meeting_id": meeting_id, "model": "ollama", "model_name": "llama3.1:8b",
+        })
+        assert response.status_code == 200
+
+        # The transport runs the background task before returning, so the first finalize is still in flight
+        first = asyncio.create_task(test_client.post("/finalize-live-summary", json={"meeting_id": meeting_id}))
+        await asyncio.wait_for(started.wait(), timeout=5)
+        response = await asyncio.wait_for(
+            test_client.post("/finalize-live-summary", json={"meeting_id": meeting_id}), timeout=5)
+        assert response.status_code == 409
+
+        release.set()
+        assert (await first).status_code == 200
+        response = await test_client.post("/finalize-live-summary", json={"meeting_id": meeting_id})
+        assert response.status_code == 404
+
+        with sqlite3.connect(tmp_db_path) as conn:
+            status = conn.execute("SELECT status FROM summary_processes WHERE meeting_id = ?", (meeting_id,)).fetchone()[0]
+        assert status == "completed"
+
+    @pytest.mark.asyncio
+    async def test_api_delete_meeting_stops_live_summary(self, test_client, tmp_db_path, monkeypatch):
+        """Deleting a meeting cancels its live summary session, so no window
+        or LLM call is written for the deleted meeting afterwards."""
+        import sqlite3
+
+        import main
+
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        class SlowProcessor:
+            async def process_transcript(self, text, model, model_name, chunk_size, overlap, custom_prompt,
+                                         meeting_id=None, telemetry=None, cancel=None, **kwargs):
+                started.set()
+                await release.wait()
+                telemetry.append({"provider": model, "model": model_name, "tier": "extract", "chunk_index": 0,
+                                  "latency_ms": 1.0, "prompt_tokens": 10, "completion_tokens": 5, "ok": True})
+                return 1, [json.dumps({"MeetingName": "Live"})]
+
+        monkeypatch.setattr(main.live_summarizer, "processor", SlowProcessor())
+        monkeypatch.setattr(main.live_summarizer, "poll_interval", 0.01)
+        save_response = await test_client.post("/save-transcript", json={"meeting_title": "Live Delete", "transcripts": [
+            {"id": "1", "text": "Primera parte de la reunión en vivo.", "timestamp": "2025-01-01T12:00:00"},
+        ]})
+        meeting_id = save_response.json()["meeting_id"]
+        response = await test_client.post("/start-live-summary", json={
+            "meeting_id": meeting_id, "model": "ollama", "model_name": "llama3.1:8b", "window_tokens": 1,
+        })
+        assert response.status_code == 200
+        session = main.live_summarizer.get_session(meeting_id)
+        await asyncio.wait_for(started.wait(), timeout=5)
+
+        response = await test_client.post("/delete-meeting", json={"meeting_id": meeting_id})
+        assert response.status_code == 200
+        assert main.live_summarizer.get_session(meeting_id) is None
+        assert session.task.done()
+
+        release.set()
+        await asyncio.sleep(0.05)
+        with sqlite3.connect(tmp_db_path) as conn:
+            for table in ("summary_windows", "llm_calls"):
+                count = conn.execute(f"SELECT COUNT(*) FROM {table} WHERE meeting_id = ?", (meeting_id,)).fetchone()[0]
+                assert count == 0, table
+
+    @pytest.mark.asyncio
+    async def test_api_append_transcript_ndjson(self, test_client):
+        """POST /append-transcript streams NDJSON segments into an existing
+        meeting and acknowledges the last committed sequence number."""
+        save_response = await test_client.post(
+            "/save-transcript", json={"meeting_title": "Live Append", "transcripts": []}
+        )
+        meeting_id = save_response.json()["meeting_id"]
+
+        lines = [
+            json.dumps({"seq": seq, "text": f"segment {seq}", "timestamp": "2025-01-01T12:00:00"})
+            for seq in range(5)
+        ]
+        body = "\n".join(lines).encode()
+
+        response = await test_client.post(f"/append-transcript/{meeting_id}", content=body)
+        assert response.status_code == 200
+        assert response.json()["acked_seq"] == 4
+        assert response.json()["accepted"] == 5
+
+        # A retry of the same stream is acknowledged without duplicating rows
+        response = await test_client.post(f"/append-transcript/{meeting_id}", content=body)
+        assert response.json()["duplicates"] == 5
+
+        # Acknowledged segments are journaled; the compactor moves them into SQLite shortly after
+        for _ in range(100):
+            meeting = (await test_client.get(f"/get-meeting/{meeting_id}")).json()
+            if len(meeting["transcripts"]) == 5:
+                break
+            await asyncio.sleep(0.02)
+        assert len(meeting["transcripts"]) == 5
+
+        response = await test_client.post("/append-transcript/missing-meeting", content=body)
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_api_append_transcript_batch_fails_mid_stream(self, test_client, monkeypatch):
+        """A batch that fails while the body is still streaming turns the
+        response into a 500 acknowledging only what precedes it, and the
+        resent segments are stored rather than dropped as duplicates."""
+        import main
+
+        save_response = await test_client.post(
+            "/save-transcript", json={"meeting_title": "Flaky Append", "transcripts": []}
+        )
+        meeting_id = save_response.json()["meeting_id"]
+        journal = main.ingest_batcher.journal
+        append = journal.append
+
+        def failing_append(segments):
+            monkeypatch.setattr(journal, "append", append)  # fail once
+            raise OSError("disk full")
+
+        def line(seq):
+            return (json.dumps({"seq": seq, "text": f"segment {seq}", "timestamp": "2025-01-01T12:00:00"}) + "\n").encode()
+
+        async def body():
+            yield line(0) + line(1)
+            await asyncio.sleep(0.2)  # let segments 0-1 commit in their own batch
+            monkeypatch.setattr(journal, "append", failing_append)
+            yield line(2)
+            await asyncio.sleep(0.2)
+            yield line(3) + line(4)
+
+        response = await test_client.post(f"/append-transcript/{meeting_id}", content=body())
+        assert response.status_code == 500
+        assert response.json()["acked_seq"] == 1
+        assert "disk full" in response.json()["error"]
+
+        response = await test_client.post(f"/append-transcript/{meeting_id}", content=b"".join(line(seq) for seq in range(2, 5)))
+        assert response.status_code == 200
+        assert response.json()["accepted"] == 3
+        assert response.json()["acked_seq"] == 4
+
+    @pytest.mark.asyncio
+    async def test_api_get_summary_serves_stored_payload(self, test_client, tmp_db_path):
+        """Completed results are stored once in frontend shape and served
+        as-is; legacy double-encoded rows are still readable."""
+        from db import DatabaseManager
+        from summary import SUMMARY_FORMAT, build_summary_payload
+
+        db = DatabaseManager(db_path=tmp_db_path)
+        merged = {
+            "MeetingName": "Planning",
+            "MeetingNotes": {"meeting_name": "Planning", "sections": [
+                {"title": "Next Steps", "blocks": [{"id": "1", "type": "bullet", "content": "Ship", "color": ""}]}
+            ]},
+        }
+
+        await db.save_meeting("summary-new", "New")
+        await db.create_process("summary-new")
+        meeting_name, data_json = build_summary_payload(merged)
+        await db.update_process("summary-new", status="completed", result=data_json,
+                                result_format=SUMMARY_FORMAT, meeting_name=meeting_name)
+
+        await db.save_meeting("summary-legacy", "Legacy")
+        await db.create_process("summary-legacy")
+        await db.update_process("summary-legacy", status="completed", result=json.dumps(merged))
+
+        for meeting_id in ("summary-new", "summary-legacy"):
+            response = await test_client.get(f"/get-summary/{meeting_id}")
+            assert response.status_code == 200
+            body = response.json()
+            assert body["status"] == "completed"
+            assert body["meetingName"] == "Planning"
+            assert body["data"]["_section_order"] == ["next_steps"]
+            assert body["data"]["next_steps"]["blocks"][0]["content"] == "Ship"
+
+    @pytest.mark.asyncio
+    async def test_api_summary_versions_and_rollback(self, test_client):
+        """/get-summary-version rebuilds old versions and /rollback-summary
+        makes one current again as a new version."""
+        import main
+        from summary import SUMMARY_FORMAT, build_summary_payload
+
+        await main.db.save_meeting("versioned", "Versioned")
+        await main.db.create_process("versioned")
+        for name in ("First", "Second"):
+            meeting_name, data_json = build_summary_payload({"MeetingName": name, "_section_order": []})
+            await main.db.add_summary_version("versioned", data_json, model="test", result_format=SUMMARY_FORMAT,
+                                              meeting_name=meeting_name)
+        await main.db.update_process("versioned", status="completed")
+
+        response = await test_client.get("/get-summary-version/versioned/1")
+        assert response.status_code == 200
+        assert response.json()["payload"]["MeetingName"] == "First"
+        assert (await test_client.get("/get-summary-version/versioned/9")).status_code == 404
+
+        response = await test_client.post("/rollback-summary", json={"meeting_id": "versioned", "version": 1,
+                                                                     "base_version": 2})
+        assert response.status_code == 200
+        assert response.json()["version"] == 3
+        body = (await test_client.get("/get-summary/versioned")).json()
+        assert body["meetingName"] == "First"
+        versions = (await test_client.get("/get-summary-versions/versioned")).json()["versions"]
+        assert [(v["version"], v["model"]) for v in versions] == [(3, "rollback:1"), (2, "test"), (1, "test")]
+
+        # Stale base version and unknown version
+        response = await test_client.post("/rollback-summary", json={"meeting_id": "versioned", "version": 2,
+                                                                     "base_version": 2})
+        assert response.status_code == 409
+        response = await test_client.post("/rollback-summary", json={"meeting_id": "versioned", "version": 9})
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_api_failed_regeneration_keeps_previous_summary(self, test_client):
+        """A re-run that fails leaves the last stored version as the current summary."""
+        import main
+        from summary import SUMMARY_FORMAT, build_summary_payload
+
+        await main.db.save_meeting("rerun", "Rerun")
+        await main.db.create_process("rerun")
+        meeting_name, data_json = build_summary_payload({"MeetingName": "Kept", "_section_order": []})
+        await main.db.add_summary_version("rerun", data_json, model="test", result_format=SUMMARY_FORMAT,
+                                          meeting_name=meeting_name)
+        await main.db.update_process("rerun", status="completed")
+
+        # No API key is configured, so the background job fails fast
+        response = await test_client.post("/process-transcript", json={
+            "text": "Ana: Hay que revisar el presupuesto.", "model": "claude", "model_name": "claude-3-5-sonnet",
+            "meeting_id": "rerun",
+        })
+        assert response.status_code == 200
+
+        response = await test_client.get("/get-summary/rerun")
+        assert response.status_code == 200
+        body = response.json()
+        assert body["status"] == "completed"
+        assert body["meetingName"] == "Kept"
+        assert "provisional" not in body
+        stored = await main.db.get_summary_result("rerun")
+        assert stored["error"]
+
+    @pytest.mark.asyncio
+    async def test_api_process_transcript_returns_preview(self, test_client, tmp_db_path):
+        """/process-transcript answers with a rule-based preview, and
+        /get-summary serves it as provisional while the job is pending."""
+        from db import DatabaseManager
+        from summary import PREVIEW_FORMAT, build_preview, build_summary_payload
+
+        text = "Ana: Hay que revisar el presupuesto antes del viernes. Carlos: Yo me encargo del diseño."
+        # No API key is configured, so the background job fails fast without calling an LLM
+        response = await test_client.post("/process-transcript", json={
+            "text": text, "model": "claude", "model_name": "claude-3-5-sonnet", "meeting_id": "preview-meeting"
+        })
+        assert response.status_code == 200
+        preview = response.json()["preview"]
+        assert preview["provisional"] is True
+        assert "Ana" in [b["content"] for b in preview["data"]["participantes"]["blocks"]]
+
+        db = DatabaseManager(db_path=tmp_db_path)
+        await db.create_process("pending-meeting")
+        meeting_name, data_json = build_summary_payload(build_preview(text))
+        await db.update_process("pending-meeting", status="PENDING", result=data_json,
+                                result_format=PREVIEW_FORMAT, meeting_name=meeting_name)
+
+        response = await test_client.get("/get-summary/pending-meeting")
+        assert response.status_code == 202
+        body = response.json()
+        assert body["status"] == "processing"
+        assert body["provisional"] is True
+        assert body["data"] == preview["data"]
+
+    @pytest.mark.asyncio
+    async def test_api_process_transcript_two_tier_routing(self, test_client, tmp_db_path, monkeypatch):
+        """With a chunk model configured, chunks are extracted with it and the
+        requested model only runs the reduce; per-tier stats land in metadata
+        and the reduced summary keeps its topic notes."""
+        import sqlite3
+
+        import main
+
+        calls = []
+        prompts = []
+        block = {"id": "a", "type": "bullet", "content": "Revisar presupuesto", "color": ""}
+        note = {"id": "n", "type": "text", "content": "Se revisó el presupuesto del trimestre", "color": ""}
+        chunk = json.dumps({
+            "MeetingName": "Presupuesto",
+            "ImmediateActionItems": {"title": "Immediate Action Items", "blocks": [block]},
+            "MeetingNotes": {"meeting_name": "Presupuesto", "sections": [{"title": "Presupuesto", "blocks": [note]}]},
+        })
+        real = main.processor
+
+        class RoutedProcessor:
+            db = real.db
+            reduce_summary = real.reduce_summary
+
+            async def process_transcript(self, text, model, model_name, chunk_size, overlap, custom_prompt,
+                                         meeting_id=None, metadata=None, chunking=None, plan=None, unfinished=None,
+                                         telemetry=None, cancel=None):
+                calls.append(("extract", model, model_name))
+                metadata["tiers"] = {"extract": {"model": f"{model}/{model_name}", "calls": 2}}
+                return 2, [chunk, chunk]
+
+        async def generate_structured(model, model_name, prompt, result_type, stats=None, cancel=None):
+            calls.append(("reduce", model, model_name))
+            prompts.append(prompt)
+            empty = {"title": "", "blocks": []}
+            # The merge repeats the action item and the note; the reduce deduplicates them
+            return result_type.model_validate({
+                "MeetingName": "",
+                "People": {"title": "People", "blocks": []},
+                "SessionSummary": {**empty, "title": "Session Summary"},
+                "CriticalDeadlines": {**empty, "title": "Critical Deadlines"},
+                "KeyItemsDecisions": {**empty, "title": "Key Items & Decisions"},
+                "ImmediateActionItems": {"title": "Immediate Action Items", "blocks": [block]},
+                "NextSteps": {**empty, "title": "Next Steps"},
+                "MeetingNotes": {"meeting_name": "Presupuesto", "sections": [{"title": "Presupuesto", "blocks": [note]}]},
+            })
+
+        monkeypatch.setattr(real.transcript_processor, "generate_structured", generate_structured)
+        monkeypatch.setattr(main, "processor", RoutedProcessor())
+        response = await test_client.post("/process-transcript", json={
+            "text": "Hay que revisar el presupuesto.", "model": "ollama", "model_name": "llama3.1:8b",
+            "chunk_model": "ollama", "chunk_model_name": "gemma3:1b", "meeting_id": "routed-meeting",
+        })
+        assert response.status_code == 200
+        assert calls == [("extract", "ollama", "gemma3:1b"), ("reduce", "ollama", "llama3.1:8b")]
+        # The chunks' topic notes reach the reduce model, without the mirrored top-level sections
+        reduce_input = json.loads(prompts[0].split("---\n")[1])
+        assert [s["title"] for s in reduce_input["MeetingNotes"]["sections"]] == ["Presupuesto", "Presupuesto"]
+
+        with sqlite3.connect(tmp_db_path) as conn:
+            status, metadata, processing_time = conn.execute(
+                "SELECT status, metadata, processing_time FROM summary_processes WHERE meeting_id = ?", ("routed-meeting",)
+            ).fetchone()
+        metadata = json.loads(metadata)
+        assert status == "completed"
+        assert processing_time > 0
+        assert metadata["routing"] == {"extract": "ollama/gemma3:1b", "reduce": "ollama/llama3.1:8b"}
+        assert set(metadata["tiers"]) == {"extract", "reduce"}
+
+        response = await test_client.get("/get-summary/routed-meeting")
+        data = response.json()["data"]
+        assert data["MeetingName"] == "Presupuesto"
+        assert [b["content"] for b in data["immediate_action_items"]["blocks"]] == ["Revisar presupuesto"]
+        assert [b["content"] for b in data["presupuesto"]["blocks"]] == ["Se revisó el presupuesto del trimestre"]
+
+    @pytest.mark.asyncio
+    async def test_api_process_transcript_deadline_returns_partial(self, test_client, tmp_db_path, monkeypatch):
+        """Chunks still running at the deadline are dropped; the job completes
+        as partial with the finished chunks plus the rule-based preview."""
+        import asyncio
+        import sqlite3
+
+        import main
+
+        transcript_processor = main.processor.transcript_processor
+        monkeypatch.setattr(transcript_processor, "clean_transcripts", False)
+        calls = []
+
+        async def chat_ollama_model(model_name, transcript, custom_prompt, lang=None, stats=None, chunk_index=None,
+                                    cancel=None):
+            calls.append(transcript)
+            if len(calls) > 1:
+                await asyncio.sleep(30)  # a provider far slower than the deadline
+            block = {"id": "a", "type": "bullet", "content": "Cerrar el presupuesto", "color": ""}
+            return json.dumps({
+                "MeetingName": "Presupuesto",
+                "People": {"title": "People", "blocks": []},
+                "SessionSummary": {"title": "Session Summary", "blocks": []},
+                "CriticalDeadlines": {"title": "Critical Deadlines", "blocks": []},
+                "KeyItemsDecisions": {"title": "Key Items & Decisions", "blocks": []},
+                "ImmediateActionItems": {"title": "Immediate Action Items", "blocks": [block]},
+                "NextSteps": {"title": "Next Steps", "blocks": []},
+                "MeetingNotes": {"meeting_name": "Presupuesto", "sections": []},
+            })
+
+        monkeypatch.setattr(transcript_processor, "chat_ollama_model", chat_ollama_model)
+        text = " ".join(f"Ana: Hay que revisar el punto {i} del presupuesto antes del viernes." for i in range(120))
+        response = await test_client.post("/process-transcript", json={
+            "text": text, "model": "ollama", "model_name": "gemma3:1b",
+            "meeting_id": "deadline-meeting", "deadline_seconds": 1.5,
+        })
+        assert response.status_code == 200
+        assert len(calls) == 2  # the second chunk was cut off, the rest never started
+
+        with sqlite3.connect(tmp_db_path) as conn:
+            metadata = json.loads(conn.execute(
+                "SELECT metadata FROM summary_processes WHERE meeting_id = ?", ("deadline-meeting",)
+            ).fetchone()[0])
+        assert metadata["deadline"]["partial"] is True
+        assert metadata["deadline"]["completed_chunks"] < metadata["deadline"]["total_chunks"]
+
+        response = await test_client.get("/get-summary/deadline-meeting")
+        body = response.json()
+        assert response.status_code == 200
+        assert body["status"] == "completed" and body["partial"] is True
+        blocks = body["data"]["immediate_action_items"]["blocks"]
+        assert blocks[0]["content"] == "Cerrar el presupuesto"
+        # Unprocessed chunks are covered by gray rule-based bullets
+        assert len(blocks) > 1 and all(block["color"] == "gray" for block in blocks[1:])
+
+    @pytest.mark.asyncio
+    async def test_api_llm_telemetry_stats(self, test_client, tmp_db_path):
+        """Recorded LLM calls are aggregated per model into latency percentiles and tokens/sec."""
+        from datetime import datetime
+
+        from db import DatabaseManager
+
+        db = DatabaseManager(db_path=tmp_db_path)
+        now = datetime.utcnow().isoformat()
+        calls = [{"provider": "ollama", "model": "gemma3:1b", "tier": "extract", "chunk_index": i,
+                  "prompt_tokens": 1000, "completion_tokens": 100, "ttft_ms": 50.0, "latency_ms": 1000.0 * (i + 1),
+                  "retries": 0, "cached_tokens": 0, "ok": True, "error": None, "created_at": now} for i in range(10)]
+        calls.append({**calls[0], "ok": False, "completion_tokens": 0, "error": "timeout"})
+        await db.record_llm_calls("telemetry-meeting", calls)
+
+        response = await test_client.get("/llm-telemetry/stats", params={"hours": 1})
+        assert response.status_code == 200
+        [stats] = response.json()["models"]
+        assert (stats["provider"], stats["model"], stats["tier"]) == ("ollama", "gemma3:1b", "extract")
+        assert (stats["calls"], stats["failures"]) == (11, 1)
+        assert stats["latency_ms"] == {"p50": 5000.0, "p95": 10000.0}
+        assert stats["tokens_per_sec"]["p50"] == 16.67  # 100 tokens in 6 s
+
+        response = await test_client.get("/llm-telemetry/calls/telemetry-meeting")
+        assert [call["chunk_index"] for call in response.json()["calls"]][:3] == [0, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_api_estimate_summary(self, test_client):
+        """The estimate needs no API key and no LLM; unknown strategies are rejected."""
+        response = await test_client.post("/estimate-summary", json={
+            "text": "Ana: hay que revisar el presupuesto. " * 1000, "model": "claude", "model_name": "claude-3-5-sonnet",
+        })
+        assert response.status_code == 200
+        estimate = response.json()
+        assert estimate["chunks"] >= 1
+        assert estimate["total_tokens"] == estimate["input_tokens"] + estimate["output_tokens"]
+        assert estimate["predicted_seconds"] > 0
+
+        response = await test_client.post("/estimate-summary", json={
+            "text": "hola", "model": "claude", "model_name": "claude-3-5-sonnet", "chunking": "semantic",
+        })
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_api_process_transcript_admission_control(self, test_client):
+        """Over the active-job limit /process-transcript answers 429 with a Retry-After."""
+        import main
+        from summary import AdmissionController
+
+        main.admission = AdmissionController(max_active_jobs=1, max_queued_bytes=1_000_000)
+        running = main.admission.admit(1000)
+        body = {"text": "Ana: hay que revisar el presupuesto.", "model": "claude",
+                "model_name": "claude-3-5-sonnet", "meeting_id": "busy-meeting"}
+
+        response = await test_client.post("/process-transcript", json=body)
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+
+        running.release()
+        response = await test_client.post("/process-transcript", json=body)
+        assert response.status_code == 200
+
+        stats = (await test_client.get("/summary-queue/stats")).json()
+        assert stats["rejected"] == {"jobs": 1, "bytes": 0}
+        assert stats["admitted"] == 2
+        # The background job ended (no API key) and gave its slot back
+        assert stats["active_jobs"] == 0
+
+    @pytest.mark.asyncio
+    async def test_api_resubmission_takes_over_its_own_slot(self, test_client):
+        """With the queue full, re-submitting a meeting supersedes its running job instead of getting a 429."""
+        import main
+        from summary import AdmissionController
+
+        main.admission = AdmissionController(max_active_jobs=1, max_queued_bytes=1_000_000)
+        running = main.summary_jobs.start("busy-meeting", main.admission.admit(1000))
+        body = {"text": "Ana: hay que revisar el presupuesto.", "model": "claude",
+                "model_name": "claude-3-5-sonnet", "meeting_id": "busy-meeting"}
+
+        response = await test_client.post("/process-transcript", json={**body, "meeting_id": "other-meeting"})
+        assert response.status_code == 429
+        assert not running.cancelled
+
+        response = await test_client.post("/process-transcript", json=body)
+        assert response.status_code == 200
+        assert running.reason == "superseded"
+        assert main.admission.active_jobs == 0
+
+    @pytest.mark.asyncio
+    async def test_api_cancel_summary_aborts_job(self, test_client, tmp_db_path, monkeypatch):
+        """/cancel-summary aborts the in-flight LLM call and the job writes nothing afterwards."""
+        import asyncio
+
+        import main
+
+        transcript_processor = main.processor.transcript_processor
+        monkeypatch.setattr(transcript_processor, "clean_transcripts", False)
+        started = asyncio.Event()
+        aborted = []
+
+        async def chat_ollama_model(model_name, transcript, custom_prompt, lang=None, stats=None, chunk_index=None,
+                                    cancel=None):
+            async def generate():
+                started.set()
+                try:
+                    await asyncio.sleep(30)
+                except asyncio.CancelledError:
+                    aborted.append(chunk_index)
+                    raise
+            return await cancel.run(generate())
+
+        monkeypatch.setattr(transcript_processor, "chat_ollama_model", chat_ollama_model)
+        job = asyncio.create_task(test_client.post("/process-transcript", json={
+            "text": "Ana: Hay que revisar el presupuesto.", "model": "ollama", "model_name": "gemma3:1b",
+            "meeting_id": "cancel-meeting",
+        }))
+        await asyncio.wait_for(started.wait(), 5)
+
+        response = await test_client.post("/cancel-summary", json={"meeting_id": "cancel-meeting"})
+        assert response.json()["cancelled"] is True
+        assert (await asyncio.wait_for(job, 5)).status_code == 200
+        assert aborted == [0]
+
+        body = (await test_client.get("/get-summary/cancel-meeting")).json()
+        assert body["status"] == "cancelled"
+        assert body["data"] is None
+
+        response = await test_client.post("/cancel-summary", json={"meeting_id": "cancel-meeting"})
+        assert response.json()["cancelled"] is False
+
+    @pytest.mark.asyncio
+    async def test_api_cancel_summary_aborts_section_regeneration(self, test_client, monkeypatch):
+        """/cancel-summary aborts a section regeneration in flight; no version is stored."""
+        import main
+        from summary import SUMMARY_FORMAT, build_summary_payload
+
+        await main.db.save_meeting("section-meeting", "Section")
+        await main.db.create_process("section-meeting")
+        meeting_name, data_json = build_summary_payload({"MeetingName": "Section", "_section_order": []})
+        await main.db.add_summary_version("section-meeting", data_json, model="test", result_format=SUMMARY_FORMAT,
+                                          meeting_name=meeting_name)
+        block = {"id": "a", "type": "bullet", "content": "Revisar el presupuesto", "color": ""}
+        await main.db.save_chunk_summaries("section-meeting", [json.dumps({
+            "MeetingName": "Section", "NextSteps": {"title": "Next Steps", "blocks": [block]}})])
+
+        started = asyncio.Event()
+        aborted = []
+
+        async def generate_structured(model, model_name, prompt, result_type, stats=None, cancel=None):
+            async def generate():
+                started.set()
+                try:
+                    await asyncio.sleep(30)
+                except asyncio.CancelledError:
+                    aborted.append(model_name)
+                    raise
+            return await cancel.run(generate())
+
+        monkeypatch.setattr(main.processor.transcript_processor, "generate_structured", generate_structured)
+        request = asyncio.create_task(test_client.post("/regenerate-summary-section", json={
+            "meeting_id": "section-meeting", "section": "NextSteps", "model": "ollama", "model_name": "gemma3:1b",
+        }))
+        await asyncio.wait_for(started.wait(), 5)
+
+        response = await test_client.post("/cancel-summary", json={"meeting_id": "section-meeting"})
+        assert response.json()["cancelled"] is True
+        assert (await asyncio.wait_for(request, 5)).status_code == 409
+        assert aborted == ["gemma3:1b"]
+        assert len(await main.db.list_summary_versions("section-meeting")) == 1
+
+    @pytest.mark.asyncio
+    async def test_api_metrics_exposition(self, test_client):
+        """/metrics renders per-route request latency, DB method latency and queue gauges."""
+        from summary import TierStats
+
+        await test_client.get("/get-summary/metrics-meeting")
+        TierStats(model="groq/llama-3.1-8b", tier="extract").record(0.5, 1200, 300, ttft_s=0.1, retries=1)
+
+        response = await test_client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        lines = response.text.splitlines()
+
+        # Path parameters are folded into the route template
+        assert any(line.startswith('maity_http_request_duration_seconds_count{method="GET",'
+                                   'route="/get-summary/{meeting_id}",status="404"}') for line in lines)
+        assert any(line.startswith('maity_db_query_duration_seconds_count{method="get_summary_result"}')
+                   for line in lines)
+        assert "# TYPE maity_summary_jobs_active gauge" in lines
+        assert "maity_summary_jobs_active 0" in lines
+        assert any(line.startswith('maity_llm_tokens_total{provider="groq",model="llama-3.1-8b",tier="extract",'
+                                   'direction="completion"}') for line in lines)
+        bucket = next(line for line in lines if line.startswith('maity_llm_call_duration_seconds_bucket{provider="groq"')
+                      and 'le="0.5"' in line)
+        assert int(bucket.rsplit(" ", 1)[1]) >= 1
+
+    @pytest.mark.asyncio
+    async def test_api_server_timing_and_profile(self, test_client):
+        """Responses carry Server-Timing spans; X-Maity-Profile attaches a sampling profile."""
+        save = await test_client.post("/save-transcript", json={
+            "meeting_title": "Traced Meeting",
+            "transcripts": [{"id": "t-1", "text": "Hola.", "timestamp": "2025-01-01T12:00:00"}],
+        })
+        meeting_id = save.json()["meeting_id"]
+
+        response = await test_client.get(f"/get-meeting/{meeting_id}", headers={"X-Maity-Profile": "1"})
+        assert response.status_code == 200
+        timing = {entry.split(";")[0]: entry for entry in response.headers["server-timing"].split(", ")}
+        assert {"db.get_meeting", "endpoint", "serialize", "total"} <= set(timing)
+        assert all(";dur=" in entry for entry in timing.values())
+        assert "desc" not in timing["endpoint"]  # one endpoint call, not one per router layer
+
+        report = await test_client.get(f"/debug/profiles/{response.headers['x-maity-profile-id']}")
+        assert report.status_code == 200
+        assert report.text.startswith(f"GET /get-meeting/{meeting_id}\n")
+        assert "samples over" in report.text
+
+        assert (await test_client.get("/debug/profiles/missing")).status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_api_logs_json_through_queue(self, test_client, monkeypatch):
+        """Requests log through the queue listener as JSON lines, with per-module levels from env."""
+        import io
+        import logging
+
+        import log_config
+
+        monkeypatch.setenv("MAITY_LOG_LEVELS", "routes.summaries=DEBUG,db=WARNING")
+        stream = io.StringIO()
+        log_config.configure_logging(stream)
+        try:
+            assert logging.getLogger("db").level == logging.WARNING
+            assert (await test_client.get("/get-summary/missing")).status_code == 404
+            logging.getLogger("routes.summaries").debug("polled %s", "m-1")
+            logging.getLogger("db.meetings").info("hidden")
+        finally:
+            log_config.shutdown_logging()
+            logging.getLogger("routes.summaries").setLevel(logging.NOTSET)
+            logging.getLogger("db").setLevel(logging.NOTSET)
+
+        entries = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert {"ts", "level", "logger", "msg", "src", "func"} <= set(entries[-1])
+        assert entries[-1]["msg"] == "polled m-1"
+        assert entries[-1]["level"] == "DEBUG"
+        assert all(entry["msg"] != "hidden" for entry in entries)
+
+    @pytest.mark.asyncio
+    async def test_api_large_meeting_is_compressed(self, test_client):
+        """Large responses are brotli/gzip-encoded when accepted; small ones are sent as is."""
+        segments = [{"id": f"t-{i}", "text": f"Segmento {i} de una reunión bastante larga.",
+                     "timestamp": "2025-01-01T12:00:00", "audio_start_time": float(i),
+                     "audio_end_time": i + 0.9, "duration": 0.9} for i in range(500)]
+        save = await test_client.post("/save-transcript", json={
+            "meeting_title": "Long Meeting", "transcripts": segments})
+        meeting_id = save.json()["meeting_id"]
+
+        response = await test_client.get(f"/get-meeting/{meeting_id}", headers={"Accept-Encoding": "br, gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] in ("br", "gzip")
+        assert int(response.headers["content-length"]) < len(response.content) / 4
+        assert response.headers["vary"] == "Accept-Encoding"
+        meeting = response.json()
+        assert set(meeting) == {"id", "title", "created_at", "updated_at", "transcripts"}
+        assert len(meeting["transcripts"]) == 500
+        assert meeting["transcripts"][499]["audio_start_time"] == 499.0
+
+        identity = await test_client.get(f"/get-meeting/{meeting_id}", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in identity.headers
+        assert identity.json() == meeting
+
+        small = await test_client.get("/get-meetings", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in small.headers
+
+    @pytest.mark.asyncio
+    async def test_api_stream_meeting_transcripts(self, test_client):
+        """/get-meeting-transcripts streams segments as NDJSON or as the /get-meeting document."""
+        segments = [{"id": f"t-{i}", "text": f"Segmento {i}", "timestamp": "2025-01-01T12:00:00",
+                     "audio_start_time": i * 2.0, "audio_end_time": i * 2.0 + 2.0, "duration": 2.0}
+                    for i in reversed(range(1200))]
+        save = await test_client.post("/save-transcript", json={
+            "meeting_title": "Streamed Meeting", "transcripts": segments})
+        meeting_id = save.json()["meeting_id"]
+
+        response = await test_client.get(f"/get-meeting-transcripts/{meeting_id}")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["audio_start_time"] for line in lines] == [i * 2.0 for i in range(1200)]
+
+        window = await test_client.get(f"/get-meeting-transcripts/{meeting_id}", params={"start": 101, "end": 110})
+        assert [json.loads(line)["text"] for line in window.text.splitlines()] == \
+            [f"Segmento {i}" for i in range(50, 55)]
+
+        document = await test_client.get(f"/get-meeting-transcripts/{meeting_id}",
+                                         params={"format": "json", "end": 4})
+        assert document.json()["title"] == "Streamed Meeting"
+        assert [s["text"] for s in document.json()["transcripts"]] == ["Segmento 0", "Segmento 1"]
+
+        assert (await test_client.get(f"/get-meeting-transcripts/{meeting_id}",
+                                      params={"start": 5, "end": 5})).status_code == 400
+        assert (await test_client.get("/get-meeting-transcripts/missing")).status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_api_changes_since_watermark(self, test_client):
+        """/changes returns only what changed after the given sequence number, one entry per entity."""
+        empty = (await test_client.get("/changes")).json()
+        assert empty["changes"] == [] and empty["reset"] is False
+
+        save = await test_client.post("/save-transcript", json={
+            "meeting_title": "Synced Meeting",
+            "transcripts": [{"id": f"t-{i}", "text": f"Segmento {i}", "timestamp": "2025-01-01T12:00:00"}
+                            for i in range(3)],
+        })
+        meeting_id = save.json()["meeting_id"]
+
+        first = (await test_client.get("/changes", params={"since": empty["next"]})).json()
+        assert [(c["entity"], c["op"]) for c in first["changes"]] == \
+            [("meeting", "created")] + [("transcript", "created")] * 3
+        assert first["changes"][0]["data"]["title"] == "Synced Meeting"
+        assert [c["data"]["text"] for c in first["changes"][1:]] == ["Segmento 0", "Segmento 1", "Segmento 2"]
+
+        await test_client.post("/save-meeting-title", json={"meeting_id": meeting_id, "title": "Renamed"})
+        await test_client.post("/save-meeting-title", json={"meeting_id": meeting_id, "title": "Renamed again"})
+        second = (await test_client.get("/changes", params={"since": first["next"]})).json()
+        assert [(c["entity"], c["id"], c["op"]) for c in second["changes"]] == [("meeting", meeting_id, "updated")]
+        assert second["changes"][0]["data"]["title"] == "Renamed again"
+
+        await test_client.post("/delete-meeting", json={"meeting_id": meeting_id})
+        third = (await test_client.get("/changes", params={"since": second["next"]})).json()
+        assert [(c["entity"], c["op"]) for c in third["changes"]] == [("meeting", "deleted")]
+        assert "data" not in third["changes"][0]
+
+        page = (await test_client.get("/changes", params={"since": empty["next"], "limit": 2})).json()
+        assert page["has_more"] is True and page["next"] == empty["next"] + 2
+
+        caught_up = (await test_client.get("/changes", params={"since": third["next"]})).json()
+        assert caught_up["changes"] == [] and caught_up["has_more"] is False
+        assert (await test_client.get("/changes", params={"since": third["next"] + 100})).json()["reset"] is True
@@ -1,5 +1,7 @@
 """Tests for the DatabaseManager CRUD operations."""
 
+import json
+
 import pytest
 from datetime import datetime
 
@@ -101,3 +103,263 @@ class TestDatabaseOperations:
 
         retrieved_key = await db.get_api_key(provider)
         assert retrieved_key == api_key
+
+    @pytest.mark.asyncio
+    async def test_db_append_segments_skips_retried_seqs(self, db):
+        """Appending a batch twice should only store each sequence number once."""
+        from ingest import Segment
+
+        meeting_id = "test-meeting-004"
+        await db.save_meeting(meeting_id, "Live Recording")
+        timestamp = datetime.utcnow().isoformat()
+        batch = [Segment(meeting_id, seq, f"segment {seq}", timestamp) for seq in range(3)]
+
+        assert await db.append_meeting_segments(batch) == [True, True, True]
+        retry = batch[1:] + [Segment(meeting_id, 3, "segment 3", timestamp)]
+        assert await db.append_meeting_segments(retry) == [False, False, True]
+
+        meeting = await db.get_meeting(meeting_id)
+        assert [t["text"] for t in meeting["transcripts"]] == [f"segment {i}" for i in range(4)]
+        assert await db.get_last_ingested_seq(meeting_id) == 3
+
+    @pytest.mark.asyncio
+    async def test_db_large_text_columns_are_compressed(self, tmp_db_path, monkeypatch):
+        """With MAITY_DB_COMPRESSION set, large transcripts are stored
+        compressed but read back (and searched) as plain text, while summary
+        results stay TEXT for the desktop app."""
+        import sqlite3
+        from db import DatabaseManager
+
+        monkeypatch.setenv("MAITY_DB_COMPRESSION", "zlib")
+        db = DatabaseManager(db_path=tmp_db_path)
+        meeting_id = "test-meeting-005"
+        transcript_text = "hay que enviar el reporte el viernes " * 200
+        summary = {"MeetingName": "Compressed", "blocks": ["x" * 2000]}
+
+        await db.save_meeting(meeting_id, "Compression")
+        await db.create_process(meeting_id)
+        await db.save_transcript(meeting_id, transcript_text, "ollama", "gemma", 5000, 1000)
+        await db.update_process(meeting_id, status="completed", result=summary)
+
+        with sqlite3.connect(db.db_path) as conn:
+            stored_text, stored_result = conn.execute("""
+                SELECT typeof(t.transcript_text), typeof(p.result)
+                FROM transcript_chunks t JOIN summary_processes p ON p.meeting_id = t.meeting_id
+            """).fetchone()
+        assert (stored_text, stored_result) == ("blob", "text")
+
+        data = await db.get_transcript_data(meeting_id)
+        assert data["transcript_text"] == transcript_text
+        assert data["result"] is not None
+
+        results = await db.search_transcripts("reporte el viernes")
+        assert [r["id"] for r in results] == [meeting_id]
+
+    @pytest.mark.asyncio
+    async def test_db_compression_is_an_explicit_reversible_step(self, tmp_db_path, monkeypatch):
+        """Opening the database never rewrites existing rows; recode_columns
+        compresses them on request, rolls them back to TEXT, and always
+        restores summary results compressed by earlier versions."""
+        import sqlite3
+        import zlib
+        from db import DatabaseManager
+        from db.compression import MAGIC, TextCodec, recode_columns
+
+        meeting_id = "test-meeting-006"
+        transcript_text = "legacy transcript row " * 200
+        result = '{"MeetingName": "Legacy"}' + " " * 2000
+        DatabaseManager(db_path=tmp_db_path)  # create the schema
+        with sqlite3.connect(tmp_db_path) as conn:
+            conn.execute("INSERT INTO meetings (id, title, created_at, updated_at) VALUES (?, 'Legacy', '2025-01-01', '2025-01-01')",
+                         (meeting_id,))
+            conn.execute("""
+                INSERT INTO transcript_chunks (meeting_id, transcript_text, model, model_name, created_at)
+                VALUES (?, ?, 'ollama', 'gemma', '2025-01-01')
+            """, (meeting_id, transcript_text))
+            conn.execute("""
+                INSERT INTO summary_processes (meeting_id, status, created_at, updated_at, result)
+                VALUES (?, 'completed', '2025-01-01', '2025-01-01', ?)
+            """, (meeting_id, MAGIC + b"z" + zlib.compress(result.encode())))
+            conn.commit()
+
+        def stored_types():
+            with sqlite3.connect(tmp_db_path) as conn:
+                return conn.execute("""
+                    SELECT typeof(t.transcript_text), typeof(p.result)
+                    FROM transcript_chunks t JOIN summary_processes p ON p.meeting_id = t.meeting_id
+                """).fetchone()
+
+        monkeypatch.setenv("MAITY_DB_COMPRESSION", "zlib")
+        DatabaseManager(db_path=tmp_db_path)
+        assert stored_types() == ("text", "blob")
+
+        changed = recode_columns(tmp_db_path, TextCodec("zlib"))
+        assert changed["transcript_chunks.transcript_text"] == 1
+        assert changed["summary_processes.result"] == 1
+        assert stored_types() == ("blob", "text")
+        assert recode_columns(tmp_db_path, TextCodec("zlib"))["transcript_chunks.transcript_text"] == 0
+
+        recode_columns(tmp_db_path, TextCodec("none"))
+        assert stored_types() == ("text", "text")
+        with sqlite3.connect(tmp_db_path) as conn:
+            assert conn.execute("SELECT transcript_text FROM transcript_chunks").fetchone()[0] == transcript_text
+            assert conn.execute("SELECT result FROM summary_processes").fetchone()[0] == result
+
+    @pytest.mark.asyncio
+    async def test_db_summary_versions_history_and_conflicts(self, db):
+        """Each summary save adds a version; older versions are kept as
+        diffs and can be reconstructed exactly."""
+        from db import VersionConflictError
+
+        meeting_id = "test-meeting-007"
+        await db.save_meeting(meeting_id, "Versioned")
+        await db.create_process(meeting_id)
+
+        payloads = [
+            {"MeetingName": "v1", "_section_order": ["notes"], "notes": {"title": "Notes", "blocks": ["a", "b"]}},
+            {"MeetingName": "v2", "_section_order": ["notes"], "notes": {"title": "Notes", "blocks": ["a", "b", "c"]}},
+            {"MeetingName": "v2", "_section_order": ["notes", "todo"], "notes": {"title": "Notes", "blocks": ["a"]},
+             "todo": {"title": "Todo", "blocks": ["x"]}},
+        ]
+        for expected, payload in enumerate(payloads):
+            version = await db.add_summary_version(meeting_id, json.dumps(payload), model="ollama/gemma",
+                                                   expected_version=expected)
+            assert version == expected + 1
+
+        latest = await db.get_latest_summary_version(meeting_id)
+        assert latest["version"] == 3
+        assert json.loads(latest["payload"]) == payloads[2]
+
+        for version, payload in enumerate(payloads, start=1):
+            assert (await db.get_summary_version(meeting_id, version))["payload"] == payload
+
+        history = await db.list_summary_versions(meeting_id)
+        assert [v["version"] for v in history] == [3, 2, 1]
+        assert [v["is_latest"] for v in history] == [True, False, False]
+
+        with pytest.raises(VersionConflictError):
+            await db.update_meeting_summary(meeting_id, payloads[0], expected_version=1)
+        assert (await db.get_latest_summary_version(meeting_id))["version"] == 3
+
+    @pytest.mark.asyncio
+    async def test_db_chunk_summaries_replaced_per_meeting(self, db):
+        """Cached chunk results are replaced as a whole and dropped with the meeting."""
+        meeting_id = "test-meeting-008"
+        await db.save_meeting(meeting_id, "Chunked")
+
+        await db.save_chunk_summaries(meeting_id, ['{"a": 1}', '{"b": 2}', '{"c": 3}'])
+        await db.save_chunk_summaries(meeting_id, ['{"x": "' + "y" * 4000 + '"}', '{"z": 0}'])
+
+        chunks = await db.get_chunk_summaries(meeting_id)
+        assert [json.loads(chunk) for chunk in chunks] == [{"x": "y" * 4000}, {"z": 0}]
+
+        await db.delete_meeting(meeting_id)
+        assert await db.get_chunk_summaries(meeting_id) == []
+
+    @pytest.mark.asyncio
+    async def test_db_llm_call_latency_fits_a_fixed_cost(self, db):
+        """Call history separates the fixed cost of a call from its per-prompt-token cost."""
+        from summary import LatencyProfile
+
+        now = datetime.utcnow().isoformat()
+        call = {"provider": "claude", "model": "sonnet", "tier": "extract", "chunk_index": 0, "completion_tokens": 300,
+                "ttft_ms": None, "retries": 0, "cached_tokens": 0, "ok": True, "error": None, "created_at": now}
+        # 2 s per call plus 2 ms per prompt token; failed calls and other tiers are ignored
+        await db.record_llm_calls("latency-meeting", [
+            {**call, "prompt_tokens": tokens, "latency_ms": 2000 + 2 * tokens} for tokens in (500, 1000, 2000)
+        ] + [{**call, "prompt_tokens": 500, "latency_ms": 60_000, "ok": False},
+             {**call, "prompt_tokens": 500, "latency_ms": 60_000, "tier": "reduce"}])
+
+        profile = LatencyProfile.from_history("claude", await db.get_llm_call_latency("claude", "sonnet", "extract"))
+        assert profile.calls == 3
+        assert profile.call_ms == pytest.approx(2000)
+        assert profile.ms_per_prompt_token == pytest.approx(2)
+
+        # With a time to first token the split is read off directly
+        await db.record_llm_calls("latency-meeting", [
+            {**call, "tier": "reduce", "prompt_tokens": 1000, "ttft_ms": 400.0, "latency_ms": 5400.0}])
+        profile = LatencyProfile.from_history("claude", await db.get_llm_call_latency("claude", "sonnet", "reduce"))
+        assert profile.call_ms == pytest.approx(5000)
+        assert profile.ms_per_prompt_token == pytest.approx(0.4)
+
+    @pytest.mark.asyncio
+    async def test_db_iter_meeting_segments_in_audio_order(self, db):
+        """Segments come back in audio order, in batches, and a window keeps the segments overlapping it."""
+        meeting_id = "test-meeting-009"
+        await db.save_meeting(meeting_id, "Long Recording")
+        # Inserted out of order; each segment lasts 2.5 s
+        for start in (9.0, 0.0, 6.0, 3.0, 12.0):
+            await db.save_meeting_transcript(meeting_id, f"at {start:g}", "2025-01-01T12:00:00", "", "", "",
+                                             audio_start_time=start, audio_end_time=start + 2.5, duration=2.5)
+
+        batches = [batch async for batch in db.iter_meeting_segments(meeting_id, batch_size=2)]
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert [s["text"] for batch in batches for s in batch] == ["at 0", "at 3", "at 6", "at 9", "at 12"]
+
+        # 4..10 s: the segment playing at 4 s (3-5.5) is included, the one starting at 10 s is not
+        window = [s["audio_start_time"] async for batch in db.iter_meeting_segments(meeting_id, 4.0, 10.0)
+                  for s in batch]
+        assert window == [3.0, 6.0, 9.0]
+        assert [batch async for batch in db.iter_meeting_segments(meeting_id, 20.0)] == []
+
+        # A segment longer than any fixed lookback still overlaps a window opening late in it
+        await db.save_meeting_transcript(meeting_id, "long", "2025-01-01T12:00:00", "", "", "",
+                                         audio_start_time=15.0, audio_end_time=215.0, duration=200.0)
+        window = [s["text"] async for batch in db.iter_meeting_segments(meeting_id, 200.0, 210.0) for s in batch]
+        assert window == ["long"]
+
+    @pytest.mark.asyncio
+    async def test_db_read_cache_invalidated_by_writes(self, db, tmp_db_path):
+        """Meeting, list and summary reads are cached per database file until a write touches them."""
+        from db import DatabaseManager
+        from db.cache import CACHE_REQUESTS
+
+        meeting_id = "test-meeting-010"
+        other = DatabaseManager(db_path=tmp_db_path)  # e.g. the summary processor's manager
+        await db.save_meeting(meeting_id, "Cached")
+        await db.create_process(meeting_id)
+
+        hits = CACHE_REQUESTS.value(cache="meeting", result="hit")
+        assert (await db.get_meeting(meeting_id))["title"] == "Cached"
+        first = await db.get_meeting(meeting_id)
+        first["title"] = "mutated by a caller"
+        assert (await other.get_meeting(meeting_id))["title"] == "Cached"
+        assert CACHE_REQUESTS.value(cache="meeting", result="hit") == hits + 2
+
+        await other.update_meeting_title(meeting_id, "Renamed")
+        assert (await db.get_meeting(meeting_id))["title"] == "Renamed"
+        assert [m["title"] for m in await db.get_all_meetings()] == ["Renamed"]
+
+        await db.save_meeting_transcript(meeting_id, "Hola", "2025-01-01T12:00:00", "", "", "")
+        assert len((await db.get_meeting(meeting_id))["transcripts"]) == 1
+
+        assert (await db.get_summary_result(meeting_id))["status"] == "PENDING"
+        await other.update_process(meeting_id, status="completed", result={"MeetingName": "Renamed"})
+        assert (await db.get_summary_result(meeting_id))["status"] == "completed"
+
+        await other.delete_meeting(meeting_id)
+        assert await db.get_meeting(meeting_id) is None
+        assert await db.get_all_meetings() == []
+        assert await db.get_summary_result(meeting_id) is None
+        assert len(db.read_cache) == 1  # just the (empty) meeting list
+
+    @pytest.mark.asyncio
+    async def test_db_change_log_resets_clients_of_older_databases(self, tmp_db_path):
+        """Meetings stored before the change log existed make clients reload once."""
+        import sqlite3
+
+        from db import DatabaseManager
+
+        with sqlite3.connect(tmp_db_path) as conn:
+            conn.execute("CREATE TABLE meetings (id TEXT PRIMARY KEY, title TEXT NOT NULL, "
+                         "created_at TEXT NOT NULL, updated_at TEXT NOT NULL)")
+            conn.execute("INSERT INTO meetings VALUES ('legacy', 'Legacy', '2024-01-01', '2024-01-01')")
+
+        db = DatabaseManager(db_path=tmp_db_path)
+        changes = await db.get_changes(0)
+        assert changes["reset"] is True and changes["changes"] == []
+
+        await db.update_meeting_title("legacy", "Legacy renamed")
+        after = await db.get_changes(changes["next"])
+        assert after["reset"] is False
+        assert [(c["id"], c["op"]) for c in after["changes"]] == [("legacy", "updated")]
@@ -0,0 +1,142 @@
+"""Tests for live segment ingest (batcher, journal and crash recovery)."""
+
+import asyncio
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from ingest import IngestBatcher, IngestGapError, Segment, SegmentJournal
+
+
+class TestSegmentJournal:
+
+    @pytest.mark.asyncio
+    async def test_journal_replay_after_crash(self, db, tmp_path):
+        """Segments acknowledged from the journal but never compacted are
+        recovered into the transcripts table on the next start."""
+        meeting_id = "journal-meeting-001"
+        await db.save_meeting(meeting_id, "Crash Test")
+        timestamp = datetime.utcnow().isoformat()
+
+        journal = SegmentJournal(str(tmp_path / "journal"))
+        journal.append([Segment(meeting_id, seq, f"segment {seq}", timestamp) for seq in range(3)])
+        journal.close()
+
+        # Simulate a torn write from a crash in the middle of a record
+        with open(journal._path(meeting_id), "a", encoding="utf-8") as handle:
+            handle.write('{"meeting_id": "journal-meet')
+
+        batcher = IngestBatcher(db, journal=SegmentJournal(str(tmp_path / "journal")))
+        assert await batcher.recover() == 3
+
+        meeting = await db.get_meeting(meeting_id)
+        assert [t["text"] for t in meeting["transcripts"]] == ["segment 0", "segment 1", "segment 2"]
+        assert list((tmp_path / "journal").iterdir()) == []
+        assert await batcher.last_acked_seq(meeting_id) == 2
+
+    @pytest.mark.asyncio
+    async def test_journal_names_do_not_collide(self, db, tmp_path):
+        """Ids that only differ in characters unsafe for file names keep
+        separate journals; files from the old naming are replayed and removed."""
+        timestamp = datetime.utcnow().isoformat()
+        for meeting_id in ("a/b", "a_b", "A_B"):
+            await db.save_meeting(meeting_id, f"Meeting {meeting_id}")
+        legacy = tmp_path / "journal" / "legacy_id.jsonl"
+        await db.save_meeting("legacy:id", "Legacy")
+
+        journal = SegmentJournal(str(tmp_path / "journal"))
+        journal.append([Segment("a/b", 0, "slash", timestamp), Segment("a_b", 0, "underscore", timestamp),
+                        Segment("A_B", 0, "upper", timestamp)])
+        journal.checkpoint({"a/b": 0})
+        journal.close()
+        legacy.write_text('{"meeting_id": "legacy:id", "seq": 0, "text": "old", "timestamp": "%s"}\n' % timestamp)
+
+        batcher = IngestBatcher(db, journal=SegmentJournal(str(tmp_path / "journal")))
+        assert await batcher.recover() == 3
+        for meeting_id, text in (("a/b", None), ("a_b", "underscore"), ("A_B", "upper"), ("legacy:id", "old")):
+            meeting = await db.get_meeting(meeting_id)
+            assert [t["text"] for t in meeting["transcripts"]] == ([text] if text else [])
+        assert list((tmp_path / "journal").iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_batcher_discard_drops_journaled_segments(self, db, tmp_path, monkeypatch):
+        """Segments journaled for a meeting that is then deleted are never
+        compacted back into the transcripts table."""
+        meeting_id = "journal-meeting-004"
+        await db.save_meeting(meeting_id, "Deleted While Live")
+        timestamp = datetime.utcnow().isoformat()
+
+        batcher = IngestBatcher(db, journal=SegmentJournal(str(tmp_path / "journal")))
+        gate = asyncio.Event()
+        compact_once = batcher._compact_once
+
+        async def gated_compact_once():
+            await gate.wait()
+            return await compact_once()
+
+        monkeypatch.setattr(batcher, "_compact_once", gated_compact_once)
+        futures = [await batcher.submit(Segment(meeting_id, seq, f"s{seq}", timestamp)) for seq in range(3)]
+        assert all([await f for f in futures])
+        assert batcher.queue_depth() == 0
+
+        await batcher.discard(meeting_id)
+        await db.delete_meeting(meeting_id)
+        assert list((tmp_path / "journal").iterdir()) == []
+
+        gate.set()
+        await batcher.close()
+        with sqlite3.connect(db.db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM transcripts WHERE meeting_id = ?", (meeting_id,)).fetchone()[0] == 0
+
+    @pytest.mark.asyncio
+    async def test_batcher_compacts_journal_on_close(self, db, tmp_path):
+        """Closing the batcher compacts every journaled segment and removes the journal."""
+        meeting_id = "journal-meeting-002"
+        await db.save_meeting(meeting_id, "Compaction")
+        timestamp = datetime.utcnow().isoformat()
+
+        notified = []
+        batcher = IngestBatcher(db, journal=SegmentJournal(str(tmp_path / "journal")),
+                                compact_interval_ms=10_000, on_commit=notified.append)
+        futures = [await batcher.submit(Segment(meeting_id, seq, f"s{seq}", timestamp)) for seq in range(10)]
+        duplicate = await batcher.submit(Segment(meeting_id, 4, "s4", timestamp))
+        await batcher.close()
+
+        assert all(f.result() for f in futures)
+        assert duplicate.result() is False
+        meeting = await db.get_meeting(meeting_id)
+        assert len(meeting["transcripts"]) == 10
+        assert list((tmp_path / "journal").iterdir()) == []
+        assert meeting_id in notified
+
+    @pytest.mark.asyncio
+    async def test_batcher_refuses_segments_after_failed_batch(self, db, tmp_path, monkeypatch):
+        """Segments queued behind a failed batch are refused instead of moving
+        the meeting past the failed seqs, so the client's resend is stored."""
+        meeting_id = "journal-meeting-003"
+        await db.save_meeting(meeting_id, "Failed Batch")
+        timestamp = datetime.utcnow().isoformat()
+
+        journal = SegmentJournal(str(tmp_path / "journal"))
+        batcher = IngestBatcher(db, journal=journal, max_batch=1)
+        append = journal.append
+
+        def failing_append(segments):
+            monkeypatch.setattr(journal, "append", append)
+            raise OSError("disk full")
+
+        monkeypatch.setattr(journal, "append", failing_append)
+        failed = await batcher.submit(Segment(meeting_id, 0, "s0", timestamp))
+        later = await batcher.submit(Segment(meeting_id, 1, "s1", timestamp))
+        with pytest.raises(OSError):
+            await failed
+        with pytest.raises(IngestGapError):
+            await later
+        assert await batcher.last_acked_seq(meeting_id) == -1
+
+        resent = [await batcher.submit(Segment(meeting_id, seq, f"s{seq}", timestamp)) for seq in range(2)]
+        await batcher.close()
+        assert [f.result() for f in resent] == [True, True]
+        meeting = await db.get_meeting(meeting_id)
+        assert [t["text"] for t in meeting["transcripts"]] == ["s0", "s1"]
@@ -0,0 +1,51 @@
+"""Tests for prompt localization and language detection."""
+
+from prompts import LanguageDetector, build_prompt, detect_lang
+
+SAMPLES = {
+    "es": "Hola a todos, gracias por venir. Necesito que revisen el documento antes del lunes porque el cliente lo quiere ver.",
+    "en": "Hi everyone, thanks for joining. I need you to review the document before Monday because the client wants to see it.",
+    "pt": "Oi pessoal, obrigado por virem. Preciso que vocês revisem o documento antes de segunda porque o cliente quer ver.",
+    "fr": "Bonjour à tous, merci d'être venus. J'ai besoin que vous relisiez le document avant lundi parce que le client veut le voir.",
+    "de": "Hallo zusammen, danke fürs Kommen. Ich brauche, dass ihr das Dokument vor Montag prüft, weil der Kunde es sehen will.",
+}
+
+
+class TestLanguageDetector:
+
+    def test_detects_each_supported_language(self):
+        detector = LanguageDetector()
+        for lang, text in SAMPLES.items():
+            assert detector.detect(text) == lang
+
+    def test_short_or_empty_text_falls_back_to_default(self):
+        assert detect_lang("") == "es"
+        assert detect_lang("ok", default="en") == "en"
+
+    def test_only_a_bounded_prefix_is_sampled(self):
+        """Whatever follows the sampled prefix does not change the result."""
+        detector = LanguageDetector(sample_chars=500)
+        text = SAMPLES["es"] * 4 + " " + SAMPLES["en"] * 1000
+        assert detector.detect(text) == "es"
+
+    def test_meeting_language_is_cached(self):
+        detector = LanguageDetector()
+        assert detector.detect_for("m-1", SAMPLES["en"]) == "en"
+        # Cached: a later call for the same meeting does not re-detect
+        assert detector.detect_for("m-1", SAMPLES["es"]) == "en"
+        detector.forget("m-1")
+        assert detector.detect_for("m-1", SAMPLES["es"]) == "es"
+
+    def test_detect_chunks_follows_language_switches(self):
+        detector = LanguageDetector()
+        chunks = [SAMPLES["es"], SAMPLES["en"], "ok, sí", SAMPLES["es"]]
+        # Ambiguous chunks inherit the meeting language
+        assert detector.detect_chunks(chunks, meeting_id="m-2") == ["es", "en", "es", "es"]
+
+
+class TestBuildPrompt:
+
+    def test_languages_without_template_use_spanish(self):
+        prompt = build_prompt("pt", "texto", "contexto extra")
+        assert prompt == build_prompt("es", "texto", "contexto extra")
+        assert "Contexto adicional" in prompt
@@ -0,0 +1,523 @@
+"""Tests for the summarization pipeline helpers (merge, live windows)."""
+
+import asyncio
+import json
+import random
+import time
+
+import pytest
+
+from summary import AdmissionController, JobCancelled, JobRegistry, ProviderLimiter, AdmissionRejected, LatencyProfile, estimate_summary, split_transcript, LiveSummarizer, ModelTier, TierStats, plan_for_deadline, resolve_routing, build_preview, clean_transcript, collapse_loops, fixed_chunks, topic_chunks, build_summary_payload, merge_chunk_summaries, patch_section, section_context, section_titles
+
+
+def _chunk_summary(name: str, action: str) -> str:
+    block = {"id": action, "type": "bullet", "content": action, "color": ""}
+    return json.dumps({
+        "MeetingName": name,
+        "People": {"title": "People", "blocks": []},
+        "SessionSummary": {"title": "Session Summary", "blocks": []},
+        "CriticalDeadlines": {"title": "Critical Deadlines", "blocks": []},
+        "KeyItemsDecisions": {"title": "Key Items & Decisions", "blocks": []},
+        "ImmediateActionItems": {"title": "Immediate Action Items", "blocks": [block]},
+        "NextSteps": {"title": "Next Steps", "blocks": []},
+        "MeetingNotes": {"meeting_name": name, "sections": []},
+    })
+
+
+class FakeProcessor:
+    """Stands in for SummaryProcessor: one chunk summary per call, no LLM."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def process_transcript(self, text, model, model_name, chunk_size, overlap, custom_prompt, meeting_id=None,
+                                 telemetry=None, cancel=None):
+        self.calls.append(text)
+        telemetry.append({"provider": model, "model": model_name, "tier": "extract", "chunk_index": 0,
+                          "latency_ms": 10.0, "ok": True, "created_at": "2025-01-01T00:00:00"})
+        return 1, [_chunk_summary("Live", f"item-{len(self.calls)}")]
+
+
+class TestSummaryMerge:
+
+    def test_merge_chunk_summaries_concatenates_blocks(self):
+        """Blocks from every chunk end up in the merged section, in order."""
+        merged = merge_chunk_summaries([_chunk_summary("A", "one"), _chunk_summary("B", "two")])
+
+        assert merged["MeetingName"] == "B"
+        contents = [b["content"] for b in merged["ImmediateActionItems"]["blocks"]]
+        assert contents == ["one", "two"]
+
+
+class TestSectionRegeneration:
+
+    def test_section_context_keeps_only_the_target_section(self):
+        """The regeneration prompt carries the target section of every chunk, not the whole summary."""
+        context = section_context([_chunk_summary("A", "one"), _chunk_summary("B", "two")], "ImmediateActionItems")
+
+        lines = context.splitlines()
+        assert len(lines) == 2
+        assert '"one"' in lines[0] and '"two"' in lines[1]
+        assert "MeetingNotes" not in context and "NextSteps" not in context
+
+    def test_patch_section_replaces_only_that_section(self):
+        """Other sections and the section order are untouched."""
+        chunks = [_chunk_summary("A", "one"), _chunk_summary("B", "two")]
+        _, data_json = build_summary_payload(merge_chunk_summaries(chunks))
+        payload = json.loads(data_json)
+        new_section = {"title": "Immediate Action Items",
+                       "blocks": [{"id": "x", "type": "bullet", "content": "merged", "color": ""}]}
+
+        patched = patch_section(payload, "ImmediateActionItems", new_section,
+                                section_titles(chunks, "ImmediateActionItems"))
+
+        assert patched["immediate_action_items"] == new_section
+        assert patched["_section_order"] == payload["_section_order"]
+        assert payload["immediate_action_items"]["blocks"][0]["content"] == "one"
+
+    def test_patch_section_appends_missing_section(self):
+        payload = {"MeetingName": "A", "_section_order": []}
+        patched = patch_section(payload, "NextSteps", {"title": "Next Steps", "blocks": []})
+
+        assert patched["_section_order"] == ["next_steps"]
+
+
+class TestLiveSummarizer:
+
+    @pytest.mark.asyncio
+    async def test_live_windows_and_finalize(self, db):
+        """Completed windows are summarized as segments arrive; finalize only
+        summarizes the tail and reduces all windows."""
+        meeting_id = "live-meeting-001"
+        await db.save_meeting(meeting_id, "Live Meeting")
+
+        processor = FakeProcessor()
+        summarizer = LiveSummarizer(db, processor, poll_interval=0.01)
+        # window_tokens=5 -> 20 characters per window
+        await summarizer.start(meeting_id, "ollama", "gemma", window_tokens=5)
+
+        for text in ["first segment here", "second segment here", "tail"]:
+            await db.save_meeting_transcript(meeting_id, text, "2025-01-01T00:00:00")
+        summarizer.notify(meeting_id)
+
+        session = summarizer.get_session(meeting_id)
+        for _ in range(200):
+            if session.next_index >= 1 and session.pending_chars < session.window_chars:
+                break
+            await asyncio.sleep(0.01)
+
+        windows_before = await db.get_summary_windows(meeting_id)
+        assert len(windows_before) >= 1
+
+        final = await summarizer.finalize(meeting_id)
+        windows = await db.get_summary_windows(meeting_id)
+
+        assert sum(len(w["result"]) for w in windows) == len(processor.calls)
+        assert "tail" in processor.calls[-1]
+        assert len(final["ImmediateActionItems"]["blocks"]) == len(processor.calls)
+        assert summarizer.get_session(meeting_id) is None
+
+
+    @pytest.mark.asyncio
+    async def test_failing_window_backs_off_and_gives_up(self, db):
+        """A window that keeps failing is retried with growing delays and the
+        session is marked failed after max_attempts, instead of calling the
+        LLM on every poll forever."""
+        meeting_id = "live-meeting-002"
+        await db.save_meeting(meeting_id, "Failing Live Meeting")
+        await db.create_process(meeting_id)
+        attempts = []
+
+        class FailingProcessor(FakeProcessor):
+            async def process_transcript(self, *args, **kwargs):
+                attempts.append(asyncio.get_running_loop().time())
+                raise RuntimeError("provider down")
+
+        summarizer = LiveSummarizer(db, FailingProcessor(), poll_interval=0.005, max_attempts=3, retry_base_s=0.05)
+        session = await summarizer.start(meeting_id, "ollama", "gemma", window_tokens=1)
+        await db.save_meeting_transcript(meeting_id, "a window that never summarizes", "2025-01-01T00:00:00")
+        summarizer.notify(meeting_id)
+        await asyncio.wait_for(session.task, timeout=5)
+
+        assert len(attempts) == 3
+        assert attempts[2] - attempts[1] > attempts[1] - attempts[0] >= 0.05
+        assert "provider down" in session.error
+        assert (await db.get_summary_result(meeting_id))["status"] == "failed"
+
+    @pytest.mark.asyncio
+    async def test_windows_are_admitted_and_cancellable(self, db):
+        """Windows wait while the summary queue is full, run under the
+        session's cancellation token, and cancel() aborts the in-flight call."""
+        meeting_id = "live-meeting-003"
+        await db.save_meeting(meeting_id, "Cancelled Live Meeting")
+        started = asyncio.Event()
+        aborted = []
+
+        class BlockingProcessor(FakeProcessor):
+            async def process_transcript(self, *args, cancel=None, **kwargs):
+                started.set()
+                try:
+                    await cancel.run(asyncio.sleep(60))
+                except (JobCancelled, asyncio.CancelledError):
+                    aborted.append(cancel.reason)
+                    raise
+
+        admission = AdmissionController(max_active_jobs=0)
+        summarizer = LiveSummarizer(db, BlockingProcessor(), poll_interval=0.005, admission=admission)
+        session = await summarizer.start(meeting_id, "ollama", "gemma", window_tokens=1)
+        await db.save_meeting_transcript(meeting_id, "a window waiting for a free slot", "2025-01-01T00:00:00")
+        summarizer.notify(meeting_id)
+        for _ in range(100):
+            if session.retry_at:
+                break
+            await asyncio.sleep(0.005)
+        assert session.retry_at and not started.is_set() and session.failures == 0
+
+        admission.max_active_jobs = 1
+        session.retry_at = 0.0
+        summarizer.notify(meeting_id)
+        await asyncio.wait_for(started.wait(), timeout=5)
+        assert admission.active_jobs == 1
+
+        assert await summarizer.cancel(meeting_id, "deleted") is True
+        assert aborted == ["deleted"]
+        assert admission.active_jobs == 0
+        assert summarizer.get_session(meeting_id) is None
+        assert await summarizer.cancel(meeting_id) is False
+
+
+    @pytest.mark.asyncio
+    async def test_failed_finalize_can_be_retried(self, db):
+        """A finalize whose tail window fails keeps the session, released from
+        its claim, so the next finalize can complete it."""
+        meeting_id = "live-meeting-004"
+        await db.save_meeting(meeting_id, "Flaky Finalize")
+        failures = []
+
+        class FlakyProcessor(FakeProcessor):
+            async def process_transcript(self, *args, **kwargs):
+                if not failures:
+                    failures.append(1)
+                    raise RuntimeError("timeout")
+                return await super().process_transcript(*args, **kwargs)
+
+        summarizer = LiveSummarizer(db, FlakyProcessor(), poll_interval=0.01)
+        await summarizer.start(meeting_id, "ollama", "gemma")
+        await db.save_meeting_transcript(meeting_id, "the tail of the meeting", "2025-01-01T00:00:00")
+
+        summarizer.claim_finalize(meeting_id)
+        with pytest.raises(RuntimeError):
+            await summarizer.finalize(meeting_id)
+        assert summarizer.get_session(meeting_id) is not None
+
+        summarizer.claim_finalize(meeting_id)
+        final = await summarizer.finalize(meeting_id)
+        assert len(final["ImmediateActionItems"]["blocks"]) == 1
+        assert summarizer.get_session(meeting_id) is None
+
+
+class TestRulePreview:
+
+    def test_preview_extracts_spanish_actions_dates_and_people(self):
+        text = (
+            "[00:00] Ana López: Hola, hoy vamos a hablar del lanzamiento de la app.\n"
+            "[00:05] Carlos: Yo me encargo del diseño y lo tengo para el viernes.\n"
+            "[00:09] Ana López: Hay que revisar el presupuesto antes del 15 de marzo."
+        )
+        preview = build_preview(text)
+
+        assert preview["MeetingName"] == "Lanzamiento de la app"
+        assert [b["content"] for b in preview["People"]["blocks"]] == ["Ana López", "Carlos"]
+        actions = [b["content"] for b in preview["ImmediateActionItems"]["blocks"]]
+        assert actions == ["Yo me encargo del diseño y lo tengo para el viernes.",
+                           "Hay que revisar el presupuesto antes del 15 de marzo."]
+        assert len(preview["CriticalDeadlines"]["blocks"]) == 2
+
+    def test_preview_uses_english_rules_for_english_text(self):
+        preview = build_preview("Hi, this is Mary. I'll send the deck by Friday. The weather was nice.")
+
+        assert [b["content"] for b in preview["ImmediateActionItems"]["blocks"]] == ["I'll send the deck by Friday."]
+        assert [b["content"] for b in preview["People"]["blocks"]] == ["Mary"]
+
+
+class TestTranscriptCleanup:
+
+    def test_cleanup_drops_hallucinations_loops_and_fillers(self):
+        text = (
+            "Eh, bueno, hoy revisamos este proyecto, o sea, el de ventas.\n"
+            "Gracias.\n"
+            "Subtítulos realizados por la comunidad de Amara.org\n"
+            "Ana: no sé no sé no sé no sé, hay que enviar el reporte.\n"
+            "Ana: no sé no sé no sé no sé, hay que enviar el reporte."
+        )
+        cleaned, stats = clean_transcript(text, "es")
+
+        assert cleaned == "hoy revisamos este proyecto, el de ventas.\nAna: no sé hay que enviar el reporte."
+        assert stats["hallucinations"] == 2
+        assert stats["duplicate_segments"] == 1
+        assert stats["fillers"] == 3
+        assert 0 < stats["token_reduction"] < 1
+        assert stats["tokens_after"] < stats["tokens_before"]
+
+    def test_collapse_loops_keeps_short_repeats(self):
+        """Two copies are left alone; three or more collapse to one."""
+        words = "muy muy bien. Gracias. Gracias. Gracias. Gracias.".split()
+        kept, dropped = collapse_loops(words)
+
+        assert kept == ["muy", "muy", "bien.", "Gracias."]
+        assert dropped == 3
+
+
+class TestTopicChunking:
+
+    TOPICS = [
+        "presupuesto proyecto aprobación finanzas cierre trimestral costos gastos inversión facturas proveedores",
+        "campaña marketing digital redes sociales anuncios contenido influencers métricas conversión audiencia",
+        "equipo desarrollo migración base datos servidores despliegue pruebas integración continua código",
+        "contratación personal entrevistas candidatos recursos humanos vacantes salarios onboarding capacitación",
+    ]
+
+    def _meeting(self, sentences_per_topic):
+        rng = random.Random(7)
+        parts = []
+        for index, sentences in enumerate(sentences_per_topic):
+            words = self.TOPICS[index % len(self.TOPICS)].split() + ["y", "la", "de", "que", "para", "con"]
+            parts.append(". ".join(" ".join(rng.choice(words) for _ in range(15)) for _ in range(sentences)) + ".")
+        return "\n".join(parts), [len(part) + 1 for part in parts]
+
+    def test_topic_chunks_cut_at_topic_changes(self):
+        text, lengths = self._meeting([30, 45, 25, 40, 35, 30])
+        chunks = topic_chunks(text, max_chars=8000)
+
+        assert "".join(chunks) == text
+        assert all(len(chunk) <= 8000 for chunk in chunks)
+        true_cuts = [sum(lengths[:i + 1]) for i in range(len(lengths) - 1)]
+        cuts = [sum(len(chunk) for chunk in chunks[:i + 1]) for i in range(len(chunks) - 1)]
+        # Every topic change is found within a sentence or so
+        for true_cut in true_cuts:
+            assert min(abs(cut - true_cut) for cut in cuts) < 200
+
+    def test_topic_chunks_split_oversized_topics(self):
+        text, _ = self._meeting([200])
+        chunks = topic_chunks(text, max_chars=3000)
+
+        assert "".join(chunks) == text
+        assert len(chunks) > 1
+        assert all(len(chunk) <= 3000 for chunk in chunks)
+
+    def test_fixed_chunks_overlap(self):
+        assert fixed_chunks("abcdefghij", chunk_size=4, overlap=1) == ["abcd", "defg", "ghij", "j"]
+
+
+class TestDeadlinePlanner:
+
+    def test_generous_deadline_keeps_the_requested_plan(self):
+        plan = plan_for_deadline(20000, time.monotonic() + 3600, 5000, 1000, (ModelTier("claude", "sonnet"), None), {})
+
+        assert plan.fits
+        assert (plan.chunk_size, plan.overlap, plan.concurrency) == (5000, 1000, 1)
+
+    def test_tight_deadline_uses_history_to_add_concurrency(self):
+        """A 5000-char chunk takes 12.5 s on average; 10 chunks only fit in 40 s run in parallel."""
+        tier = ModelTier("claude", "sonnet")
+        history = {tier.label: LatencyProfile("claude", calls=10, latency_ms=125_000, input_tokens=12_500)}
+
+        plan = plan_for_deadline(40000, time.monotonic() + 40, 5000, 1000, (tier, None), history)
+
+        assert plan.fits
+        assert plan.concurrency > 1
+        assert plan.expected_seconds <= 40
+
+    def test_smaller_chunks_keep_the_fixed_call_cost(self):
+        """Halving the chunk only saves the prompt part of a call, so more calls cannot beat the deadline."""
+        tier = ModelTier("claude", "sonnet")
+        profile = LatencyProfile("claude", calls=10, latency_ms=100_000, input_tokens=12_500,
+                                 fixed_ms=8000, prompt_ms_per_token=1.6)
+
+        assert profile.call_seconds(5000) == pytest.approx(10)
+        assert profile.call_seconds(2500) == pytest.approx(9)
+
+        # 10 chunks of 5000 chars at 4-way concurrency need 3 rounds of 10 s; smaller chunks need more rounds
+        plan = plan_for_deadline(40000, time.monotonic() + 20, 5000, 1000, (tier, None), {tier.label: profile})
+        assert not plan.fits
+        assert plan.expected_seconds > 20
+
+    def test_impossible_deadline_drops_the_reduce(self):
+        """When nothing fits, the fastest option is chosen: no LLM reduce, smallest chunks."""
+        extract, reduce = ModelTier("ollama", "gemma3:1b"), ModelTier("claude", "sonnet")
+
+        plan = plan_for_deadline(500_000, time.monotonic() + 2, 30000, 1000, (extract, reduce), {})
+
+        assert not plan.fits
+        assert plan.reduce_tier is None
+        assert plan.chunk_size < 30000
+        assert plan.stop_at < plan.deadline_at
+
+
+class TestSummaryEstimate:
+
+    def test_estimate_matches_the_chunker(self):
+        """Fixed chunks are counted without slicing, and agree with the real chunker."""
+        text = "Ana: hay que cerrar el presupuesto del proyecto esta semana. " * 500
+        tier = ModelTier("claude", "sonnet")
+
+        estimate = estimate_summary(text, (tier, None), {}, 5000, 1000, clean=False)
+
+        assert estimate["chunks"] == len(split_transcript(text, "fixed", 5000, 1000))
+        assert estimate["tiers"]["reduce"] is None
+        assert estimate["input_tokens"] > estimate["transcript_tokens"]  # overlap + prompt template
+        assert estimate["predicted_seconds"] == estimate["tiers"]["extract"]["seconds"]
+
+    def test_estimate_uses_history_and_samples_large_inputs(self):
+        text = "Carlos: revisamos el diseño y vamos a mandar la propuesta el viernes. " * 150_000  # ~10MB
+        extract, reduce = ModelTier("ollama", "gemma3:1b"), ModelTier("claude", "sonnet")
+        history = {extract.label: LatencyProfile("ollama", calls=4, latency_ms=8000, input_tokens=8000, output_tokens=2000)}
+
+        estimate = estimate_summary(text, (extract, reduce), history, 30000, 1000, strategy="topic")
+
+        assert estimate["sampled"]
+        assert estimate["tiers"]["extract"]["output_tokens"] == 500 * estimate["chunks"]
+        assert estimate["tiers"]["reduce"]["calls"] == 1
+        assert estimate["elapsed_ms"] < 2000
+
+
+class TestModelRouting:
+
+    def test_single_tier_without_chunk_model(self, monkeypatch):
+        """Without a chunk model every chunk goes to the requested model and there is no LLM reduce."""
+        monkeypatch.delenv("MAITY_CHUNK_MODEL", raising=False)
+
+        assert resolve_routing("claude", "claude-3-5-sonnet") == (ModelTier("claude", "claude-3-5-sonnet"), None)
+
+    def test_chunk_model_from_env_routes_extraction(self, monkeypatch):
+        """MAITY_CHUNK_MODEL picks the extraction tier; the requested model runs the reduce."""
+        monkeypatch.setenv("MAITY_CHUNK_MODEL", "ollama/gemma3:1b")
+
+        extract, reduce = resolve_routing("claude", "claude-3-5-sonnet")
+        assert extract.label == "ollama/gemma3:1b"
+        assert reduce == ModelTier("claude", "claude-3-5-sonnet")
+        # The request overrides the env, and routing to the same model stays single-tier
+        assert resolve_routing("claude", "claude-3-5-sonnet", "claude", "claude-3-5-sonnet")[1] is None
+
+    def test_tier_stats_accumulate(self):
+        stats = TierStats(model="ollama/gemma3:1b")
+        stats.record(0.25, 1000, 200)
+        stats.record(0.5, 800, 0, ok=False)
+
+        assert stats.as_dict() == {"model": "ollama/gemma3:1b", "calls": 2, "failures": 1,
+                                   "latency_ms": 750.0, "input_tokens": 1800, "output_tokens": 200}
+
+
+class TestAdmissionControl:
+
+    def test_rejects_over_job_and_byte_limits(self):
+        admission = AdmissionController(max_active_jobs=2, max_queued_bytes=1000)
+        first = admission.admit(600)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            admission.admit(500)
+        assert rejected.value.reason == "bytes"
+        admission.admit(400)
+        with pytest.raises(AdmissionRejected) as rejected:
+            admission.admit(1)
+        assert rejected.value.reason == "jobs"
+
+        first.release()
+        first.release()  # releasing twice frees the slot once
+        assert admission.stats()["active_jobs"] == 1
+        assert admission.stats()["rejected"] == {"jobs": 1, "bytes": 1}
+
+    def test_oversized_job_runs_alone(self):
+        admission = AdmissionController(max_active_jobs=2, max_queued_bytes=1000)
+        admission.admit(5000)
+        with pytest.raises(AdmissionRejected):
+            admission.admit(10)
+
+    def test_retry_after_follows_drain_rate(self):
+        now = [0.0]
+        admission = AdmissionController(max_active_jobs=1, max_queued_bytes=10_000, clock=lambda: now[0])
+        for _ in range(3):
+            ticket = admission.admit(100)
+            now[0] += 20
+            ticket.release()
+        admission.admit(100)
+
+        # Three jobs in 60s: one job frees up every 20s
+        with pytest.raises(AdmissionRejected) as rejected:
+            admission.admit(100)
+        assert rejected.value.retry_after == 20
+        assert admission.stats()["drain_jobs_per_sec"] == 0.05
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code):
+        self.status_code = status_code
+        super().__init__(f"HTTP {status_code}")
+
+
+class TestProviderLimiter:
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_errors_and_backs_off(self):
+        limiter = ProviderLimiter("groq", max_concurrency=8, backoff_base=0.001)
+        answers = [ProviderError(429), ProviderError(502), "ok"]
+        retried = []
+
+        async def call():
+            answer = answers.pop(0)
+            if isinstance(answer, Exception):
+                raise answer
+            return answer
+
+        assert await limiter.call(call, 100, on_retry=retried.append) == "ok"
+        assert [e.status_code for e in retried] == [429, 502]
+        # One 429 halves the concurrency limit (4 -> 2), then successes grow it back slowly
+        assert 2 < limiter.concurrency.limit < 3
+        assert limiter.stats()["overloads"] == 1
+
+    @pytest.mark.asyncio
+    async def test_client_errors_are_not_retried(self):
+        limiter = ProviderLimiter("openai", backoff_base=0.001)
+        calls = []
+
+        async def call():
+            calls.append(1)
+            raise ProviderError(400)
+
+        with pytest.raises(ProviderError):
+            await limiter.call(call, 100)
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_token_bucket_paces_calls(self):
+        now = [0.0]
+        limiter = ProviderLimiter("claude", rpm=60, tpm=6000, clock=lambda: now[0])
+
+        async def call():
+            return "ok"
+
+        await limiter.call(call, 4400)  # with the expected completion: 5000 of 6000 tokens
+        assert limiter.tokens.wait_time(5000) == pytest.approx(40.0)
+        now[0] += 40
+        assert limiter.tokens.wait_time(5000) == 0
+
+
+class TestJobCancellation:
+
+    @pytest.mark.asyncio
+    async def test_resubmission_supersedes_running_job(self):
+        jobs = JobRegistry()
+        first = jobs.start("m1")
+        second = jobs.start("m1")
+
+        assert first.reason == "superseded"
+        jobs.finish("m1", first)  # the old job ending does not forget the new one
+        assert jobs.running("m1") and not second.cancelled
+
+        slow = asyncio.ensure_future(second.run(asyncio.sleep(30)))
+        await asyncio.sleep(0)
+        assert jobs.cancel("m1", "deleted")
+        with pytest.raises(JobCancelled) as cancelled:
+            await slow
+        assert cancelled.value.reason == "deleted"
+        assert not jobs.cancel("m1")